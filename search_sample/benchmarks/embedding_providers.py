@@ -0,0 +1,34 @@
+# benchmarks/embedding_providers.py
+"""
+Embedding throughput per provider, without the embedding cache.
+Run from search_sample/: python -m benchmarks.embedding_providers [provider ...]
+"""
+
+import sys
+import time
+from typing import List
+
+from benchmarks.synthetic import synthetic_texts
+from utils.embedding_providers import EmbeddingProvider, get_provider
+
+
+def benchmark_provider(provider: EmbeddingProvider, texts: List[str], repeat: int = 3) -> dict:
+    """Embed `texts` `repeat` times and report the best throughput."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        provider.embed(texts)
+        best = min(best, time.perf_counter() - started)
+    return {
+        "provider": provider.name,
+        "model_id": provider.model_id,
+        "texts": len(texts),
+        "seconds": round(best, 4),
+        "texts_per_sec": round(len(texts) / best, 1) if best else float("inf"),
+    }
+
+
+if __name__ == "__main__":
+    sample = synthetic_texts(2000, words=300)
+    for provider_name in sys.argv[1:] or ["local"]:
+        print(f"[Benchmark] {benchmark_provider(get_provider(provider_name), sample)}")
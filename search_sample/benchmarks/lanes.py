@@ -0,0 +1,37 @@
+# benchmarks/lanes.py
+"""
+Team A's bulk import is queued just before team B's small uploads. Queue wait
+of the small documents: one FIFO pool vs. lanes (latency/bulk budgets, fair per team).
+Run from search_sample/: python -m benchmarks.lanes
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.lane_utils import BULK, LATENCY, queue_wait_report, run_by_lane
+
+
+def benchmark_lanes(bulk_docs: int = 12, bulk_pages: int = 200, small_docs: int = 12,
+                    seconds_per_page: float = 0.001, workers: int = 4) -> dict:
+    def process(body):
+        time.sleep(body["pages"] * seconds_per_page)
+        return time.time() - body["enqueued_at"]
+
+    def bodies():
+        now = time.time()
+        bulk = [{"team_id": "A", "lane": BULK, "pages": bulk_pages, "enqueued_at": now} for _ in range(bulk_docs)]
+        small = [{"team_id": "B", "lane": LATENCY, "pages": 2, "enqueued_at": now} for _ in range(small_docs)]
+        return bulk + small
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        fifo = list(executor.map(process, bodies()))[bulk_docs:]
+    laned = run_by_lane(bodies(), process, workers)[bulk_docs:]
+    return {
+        "small_done_after_fifo_s": round(max(fifo), 2),
+        "small_done_after_lanes_s": round(max(laned), 2),
+        "queue_wait": queue_wait_report(),
+    }
+
+
+if __name__ == "__main__":
+    print(f"[Benchmark] {benchmark_lanes()}")
@@ -0,0 +1,53 @@
+# benchmarks/layout.py
+"""
+Pages/sec of the single layout pass vs the multi-pass scan, on text- and table-heavy PDFs.
+"multi_pass" is the old text + images + text-heuristic path; "multi_pass_geometry"
+produces the layout pass's outputs with one page analysis per output.
+Run from search_sample/: python -m benchmarks.layout
+"""
+
+import time
+from typing import List
+
+import fitz  # PyMuPDF
+
+from benchmarks.synthetic import synthetic_pdf, synthetic_table_pdf
+from utils.helpers import normalize_whitespace, detect_tables_in_text
+from utils.layout_utils import extract_layout, detect_tables, word_cells
+
+
+def _multi_pass_scan(page) -> dict:
+    """The pre-layout path: text, then images by xref, then a line-by-line table rescan."""
+    text = page.get_text("text")
+    images = [page.parent.extract_image(img[0]) for img in page.get_images(full=True)]
+    return {"text": normalize_whitespace(text), "tables": detect_tables_in_text(text), "images": len(images)}
+
+def _multi_pass_geometry_scan(page) -> dict:
+    """The same outputs as the layout pass, but from separate text / words / image passes."""
+    text = page.get_text("text")
+    words = page.get_text("words")
+    images = page.get_image_info()
+    tables = detect_tables(word_cells(words), words) if words else []
+    return {"text": normalize_whitespace(text), "tables": tables, "images": len(images)}
+
+def benchmark_layout(page_count: int = 200) -> List[dict]:
+    results = []
+    for corpus, pdf_bytes in (("text-heavy", synthetic_pdf(page_count)), ("table-heavy", synthetic_table_pdf(page_count))):
+        row = {"corpus": corpus, "pages": page_count}
+        with fitz.open(stream=pdf_bytes, filetype="pdf") as pdf_doc:
+            for mode, scan in (("multi_pass", lambda page: _multi_pass_scan(page)["tables"]),
+                               ("multi_pass_geometry", lambda page: _multi_pass_geometry_scan(page)["tables"]),
+                               ("layout", lambda page: extract_layout(page, tables=True).tables),
+                               ("layout_no_tables", lambda page: extract_layout(page, tables=False).tables)):
+                start = time.perf_counter()
+                tables = sum(len(scan(page)) for page in pdf_doc)
+                elapsed = time.perf_counter() - start
+                row[f"{mode}_pages_per_sec"] = round(page_count / elapsed, 1)
+                row[f"{mode}_tables"] = tables
+        results.append(row)
+    return results
+
+
+if __name__ == "__main__":
+    for row in benchmark_layout():
+        print(f"[Benchmark] {row}")
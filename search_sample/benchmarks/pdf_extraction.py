@@ -0,0 +1,32 @@
+# benchmarks/pdf_extraction.py
+"""
+Pages/sec for serial vs page-parallel PDF extraction on synthetic PDFs.
+Run from search_sample/: python -m benchmarks.pdf_extraction
+"""
+
+import time
+from typing import List, Optional
+
+from benchmarks.synthetic import synthetic_pdf
+from functions.pdf_processor import extract_pages, resolve_workers
+
+
+def benchmark_extraction(page_counts=(10, 100, 1000), workers: Optional[int] = None) -> List[dict]:
+    workers = resolve_workers(workers)
+    results = []
+    for page_count in page_counts:
+        pdf_bytes = synthetic_pdf(page_count)
+        row = {"pages": page_count, "workers": workers}
+        for mode, kwargs in (("serial", {"workers": 1}), ("parallel", {"workers": workers, "min_pages": 0})):
+            start = time.perf_counter()
+            pages = extract_pages(pdf_bytes, **kwargs)
+            elapsed = time.perf_counter() - start
+            assert [p["page_number"] for p in pages] == list(range(1, page_count + 1))
+            row[f"{mode}_pages_per_sec"] = round(page_count / elapsed, 1)
+        results.append(row)
+    return results
+
+
+if __name__ == "__main__":
+    for row in benchmark_extraction():
+        print(f"[Benchmark] {row}")
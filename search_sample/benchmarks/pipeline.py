@@ -0,0 +1,47 @@
+# benchmarks/pipeline.py
+"""
+Wall time of sleep-simulated extract → embed → store stages, run back to back vs
+pipelined with utils.pipeline_utils.
+Run from search_sample/: python -m benchmarks.pipeline
+"""
+
+import time
+
+from utils.pipeline_utils import map_in_order, prefetch
+
+
+def benchmark_pipeline(items: int = 40, extract_s: float = 0.01, embed_s: float = 0.03,
+                       store_s: float = 0.02, workers: int = 2) -> dict:
+    def extract():
+        for item in range(items):
+            time.sleep(extract_s)
+            yield item
+
+    def stage(seconds):
+        def run(item):
+            time.sleep(seconds)
+            return item
+        return run
+
+    start = time.perf_counter()
+    for item in extract():
+        stage(store_s)(stage(embed_s)(item))
+    sequential = time.perf_counter() - start
+
+    start = time.perf_counter()
+    embedded = map_in_order(stage(embed_s), prefetch(extract(), maxsize=8), workers, 1)
+    for _ in map_in_order(stage(store_s), embedded, workers, 1):
+        pass
+    pipelined = time.perf_counter() - start
+
+    return {
+        "items": items,
+        "sequential_s": round(sequential, 2),
+        "pipelined_s": round(pipelined, 2),
+        "sum_of_stages_s": round(items * (extract_s + embed_s + store_s), 2),
+        "slowest_stage_s": round(items * max(extract_s, embed_s / workers, store_s / workers), 2),
+    }
+
+
+if __name__ == "__main__":
+    print(f"[Benchmark] {benchmark_pipeline()}")
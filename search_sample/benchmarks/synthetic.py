@@ -0,0 +1,55 @@
+# benchmarks/synthetic.py
+"""
+Synthetic inputs shared by the benchmarks and the tests: text- and table-heavy
+PDFs, a ledger-style XLSX and word-salad texts for the embedding benchmarks.
+"""
+
+import io
+import datetime
+from typing import List
+
+import fitz  # PyMuPDF
+import numpy as np
+
+_WORDS = "contract party agreement payment term invoice clause liability notice schedule".split()
+
+
+def synthetic_pdf(page_count: int, lines_per_page: int = 40) -> bytes:
+    doc = fitz.open()
+    for page_no in range(page_count):
+        page = doc.new_page()
+        text = "\n".join(
+            f"Page {page_no + 1} line {line}: the quick brown fox jumps over the lazy dog."
+            for line in range(lines_per_page)
+        )
+        page.insert_text((36, 36), text, fontsize=9)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+def synthetic_table_pdf(page_count: int, rows_per_page: int = 40) -> bytes:
+    doc = fitz.open()
+    for page_no in range(page_count):
+        page = doc.new_page()
+        for row in range(rows_per_page):
+            for col, x in enumerate((36, 156, 276, 396, 516)):
+                page.insert_text((x, 48 + row * 18), f"r{page_no}.{row} c{col} {row * col}", fontsize=8)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+def synthetic_xlsx(rows: int, columns: int = 12) -> bytes:
+    from openpyxl import Workbook
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Ledger")
+    sheet.append([f"Column {col}" for col in range(columns)])
+    for row in range(rows):
+        sheet.append([f"Account {row}", row * 1.5, datetime.date(2024, 1, 1 + row % 28)] +
+                     [row * col for col in range(columns - 3)])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+def synthetic_texts(count: int, words: int) -> List[str]:
+    rng = np.random.default_rng(0)
+    return [" ".join(rng.choice(_WORDS, size=words)) for _ in range(count)]
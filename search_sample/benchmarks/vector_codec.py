@@ -0,0 +1,68 @@
+# benchmarks/vector_codec.py
+"""
+Recall-vs-size report for the vector codec settings.
+Run from search_sample/: python -m benchmarks.vector_codec [vectors.npy] [dim ...]
+Without a .npy sample, 3000 texts are embedded with the local provider.
+"""
+
+import sys
+from typing import List, Sequence
+
+import numpy as np
+
+from benchmarks.synthetic import synthetic_texts
+from utils.embedding_providers import get_provider
+from utils.vector_codec import VectorCodec, fit_pca
+
+
+def recall_report(corpus, queries=None, k: int = 10, target_dims: Sequence[int] = (),
+                  quantizations: Sequence[str] = ("float32", "float16", "int8")) -> List[dict]:
+    """
+    Compare storage settings by bytes/vector and recall@k against exact float32
+    inner-product search. Without `queries`, 10% of `corpus` is held out as queries.
+    PCA models are fitted on the corpus itself.
+    """
+    corpus = np.asarray(corpus, dtype=np.float32)
+    if queries is None:
+        held_out = max(1, len(corpus) // 10)
+        corpus, queries = corpus[held_out:], corpus[:held_out]
+    queries = np.asarray(queries, dtype=np.float32)
+    k = min(k, len(corpus))
+
+    def top_k(matrix, query_matrix):
+        scores = query_matrix @ matrix.T
+        return np.argpartition(-scores, k - 1, axis=1)[:, :k]
+
+    exact = top_k(corpus, queries)
+    settings = [("none", None)]
+    for dim in target_dims:
+        if dim < corpus.shape[1]:
+            settings += [("truncate", dim), ("pca", dim)]
+
+    rows = []
+    for reduction, dim in settings:
+        pca_model = fit_pca(corpus, dim) if reduction == "pca" else None
+        for quantization in quantizations:
+            codec = VectorCodec(quantization, reduction, dim, pca_model)
+            encoded = codec.encode(corpus)
+            approx = top_k(encoded.decode(), codec.reduce(queries))
+            hits = sum(len(set(a) & set(e)) for a, e in zip(approx, exact))
+            rows.append({
+                "codec": codec.name,
+                "bytes_per_vector": encoded.bytes_per_vector,
+                "compression": round(corpus.shape[1] * 4 / encoded.bytes_per_vector, 2),
+                f"recall@{k}": round(hits / (k * len(queries)), 4),
+            })
+    return rows
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1].endswith(".npy"):
+        sample = np.load(sys.argv[1])
+        dims = [int(d) for d in sys.argv[2:]]
+    else:
+        sample = get_provider("local").embed(synthetic_texts(3000, words=40))
+        dims = [int(d) for d in sys.argv[1:]]
+    sample = np.asarray(sample, dtype=np.float32)
+    for row in recall_report(sample, target_dims=dims or [sample.shape[1] // 2, sample.shape[1] // 4]):
+        print(f"[Codec] {row}")
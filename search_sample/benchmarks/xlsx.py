@@ -0,0 +1,37 @@
+# benchmarks/xlsx.py
+"""
+Rows/sec and peak traced memory for read-only XLSX record extraction.
+Run from search_sample/: python -m benchmarks.xlsx
+"""
+
+import time
+import tracemalloc
+from typing import List
+
+from benchmarks.synthetic import synthetic_xlsx
+from functions.xlsx_processor import iter_xlsx_records
+
+
+def benchmark_xlsx(row_counts=(10_000, 100_000)) -> List[dict]:
+    results = []
+    for rows in row_counts:
+        xlsx_bytes = synthetic_xlsx(rows)
+        tracemalloc.start()
+        start = time.perf_counter()
+        records = sum(1 for _ in iter_xlsx_records(xlsx_bytes))
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results.append({
+            "rows": rows,
+            "file_mb": round(len(xlsx_bytes) / 2**20, 1),
+            "records": records,
+            "rows_per_sec": round(rows / elapsed),
+            "peak_mb": round(peak / 2**20, 1),
+        })
+    return results
+
+
+if __name__ == "__main__":
+    for row in benchmark_xlsx():
+        print(f"[Benchmark] {row}")
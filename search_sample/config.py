@@ -1,25 +1,150 @@
-import yaml
-import os
-
-# Locate config.yaml (same directory as config.py or via ENV var)
-CONFIG_FILE = os.path.join(os.path.dirname(__file__), "config.yaml")
-
-with open(CONFIG_FILE, "r") as f:
-    config = yaml.safe_load(f)
-
-# Database
-DATABASE_URL = config["database"]["url"]
-
-# Azure
-AZURE_STORAGE_CONNECTION_STRING = config["azure"]["storage_connection_string"]
-AZURE_SERVICE_BUS_CONNECTION_STRING = config["azure"]["service_bus_connection_string"]
-AZURE_EVENTGRID_ENDPOINT = config["azure"]["event_grid_endpoint"]
-
-# MosaicDB
-MOSAICDB_URI = config['mosaic']["mosaicdb_uri"]
-MOSAIC_API_KEY = config['mosaic']["mosaic_api_key"]
-MOSAIC_MODEL_ENDPOINT = config['mosaic']["mosaic_model_endpoint"]
-
-# Embedding
-EMBEDDING_PROVIDER = config["embedding"]["provider"]
-EMBEDDING_API_KEY = config["embedding"]["api_key"]
+import yaml
+import os
+import tempfile
+
+# Locate config.yaml (same directory as config.py or via ENV var)
+CONFIG_FILE = os.environ.get("SEARCH_SAMPLE_CONFIG", os.path.join(os.path.dirname(__file__), "config.yaml"))
+
+with open(CONFIG_FILE, "r") as f:
+    config = yaml.safe_load(f)
+
+# Database
+DATABASE_URL = config["database"]["url"]
+
+# Azure
+AZURE_STORAGE_CONNECTION_STRING = config["azure"]["storage_connection_string"]
+AZURE_STORAGE_CONTAINER_NAME = config["azure"]["storage_container_name"]
+AZURE_SERVICE_BUS_CONNECTION_STRING = config["azure"]["service_bus_connection_string"]
+AZURE_EVENTGRID_ENDPOINT = config["azure"]["event_grid_endpoint"]
+
+# MosaicDB
+MOSAICDB_URI = config['mosaicdb']["mosaicdb_uri"]
+MOSAIC_API_KEY = config['mosaicdb']["mosaic_api_key"]
+MOSAIC_MODEL_ENDPOINT = config['mosaicdb']["mosaic_model_endpoint"]
+MOSAICDB_BULK_INSERT = config['mosaicdb']["bulk_insert"]
+MOSAICDB_INSERT_PAGE_ROWS = config['mosaicdb']["insert_page_rows"]
+MOSAICDB_INSERT_PAGE_MAX_BYTES = config['mosaicdb']["insert_page_max_bytes"]
+MOSAICDB_VECTOR_ENCODING = config['mosaicdb']["vector_encoding"]
+MOSAICDB_INSERT_MAX_IN_FLIGHT = config['mosaicdb']["insert_max_in_flight"]
+MOSAICDB_INSERT_PAGE_RETRIES = config['mosaicdb']["insert_page_retries"]
+
+# Embedding
+EMBEDDING_PROVIDER = config["embedding"]["provider"]
+EMBEDDING_API_KEY = config["embedding"]["api_key"]
+EMBEDDING_MODEL_ID = config["embedding"]["model_id"] or MOSAIC_MODEL_ENDPOINT
+EMBEDDING_LOCAL_DIMENSION = config["embedding"]["local_dimension"]
+EMBEDDING_LOCAL_BUCKETS = config["embedding"]["local_buckets"]
+EMBEDDING_LOCAL_SEED = config["embedding"]["local_seed"]
+
+# PDF extraction
+PDF_WORKERS = config["pdf"]["workers"]
+PDF_PARALLEL_MIN_PAGES = config["pdf"]["parallel_min_pages"]
+PDF_PAGES_PER_TASK = config["pdf"]["pages_per_task"]
+PDF_LAYOUT_TABLES = config["pdf"]["layout_tables"]
+
+# Content sniffing / routing
+SNIFF_HEAD_BYTES = config["sniff"]["head_bytes"]
+SNIFF_TAIL_BYTES = config["sniff"]["tail_bytes"]
+SNIFF_REJECT_ENCRYPTED_PDF = config["sniff"]["reject_encrypted_pdf"]
+
+# Spreadsheet extraction
+XLSX_ROWS_PER_RECORD = config["xlsx"]["rows_per_record"]
+XLSX_MAX_RECORD_CHARS = config["xlsx"]["max_record_chars"]
+XLSX_REPEAT_HEADER = config["xlsx"]["repeat_header"]
+
+# OCR
+OCR_LANG = config["ocr"]["lang"]
+OCR_WORKERS = config["ocr"]["workers"]
+OCR_TESSERACT_CONFIG = config["ocr"]["tesseract_config"]
+OCR_MIN_SIDE = config["ocr"]["min_side"]
+OCR_MIN_AREA = config["ocr"]["min_area"]
+OCR_MIN_ENTROPY = config["ocr"]["min_entropy"]
+OCR_TARGET_DPI = config["ocr"]["target_dpi"]
+OCR_MAX_SCALE = config["ocr"]["max_scale"]
+OCR_FRAGMENT_THRESHOLD = config["ocr"]["fragment_threshold"]
+
+# Processed output (page streams)
+OUTPUT_FORMAT = config["output"]["format"]
+OUTPUT_TARGET = config["output"]["target"]
+OUTPUT_SPOOL_DIR = config["output"]["spool_dir"]
+OUTPUT_BLOCK_BYTES = config["output"]["block_bytes"]
+OUTPUT_WRITE_BEHIND_PAGES = config["output"]["write_behind_pages"]
+
+# Checkpoints (resumable processing)
+CHECKPOINT_ENABLED = config["checkpoint"]["enabled"]
+
+# Chunking
+CHUNK_SIZE = config["chunking"]["chunk_size"]
+CHUNK_OVERLAP = config["chunking"]["chunk_overlap"]
+
+# Ingestion
+INGEST_INCREMENTAL = config["ingest"]["incremental"]
+INGEST_STREAM_BATCH_CHUNKS = config["ingest"]["stream_batch_chunks"]
+
+# Batch worker
+WORKER_BATCH_QUEUE_NAME = config["worker_batch"]["queue_name"]
+WORKER_BATCH_MAX_MESSAGES = config["worker_batch"]["max_messages"]
+WORKER_BATCH_DOCUMENT_WORKERS = config["worker_batch"]["document_workers"]
+WORKER_BATCH_LINGER_MS = config["worker_batch"]["linger_ms"]
+WORKER_BATCH_MAX_ATTEMPTS = config["worker_batch"]["max_attempts"]
+
+# Scheduling lanes
+LANE_LATENCY_MAX_BYTES = config["lanes"]["latency_max_bytes"]
+LANE_LATENCY_MAX_PAGES = config["lanes"]["latency_max_pages"]
+LANE_LATENCY_MAX_SCANNED_PAGES = config["lanes"]["latency_max_scanned_pages"]
+LANE_BULK_QUEUE_SUFFIX = config["lanes"]["bulk_queue_suffix"]
+LANE_LATENCY_CONCURRENCY = config["lanes"]["latency_concurrency"]
+LANE_BULK_CONCURRENCY = config["lanes"]["bulk_concurrency"]
+LANE_DEFAULT_TEAM_WEIGHT = config["lanes"]["default_team_weight"]
+LANE_TEAM_WEIGHTS = config["lanes"]["team_weights"] or {}
+
+# Pipeline stages
+PIPELINE_PAGE_QUEUE = config["pipeline"]["page_queue"]
+PIPELINE_EMBED_WORKERS = config["pipeline"]["embed_workers"]
+PIPELINE_EMBED_QUEUE = config["pipeline"]["embed_queue"]
+PIPELINE_STORE_WORKERS = config["pipeline"]["store_workers"]
+PIPELINE_STORE_QUEUE = config["pipeline"]["store_queue"]
+
+# Embedding batching / concurrency
+EMBEDDING_BATCHED = config["embedding"]["batched"]
+EMBEDDING_BATCH_SIZE = config["embedding"]["batch_size"]
+EMBEDDING_BATCH_MAX_BYTES = config["embedding"]["batch_max_bytes"]
+EMBEDDING_MAX_IN_FLIGHT = config["embedding"]["max_in_flight"]
+EMBEDDING_REQUESTS_PER_SECOND = config["embedding"]["requests_per_second"]
+EMBEDDING_BURST = config["embedding"]["burst"]
+
+# Near-duplicate detection (MinHash / LSH)
+DEDUP_ENABLED = config["dedup"]["enabled"]
+DEDUP_THRESHOLD = config["dedup"]["threshold"]
+DEDUP_NUM_PERM = config["dedup"]["num_perm"]
+DEDUP_BANDS = config["dedup"]["bands"]
+DEDUP_SHINGLE_SIZE = config["dedup"]["shingle_size"]
+DEDUP_MIN_WORDS = config["dedup"]["min_words"]
+DEDUP_MAX_ENTRIES = config["dedup"]["max_entries"]
+
+# Vector codec (quantization / dimensionality reduction)
+VECTOR_CODEC_ENABLED = config["vector_codec"]["enabled"]
+VECTOR_CODEC_QUANTIZATION = config["vector_codec"]["quantization"]
+VECTOR_CODEC_REDUCTION = config["vector_codec"]["reduction"]
+VECTOR_CODEC_TARGET_DIM = config["vector_codec"]["target_dim"]
+VECTOR_CODEC_PCA_PATH = config["vector_codec"]["pca_path"]
+
+# Shared HTTP client
+HTTP_POOL_SIZE = config["http"]["pool_size"]
+HTTP_CONNECT_TIMEOUT_SECONDS = config["http"]["connect_timeout_seconds"]
+HTTP_READ_TIMEOUT_SECONDS = config["http"]["read_timeout_seconds"]
+HTTP_GZIP_REQUESTS = config["http"]["gzip_requests"]
+HTTP_GZIP_MIN_BYTES = config["http"]["gzip_min_bytes"]
+
+# Retry / backoff for outbound HTTP calls
+RETRY_MAX_ATTEMPTS = config["retry"]["max_attempts"]
+RETRY_BACKOFF_BASE_SECONDS = config["retry"]["backoff_base_seconds"]
+RETRY_BACKOFF_MAX_SECONDS = config["retry"]["backoff_max_seconds"]
+
+# Local persistent caches; without cache.dir they live under the system temp
+# directory, which is writable on Azure Functions (the working directory may not be)
+CACHE_DIR = config["cache"]["dir"] or os.path.join(tempfile.gettempdir(), "search_sample", "cache")
+EMBEDDING_CACHE_ENABLED = config["cache"]["embedding_cache_enabled"]
+EMBEDDING_CACHE_MAX_BYTES = config["cache"]["embedding_cache_max_bytes"]
+OCR_CACHE_ENABLED = config["cache"]["ocr_cache_enabled"]
+OCR_CACHE_MAX_BYTES = config["cache"]["ocr_cache_max_bytes"]
@@ -1,9 +1,9 @@
-# db/models/__init__.py
-# Convenience exports for model classes
-
-from .team import Team
-from .document import Document
-from .job_status import JobStatus, JobStatusEnum
-from .permission import Permission
-
-__all__ = ["Team", "Document", "JobStatus", "JobStatusEnum", "Permission"]
+# db/models/__init__.py
+# Convenience exports for model classes
+
+from .document import Document
+from .job_status import JobStatus, JobStatusEnum
+from .document_chunk import DocumentChunk
+from .processing_checkpoint import ProcessingCheckpoint
+
+__all__ = ["Document", "JobStatus", "JobStatusEnum", "DocumentChunk", "ProcessingCheckpoint"]
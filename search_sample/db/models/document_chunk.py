@@ -0,0 +1,28 @@
+# db/models/document_chunk.py
+"""
+DocumentChunk model - one row per chunk currently stored in the vector store for a document.
+The fingerprint (sha256 of model/codec + normalized chunk text) lets a re-ingest embed only
+new or changed chunks and delete the stale ones.
+"""
+
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from ..base import Base
+
+class DocumentChunk(Base):
+    __tablename__ = "document_chunks"
+    __table_args__ = (UniqueConstraint("document_id", "chunk_id", name="uq_document_chunks_chunk_id"),)
+
+    id = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    document_id = Column(PG_UUID(as_uuid=True), ForeignKey("documents.document_id", ondelete="CASCADE"), nullable=False, index=True)
+    # "<fingerprint>:<occurrence>"; its MosaicDB row id is "<document_id>:<chunk_id>"
+    # (incremental_utils.row_ids), since identical chunks of two documents share a chunk id
+    chunk_id = Column(String(length=80), nullable=False)
+    fingerprint = Column(String(length=64), nullable=False, index=True)
+    chunk_index = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<DocumentChunk(doc={self.document_id}, chunk_id={self.chunk_id}, index={self.chunk_index})>"
@@ -0,0 +1,31 @@
+# db/models/processing_checkpoint.py
+"""
+ProcessingCheckpoint model - one row per completed range of a long-running stage.
+'extraction' rows cover page ranges whose output is already staged (marker = staged
+block / spool part); 'embedding' rows cover chunk positions already stored in the
+vector store (marker = hash of the batch's chunk ids). A retry resumes after them.
+"""
+
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from ..base import Base
+
+class ProcessingCheckpoint(Base):
+    __tablename__ = "processing_checkpoints"
+    __table_args__ = (UniqueConstraint("document_id", "stage", "range_start", name="uq_processing_checkpoints_range"),)
+
+    id = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    document_id = Column(PG_UUID(as_uuid=True), ForeignKey("documents.document_id", ondelete="CASCADE"), nullable=False, index=True)
+    stage = Column(String(length=128), nullable=False)
+    # Half-open range [range_start, range_end) of pages (extraction) or chunk positions (embedding)
+    range_start = Column(Integer, nullable=False)
+    range_end = Column(Integer, nullable=False)
+    # sha256 of the source bytes, so a changed upload never resumes from stale output
+    source_hash = Column(String(length=64), nullable=True)
+    marker = Column(String(length=255), nullable=True)
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<ProcessingCheckpoint(doc={self.document_id}, stage={self.stage}, range=[{self.range_start}, {self.range_end}))>"
@@ -0,0 +1,174 @@
+# functions/batch_worker.py
+"""
+Document worker — the per-message flow shared by the single-message worker and
+the batch worker.
+- process_document(): sniff → download → extract → chunk/embed/store for one message
+- process_batch(): many messages together. Most documents are one or two pages
+  and yield a handful of chunks, so the documents of a batch share one
+  CoalescingEmbedder: their chunks are pooled into full embedding requests and
+  the vectors are split back per document. Documents start within their lane's
+  concurrency budget, fairly across teams (utils/lane_utils.run_by_lane).
+- settle_batch(): every message settles on its own. Completed and rejected
+  messages are done; a failed one is re-sent to its lane's queue for another
+  delivery (or parked on `<queue>-failed` after worker_batch.max_attempts)
+  without failing the others.
+"""
+
+import json
+import time
+import logging
+from typing import Callable, Dict, List, NamedTuple, Optional
+from config import (
+    AZURE_STORAGE_CONTAINER_NAME,
+    DEDUP_ENABLED,
+    OUTPUT_FORMAT,
+    WORKER_BATCH_MAX_MESSAGES,
+    WORKER_BATCH_DOCUMENT_WORKERS,
+    WORKER_BATCH_LINGER_MS,
+    WORKER_BATCH_MAX_ATTEMPTS
+)
+from functions.content_router import queue_for
+from functions.processor_registry import get_extractor, get_resumable_extractor
+from utils import servicebus_utils
+from utils.blob_utils import download_blob_to_bytes
+from utils.lane_utils import BULK, lane_of, lane_queue, queue_wait_report, run_by_lane
+from utils.page_stream import WriteBehindPages, processed_blob_name
+from utils.sniff_utils import sniff_blob
+
+COMPLETED, REJECTED, FAILED = "completed", "rejected", "failed"
+
+
+class MessageResult(NamedTuple):
+    body: dict
+    status: str                      # COMPLETED, REJECTED (known-bad file, not retried) or FAILED
+    detail: str = ""
+    stats: Optional[dict] = None
+
+
+def process_document(body: dict, embed: Optional[Callable[[List[str]], List[List[float]]]] = None) -> MessageResult:
+    """
+    Process one document message end to end. Errors propagate so the message is
+    retried (chunk/embed and extraction failures are also recorded in job status).
+    """
+    blob_path = body['blob_path']
+    container = body.get('container', 'documents')
+    metadata = body.get('metadata', {})
+    document_id = body.get('document_id', metadata.get('document_id', 'unknown'))
+    metadata.setdefault('document_id', document_id)
+
+    # Check the real format with ranged reads before downloading in full;
+    # known-bad files complete the message instead of being retried
+    route = queue_for(sniff_blob(blob_path, container))
+    if route.error:
+        logging.error(f"[Worker] {route.error}: {blob_path}")
+        return MessageResult(body, REJECTED, route.error)
+    content_type = route.sniffed.kind
+
+    logging.info(f"[Worker] Processing {blob_path} ({content_type})")
+
+    file_bytes = download_blob_to_bytes(blob_path, container)
+
+    # Chunk + embed → store in MosaicDB straight from the extracted pages (unchanged
+    # chunks are skipped on re-ingest). The processed artifact is persisted alongside,
+    # for reprocessing with process_chunking_and_embedding.
+    artifact_name = processed_blob_name(f"processed/{document_id}")
+    from functions.chunk_embed_processor import chunk_and_embed_pages
+    resumable = get_resumable_extractor(content_type) if OUTPUT_FORMAT == "jsonl" else None
+    if resumable is not None:
+        # Checkpointed per page range: a retry only extracts the ranges still missing
+        pages = resumable(file_bytes, document_id, metadata, AZURE_STORAGE_CONTAINER_NAME, artifact_name)
+        stats = chunk_and_embed_pages(pages, metadata, embed=embed)
+        logging.info(f"[Worker] Wrote processed pages to {artifact_name}")
+    else:
+        # Extract in memory; the artifact is written behind on a background thread.
+        # It is best effort: by the time it is committed the vectors are stored and
+        # the job is completed, so failing the message would only re-insert them.
+        pages = get_extractor(content_type)(file_bytes)
+        with WriteBehindPages(AZURE_STORAGE_CONTAINER_NAME, artifact_name, document_id, metadata,
+                              raise_errors=False) as artifact:
+            stats = chunk_and_embed_pages(artifact.tee(pages), metadata, embed=embed)
+        if artifact.error is not None:
+            logging.error(f"[Worker] Processed pages not written to {artifact_name} ({artifact.error}); "
+                          f"vectors for {blob_path} are stored, the message completes")
+        else:
+            logging.info(f"[Worker] Wrote processed pages to {artifact_name}")
+
+    logging.info(
+        f"[Worker] Completed processing for {blob_path}: "
+        f"{stats.get('embedded', 0)} chunks embedded, {stats.get('skipped', 0)} skipped (unchanged), "
+        f"{stats.get('deleted', 0)} stale deleted"
+    )
+    return MessageResult(body, COMPLETED, stats=stats)
+
+
+def _process_isolated(body: dict, embed: Callable) -> MessageResult:
+    try:
+        return process_document(body, embed=embed)
+    except Exception as e:
+        logging.error(f"[BatchWorker] Error processing {body.get('blob_path')}: {e}", exc_info=True)
+        return MessageResult(body, FAILED, str(e))
+
+def process_batch(bodies: List[dict], document_workers: int = WORKER_BATCH_DOCUMENT_WORKERS,
+                  linger_ms: int = WORKER_BATCH_LINGER_MS) -> List[MessageResult]:
+    """
+    Process message bodies together, pooling their chunks into shared embedding
+    batches; each lane runs within its own concurrency budget.
+    """
+    if not bodies:
+        return []
+    from utils.embedding_utils import CoalescingEmbedder, generate_embeddings
+    from utils.dedup_utils import embed_with_near_dedup
+
+    base_embed = embed_with_near_dedup if DEDUP_ENABLED else generate_embeddings
+    with CoalescingEmbedder(base_embed, linger_seconds=linger_ms / 1000) as embedder:
+        results = run_by_lane(bodies, lambda body: _process_isolated(body, embedder),
+                              workers=max(1, min(document_workers, len(bodies))))
+
+    counts = {status: sum(r.status == status for r in results) for status in (COMPLETED, REJECTED, FAILED)}
+    logging.info(
+        f"[BatchWorker] {len(bodies)} messages {counts}: "
+        f"{embedder.chunks} chunks embedded in {embedder.batches} pooled batches"
+    )
+    logging.info(f"[BatchWorker] Queue wait per lane: {queue_wait_report()}")
+    return results
+
+def settle_batch(queue_name: str, results: List[MessageResult],
+                 max_attempts: int = WORKER_BATCH_MAX_ATTEMPTS) -> Dict[str, int]:
+    """
+    Settle each message independently: failed messages are re-sent to their lane's
+    queue with their delivery attempt incremented, or parked on `<queue_name>-failed`
+    once they reach `max_attempts`. A send that fails is logged with the message
+    ("unsent") and never fails the batch. Returns counts per outcome.
+    """
+    settled = {"done": 0, "retried": 0, "parked": 0, "unsent": 0}
+    for result in results:
+        if result.status != FAILED:
+            settled["done"] += 1
+            continue
+        attempt = result.body.get("delivery_attempt", 1)
+        if attempt < max_attempts:
+            target, outcome = lane_queue(queue_name, lane_of(result.body)), "retried"
+            message = {**result.body, "delivery_attempt": attempt + 1, "enqueued_at": time.time()}
+        else:
+            target, outcome = f"{queue_name}-failed", "parked"
+            message = {**result.body, "error": result.detail}
+        try:
+            servicebus_utils.send_message(target, message)
+        except Exception as e:
+            # Raising would redeliver the whole batch, and the documents that completed
+            # would insert their vectors again: keep the message in the log instead
+            logging.error(f"[BatchWorker] Could not send {result.body.get('blob_path')} to {target}: {e}; "
+                          f"message: {json.dumps(message, default=str)}")
+            outcome = "unsent"
+        settled[outcome] += 1
+    return settled
+
+
+def run_local_batch(queue_name: str, max_messages: int = WORKER_BATCH_MAX_MESSAGES) -> Dict[str, int]:
+    """
+    Local consumer: take up to `max_messages` from each lane of a (simulated) queue,
+    then process and settle them together.
+    """
+    bodies = servicebus_utils.receive_batch(queue_name, max_messages)
+    bodies += servicebus_utils.receive_batch(lane_queue(queue_name, BULK), max_messages)
+    return settle_batch(queue_name, process_batch(bodies))
@@ -1,48 +1,215 @@
-import logging
-import json
-from azure.storage.blob import BlobClient
-from config import (
-    AZURE_STORAGE_ACCOUNT_URL,
-    AZURE_STORAGE_CONTAINER_NAME
-)
-from utils.embedding_utils import chunk_text, generate_embeddings, store_embeddings
-from db.crud import update_job_status
-
-def process_chunking_and_embedding(json_blob_name: str, metadata: dict):
-    """
-    Download processed JSON from Blob, chunk text, generate embeddings,
-    store in MosaicDB, and update job status — all in memory.
-    """
-    job_id = metadata.get("job_id", "unknown")
-    document_id = metadata.get("document_id", job_id)
-
-    try:
-        logging.info(f"[ChunkEmbed] Starting for blob '{json_blob_name}' (Job ID: {job_id})")
-
-        # Download processed JSON (already contains combined text)
-        blob_client = BlobClient(
-            account_url=AZURE_STORAGE_ACCOUNT_URL,
-            container_name=AZURE_STORAGE_CONTAINER_NAME,
-            blob_name=json_blob_name
-        )
-        json_str = blob_client.download_blob().readall().decode("utf-8")
-        data = json.loads(json_str)
-
-        if "text" not in data:
-            raise ValueError("Processed JSON missing 'text' key.")
-
-        # Chunk text
-        chunks = chunk_text(data["text"])
-
-        # Generate embeddings
-        embeddings = generate_embeddings(chunks)
-
-        # Store in MosaicDB
-        store_embeddings(document_id=document_id, chunks=chunks, vectors=embeddings, metadata=metadata)
-
-        update_job_status(job_id, status="COMPLETED")
-        logging.info(f"[ChunkEmbed] Job {job_id} completed successfully.")
-
-    except Exception as e:
-        logging.error(f"[ChunkEmbed] Error in chunk/embed for job {job_id}: {e}", exc_info=True)
-        update_job_status(job_id, status="FAILED", error_message=str(e))
+import uuid
+import hashlib
+import logging
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional
+from config import (
+    AZURE_STORAGE_CONTAINER_NAME,
+    INGEST_INCREMENTAL,
+    INGEST_STREAM_BATCH_CHUNKS,
+    DEDUP_ENABLED,
+    PIPELINE_PAGE_QUEUE,
+    PIPELINE_EMBED_WORKERS,
+    PIPELINE_EMBED_QUEUE,
+    PIPELINE_STORE_WORKERS,
+    PIPELINE_STORE_QUEUE,
+    VECTOR_CODEC_ENABLED
+)
+from utils.embedding_utils import (
+    iter_chunks,
+    generate_embeddings,
+    store_embeddings,
+    delete_embeddings,
+    update_chunk_refs
+)
+from utils.embedding_providers import get_provider
+from utils.dedup_utils import embed_with_near_dedup, get_near_duplicate_index
+from utils.page_stream import open_page_stream
+from utils.checkpoint_utils import EMBEDDING_STAGE, load_checkpoints, record_checkpoint, clear_checkpoints
+from utils.incremental_utils import ChunkDiff, assign_chunk_ids, diff_chunks
+from utils.pipeline_utils import prefetch, map_in_order
+from utils.vector_codec import get_codec
+from db import crud
+from db.crud import update_job_status
+from db.session import SessionLocal
+
+def iter_page_texts(records: Iterable[dict]):
+    """
+    Yield (page_number, text) from processed page records.
+    Accepts the PDF schema ({"page_number", "combined_text"}) and the DOCX
+    schema ({"page", "text"}).
+    """
+    for idx, page in enumerate(records, start=1):
+        yield page.get("page_number", page.get("page", idx)), page.get("combined_text", page.get("text", ""))
+
+class ChunkBatch(NamedTuple):
+    start: int              # position of the first chunk in the document
+    chunks: List[str]
+    refs: List[dict]
+    ids: List[str]
+    diff: ChunkDiff         # which chunks are new vs kept from the previous ingest
+
+def iter_batches_of(items: Iterable, size: int) -> Iterator[list]:
+    it = iter(items)
+    while batch := list(islice(it, size)):
+        yield batch
+
+def batch_marker(ids: List[str]) -> str:
+    """Checkpoint marker of a chunk batch: sha256 over all of its chunk ids, in order."""
+    return hashlib.sha256("\n".join(ids).encode("utf-8")).hexdigest()
+
+def _as_uuid(document_id) -> Optional[uuid.UUID]:
+    try:
+        return uuid.UUID(str(document_id))
+    except ValueError:
+        return None
+
+def load_stored_chunk_ids(document_id) -> Optional[List[str]]:
+    """Chunk ids recorded for a document by its last ingest (None if it can't be tracked)."""
+    doc_uuid = _as_uuid(document_id)
+    if doc_uuid is None:
+        return None
+    db = SessionLocal()
+    try:
+        return [row.chunk_id for row in crud.get_document_chunks(db, doc_uuid)]
+    finally:
+        db.close()
+
+def save_stored_chunk_ids(document_id, chunk_ids: List[tuple]):
+    doc_uuid = _as_uuid(document_id)
+    if doc_uuid is None:
+        return
+    db = SessionLocal()
+    try:
+        crud.replace_document_chunks(db, doc_uuid, [
+            {"chunk_id": chunk_id, "fingerprint": fingerprint, "chunk_index": idx}
+            for idx, (chunk_id, fingerprint) in enumerate(chunk_ids)
+        ])
+    finally:
+        db.close()
+
+def _stored_pages(json_blob_name: str) -> Iterator[dict]:
+    # Open processed output as a page stream (JSONL records, or a legacy JSON document)
+    yield from open_page_stream(AZURE_STORAGE_CONTAINER_NAME, json_blob_name).pages
+
+def process_chunking_and_embedding(json_blob_name: str, metadata: dict):
+    """
+    Standalone entry point (e.g. reprocessing): chunk and embed the processed pages
+    stored at `json_blob_name`, streamed from Blob. The worker hands freshly
+    extracted pages over in memory through chunk_and_embed_pages instead.
+    """
+    logging.info(f"[ChunkEmbed] Starting for blob '{json_blob_name}' (Job ID: {metadata.get('job_id', 'unknown')})")
+    return chunk_and_embed_pages(_stored_pages(json_blob_name), metadata)
+
+def chunk_and_embed_pages(pages: Iterable[dict], metadata: dict,
+                          embed: Optional[Callable[[List[str]], List[List[float]]]] = None):
+    """
+    Chunk page records as they arrive, generate embeddings, store in MosaicDB,
+    and update job status — in bounded batches, so memory does not grow with
+    document size. Extraction (iterating `pages`), chunking, embedding and
+    storing run as overlapping pipeline stages (see the `pipeline` config).
+    `embed` replaces the embedding call, e.g. with a CoalescingEmbedder shared by
+    the documents of one message batch.
+    On re-ingest only new or changed chunks are embedded; stale ones are deleted.
+    Each stored batch is checkpointed, so a retry resumes after the last one.
+    Returns counts of chunks embedded / skipped (unchanged) / deleted / resumed.
+    Errors (including extraction errors raised while `pages` is consumed) mark
+    the job FAILED and are re-raised, so the message is retried.
+    """
+    job_id = metadata.get("job_id", "unknown")
+    document_id = metadata.get("document_id", job_id)
+
+    try:
+        # Chunk ids are fingerprints; diff them against the previous ingest of this document
+        codec = get_codec()
+        namespace = f"{get_provider().model_id}|{codec.name}"
+        previous_ids = load_stored_chunk_ids(document_id) if INGEST_INCREMENTAL else None
+        previous = set(previous_ids or [])
+        embed = embed or (embed_with_near_dedup if DEDUP_ENABLED else generate_embeddings)
+        # Chunk batches stored by an interrupted earlier attempt
+        done = load_checkpoints(document_id, EMBEDDING_STAGE)
+
+        chunk_ids = []
+        occurrences = {}
+        stats = {"chunks": 0, "embedded": 0, "skipped": 0, "deleted": 0, "resumed": 0}
+
+        def plan_batches() -> Iterator[ChunkBatch]:
+            # Chunk stage (single pass; keeps page numbers and offsets) while pages stream
+            # in from the extraction thread. Sequential: chunk ids depend on earlier chunks.
+            page_texts = iter_page_texts(prefetch(pages, PIPELINE_PAGE_QUEUE, name="extract"))
+            for batch in iter_batches_of(iter_chunks(page_texts), INGEST_STREAM_BATCH_CHUNKS):
+                chunks = [c.text for c in batch]
+                refs = [c.ref() for c in batch]
+                batch_ids = assign_chunk_ids(chunks, namespace, occurrences)
+                start = len(chunk_ids)
+                chunk_ids.extend(batch_ids)
+                ids = [chunk_id for chunk_id, _ in batch_ids]
+                stats["chunks"] += len(chunks)
+
+                # Same positions and same chunk ids → this batch is already stored
+                checkpoint = done.get(start)
+                if checkpoint and checkpoint.end == start + len(ids) and checkpoint.marker == batch_marker(ids):
+                    stats["resumed"] += len(ids)
+                    continue
+
+                diff = diff_chunks(previous, ids)
+                stats["embedded"] += len(diff.new)
+                stats["skipped"] += len(diff.kept)
+                yield ChunkBatch(start, chunks, refs, ids, diff)
+
+        def embed_batch(batch: ChunkBatch):
+            # Embedding stage: near-duplicates reuse an existing vector when enabled,
+            # and vectors are compacted by the (opt-in) codec. Without it raw floats go
+            # to the store, which encodes them as mosaicdb.vector_encoding
+            if not batch.diff.new:
+                return batch, None
+            vectors = embed([batch.chunks[i] for i in batch.diff.new])
+            return batch, codec.encode(vectors) if VECTOR_CODEC_ENABLED else vectors
+
+        def store_batch(embedded):
+            # Store stage: only new/changed chunks are inserted; unchanged chunks keep
+            # their vectors and only get their page/offset refs refreshed
+            batch, vectors = embedded
+            new, kept = batch.diff.new, batch.diff.kept
+            if new:
+                store_embeddings(
+                    document_id=document_id,
+                    chunks=[batch.chunks[i] for i in new],
+                    vectors=vectors,
+                    metadata=metadata,
+                    chunk_refs=[batch.refs[i] for i in new],
+                    chunk_ids=[batch.ids[i] for i in new]
+                )
+            if kept:
+                update_chunk_refs(document_id, [batch.ids[i] for i in kept], [batch.refs[i] for i in kept])
+            record_checkpoint(document_id, EMBEDDING_STAGE, batch.start, batch.start + len(batch.ids),
+                              marker=batch_marker(batch.ids))
+
+        # extract → chunk → embed → store run concurrently; each stage's bounded
+        # window holds the stages before it back when it falls behind
+        embedded = map_in_order(embed_batch, plan_batches(), PIPELINE_EMBED_WORKERS,
+                                PIPELINE_EMBED_QUEUE, name="embed")
+        for _ in map_in_order(store_batch, embedded, PIPELINE_STORE_WORKERS, PIPELINE_STORE_QUEUE, name="store"):
+            pass
+
+        logging.info(f"[ChunkEmbed] Created {stats['chunks']} chunks for job {job_id}")
+        stale = diff_chunks(previous, [chunk_id for chunk_id, _ in chunk_ids]).stale
+        if stale:
+            delete_embeddings(document_id, stale)
+        if INGEST_INCREMENTAL:
+            save_stored_chunk_ids(document_id, chunk_ids)
+        clear_checkpoints(document_id, EMBEDDING_STAGE)
+
+        stats["deleted"] = len(stale)
+        if DEDUP_ENABLED:
+            stats["dedup"] = get_near_duplicate_index().stats()
+        logging.info(f"[ChunkEmbed] Job {job_id}: {stats}")
+
+        update_job_status(job_id, status="COMPLETED")
+        logging.info(f"[ChunkEmbed] Job {job_id} completed successfully.")
+        return stats
+
+    except Exception as e:
+        logging.error(f"[ChunkEmbed] Error in chunk/embed for job {job_id}: {e}", exc_info=True)
+        update_job_status(job_id, status="FAILED", error_message=str(e))
+        raise
@@ -0,0 +1,64 @@
+# functions/content_router.py
+"""
+Content Router — checks what a blob actually is and picks its worker queue.
+The format is sniffed with ranged reads (see utils/sniff_utils), so mislabeled,
+encrypted and corrupt uploads are caught before any full download or parser
+import; the file extension is only used to report mismatches. Accepted documents
+go to the worker queue (worker_batch.queue_name) of their lane: large documents
+(by size or probed page count) to its bulk queue (utils/lane_utils).
+"""
+
+from pathlib import Path
+from typing import NamedTuple, Optional
+from utils.logging_utils import get_logger
+from utils.sniff_utils import EXTENSION_KINDS, Sniffed, sniff_blob
+from utils.lane_utils import LATENCY, choose_lane, lane_queue
+from config import SNIFF_REJECT_ENCRYPTED_PDF, WORKER_BATCH_QUEUE_NAME
+
+logger = get_logger(__name__)
+
+
+class Route(NamedTuple):
+    queue: Optional[str]          # None when the document is rejected
+    sniffed: Sniffed
+    error: Optional[str] = None
+    lane: str = LATENCY
+
+    def message_fields(self) -> dict:
+        """What the router learned, for the processing message."""
+        return {
+            "extension": f".{self.sniffed.kind}",
+            "content_type": self.sniffed.kind,
+            "pdf_kind": self.sniffed.pdf_kind,
+            "encrypted": self.sniffed.encrypted,
+            "lane": self.lane,
+            "pages": self.sniffed.pages,
+            "size_bytes": self.sniffed.size,
+        }
+
+
+def queue_for(sniffed: Sniffed) -> Route:
+    """
+    Worker queue for a sniffed document (every format goes to the same worker, which
+    picks its processor by content type), or a rejection reason.
+    """
+    if not sniffed.ok:
+        return Route(None, sniffed, f"Rejected {sniffed.status} file: {sniffed.detail}")
+    if sniffed.encrypted and SNIFF_REJECT_ENCRYPTED_PDF:
+        return Route(None, sniffed, "Rejected encrypted PDF")
+    return Route(WORKER_BATCH_QUEUE_NAME, sniffed)
+
+def route_blob(container: str, blob_path: str, size_bytes: Optional[int] = None) -> Route:
+    """Sniff a blob (ranged reads only) and pick its lane and the worker queue for it."""
+    sniffed = sniff_blob(blob_path, container)
+    claimed = EXTENSION_KINDS.get(Path(blob_path).suffix.lower())
+    if sniffed.kind and sniffed.kind != claimed:
+        logger.warning(f"{container}/{blob_path}: extension says {claimed or 'unknown'}, content is {sniffed.kind}")
+    route = queue_for(sniffed)
+    if route.error:
+        logger.warning(f"{container}/{blob_path}: {route.error}")
+        return route
+    lane, reason = choose_lane(sniffed, size_bytes)
+    if lane != LATENCY:
+        logger.info(f"{container}/{blob_path}: {lane} lane ({reason})")
+    return route._replace(queue=lane_queue(route.queue, lane), lane=lane)
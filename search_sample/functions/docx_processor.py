@@ -1,44 +1,170 @@
-# functions/docx_processor.py
-"""
-DOCX Processor — directly extracts paragraphs and table text from DOCX.
-"""
-
-from io import BytesIO
-from docx import Document
-from utils.blob_utils import download_blob_to_bytes, upload_json
-from utils.db_utils import get_document_metadata
-from utils.helpers import normalize_whitespace
-
-
-def process_docx_direct(document_id: int, blob_path: str, output_blob_path: str):
-    """
-    Directly parse DOCX and upload combined text JSON.
-    """
-    docx_bytes = download_blob_to_bytes(blob_path)
-    doc = Document(BytesIO(docx_bytes))
-
-    text_chunks = []
-
-    # Extract paragraphs
-    for para in doc.paragraphs:
-        if para.text.strip():
-            text_chunks.append(normalize_whitespace(para.text))
-
-    # Extract tables
-    for table in doc.tables:
-        for row in table.rows:
-            row_text = " | ".join(normalize_whitespace(cell.text) for cell in row.cells)
-            text_chunks.append(row_text)
-
-    # Metadata from DB
-    metadata = get_document_metadata(document_id)
-
-    output_data = {
-        "document_id": document_id,
-        "metadata": metadata,
-        "pages": [{"page": 1, "text": "\n".join(text_chunks)}]  # DOCX has no real pages
-    }
-
-    # Upload JSON to Azure Blob
-    upload_json(output_data, output_blob_path)
-    print(f"[DOCX Processor] Uploaded JSON to {output_blob_path}")
+# functions/docx_processor.py
+"""
+DOCX Processor — directly extracts paragraphs and table text from DOCX.
+word/document.xml is parsed incrementally (iterparse) straight from the downloaded
+bytes; paragraphs and table rows come out in document order and parsed elements
+are cleared and detached from their parent as we go, so no DOM of the document
+is ever built and memory stays flat however long the document is.
+"""
+
+import io
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import Iterator, List, Optional, Tuple
+from utils.blob_utils import download_blob_to_bytes
+from utils.page_stream import write_pages
+from utils.db_utils import get_document_metadata
+from utils.helpers import normalize_whitespace
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_P, _T, _TAB, _BR, _CR = f"{_W}p", f"{_W}t", f"{_W}tab", f"{_W}br", f"{_W}cr"
+_TBL, _TR, _TC = f"{_W}tbl", f"{_W}tr", f"{_W}tc"
+_RENDERED_BREAK, _PAGE_BREAK_BEFORE = f"{_W}lastRenderedPageBreak", f"{_W}pageBreakBefore"
+_SECT_PR, _TYPE, _VAL = f"{_W}sectPr", f"{_W}type", f"{_W}val"
+
+def iter_docx_blocks(docx_bytes: bytes, page_breaks: bool = False) -> Iterator[Tuple[str, str]]:
+    """
+    Yield ("paragraph", text) and ("table_row", "cell | cell | ...") in document order.
+    Text inside table cells (including nested tables) is folded into its top-level cell.
+    With `page_breaks`, ("page_break", "") marks where Word last rendered a page break,
+    an explicit page break, a page-break-before paragraph or a new-page section break;
+    breaks inside a paragraph split it, breaks inside a table take effect after the row.
+    A section's start type is stored in its own sectPr, after its content, so the
+    blocks following a section break are held (as text) until the next section's
+    properties are parsed and say whether the break starts a new page.
+    """
+    held: Optional[List[Tuple[str, str]]] = None    # blocks after a section break
+    for kind, text in _iter_blocks(docx_bytes, page_breaks):
+        if kind != "section_end":
+            if held is None:
+                yield kind, text
+            else:
+                held.append((kind, text))
+            continue
+        # `text` is the start type of the section that just ended
+        if held is not None:
+            if text != "continuous":
+                yield "page_break", ""
+            yield from held
+        held = []
+    if held:
+        # No properties for the last section: Word's default is a new page
+        yield "page_break", ""
+        yield from held
+
+def _section_type(sect_pr) -> str:
+    """How a section starts ("nextPage", "continuous", ...), from its parsed sectPr."""
+    section_type = sect_pr.find(_TYPE)
+    return section_type.get(_VAL, "nextPage") if section_type is not None else "nextPage"
+
+def _iter_blocks(docx_bytes: bytes, page_breaks: bool) -> Iterator[Tuple[str, str]]:
+    """iter_docx_blocks' events, with ("section_end", start type) after each section's content."""
+    with zipfile.ZipFile(io.BytesIO(docx_bytes)) as archive, archive.open("word/document.xml") as xml:
+        table_depth = 0
+        paragraph_depth = 0
+        parts = []
+        cells = []
+        break_pending = False   # page break to emit once the current paragraph / row ends
+        section_end = None      # start type of a section ending with the current paragraph
+        open_elements = []      # ancestors of the current element, to detach finished ones
+        for event, elem in ET.iterparse(xml, events=("start", "end")):
+            tag = elem.tag
+            if event == "start":
+                open_elements.append(elem)
+                if tag == _TBL:
+                    table_depth += 1
+                elif tag == _P:
+                    paragraph_depth += 1
+                continue
+            open_elements.pop()
+
+            if tag == _T:
+                parts.append(elem.text or "")
+            elif tag == _TAB:
+                parts.append("\t")
+            elif tag in (_BR, _CR):
+                if elem.get(_TYPE) != "page":
+                    parts.append("\n")
+                elif page_breaks and table_depth == 0:
+                    yield from _split_paragraph(parts)
+                else:
+                    break_pending = True
+            elif page_breaks and (tag == _RENDERED_BREAK or (tag == _PAGE_BREAK_BEFORE and _is_on(elem))):
+                if table_depth == 0:
+                    yield from _split_paragraph(parts)
+                else:
+                    break_pending = True
+            elif tag == _SECT_PR and page_breaks and table_depth == 0:
+                # In a paragraph's properties: the section ends with that paragraph.
+                # The body's final sectPr closes the last section right away.
+                if paragraph_depth:
+                    section_end = _section_type(elem)
+                else:
+                    yield "section_end", _section_type(elem)
+            elif tag == _P:
+                paragraph_depth -= 1
+                if table_depth == 0:
+                    text = normalize_whitespace("".join(parts))
+                    parts = []
+                    if text:
+                        yield "paragraph", text
+                    if break_pending and page_breaks:
+                        yield "page_break", ""
+                        break_pending = False
+                    if section_end is not None:
+                        yield "section_end", section_end
+                        section_end = None
+                else:
+                    parts.append("\n")
+                _detach(elem, open_elements)
+            elif tag == _TC and table_depth == 1:
+                cells.append(normalize_whitespace("".join(parts)))
+                parts = []
+            elif tag == _TR and table_depth == 1:
+                yield "table_row", " | ".join(cells)
+                cells = []
+                if break_pending and page_breaks:
+                    yield "page_break", ""
+                    break_pending = False
+                _detach(elem, open_elements)
+            elif tag == _TBL:
+                table_depth -= 1
+                _detach(elem, open_elements)
+
+def _detach(elem, open_elements: list):
+    """Drop a finished element: clear it and remove it from its parent (clearing alone keeps it in the tree)."""
+    elem.clear()
+    if open_elements:
+        open_elements[-1].remove(elem)
+
+def _is_on(elem) -> bool:
+    """OOXML on/off property: on unless w:val is "0", "false" or "off"."""
+    return elem.get(_VAL) not in ("0", "false", "off")
+
+def _split_paragraph(parts: list) -> Iterator[Tuple[str, str]]:
+    """Emit the paragraph text seen so far, then a page break (the rest follows on the next page)."""
+    text = normalize_whitespace("".join(parts))
+    parts.clear()
+    if text:
+        yield "paragraph", text
+    yield "page_break", ""
+
+
+def process_docx_direct(document_id: int, blob_path: str, output_blob_path: str):
+    """
+    Directly parse DOCX and upload combined text as a page stream.
+    """
+    docx_bytes = download_blob_to_bytes(blob_path)
+
+    # Extract paragraphs and table rows, in document order
+    text_chunks = [text for _, text in iter_docx_blocks(docx_bytes)]  # no page_break events by default
+
+    # Metadata from DB
+    metadata = get_document_metadata(document_id)
+
+    pages = [{"page": 1, "text": "\n".join(text_chunks)}]  # DOCX has no real pages
+
+    # Stream page records to Azure Blob
+    output_container, output_blob = output_blob_path.split("/", 1)
+    write_pages(output_container, output_blob, document_id, metadata, pages)
+    print(f"[DOCX Processor] Uploaded page stream to {output_blob_path}")
@@ -1,37 +1,76 @@
-import io
-import tempfile
-from utils.blob_utils import download_blob_to_bytes
-from functions.pdf_processor import process_pdf
-from docx import Document
-from docx2pdf import convert
-
-def process_docx(blob_path: str, container_name: str = "documents", output_container: str = "processed"):
-    """
-    Process a DOCX/DOC file:
-    - Download from Azure Blob
-    - Convert to PDF in memory (temp only for conversion step)
-    - Call process_pdf() to handle extraction
-    """
-    # Download DOCX/DOC into memory
-    docx_bytes = download_blob_to_bytes(blob_path, container_name)
-
-    with tempfile.NamedTemporaryFile(suffix=".docx", delete=False) as temp_docx:
-        temp_docx.write(docx_bytes)
-        temp_docx_path = temp_docx.name
-
-    # Convert DOCX to PDF (docx2pdf only works with paths)
-    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as temp_pdf:
-        temp_pdf_path = temp_pdf.name
-
-    convert(temp_docx_path, temp_pdf_path)
-
-    # Read PDF back into memory and send to PDF processor
-    with open(temp_pdf_path, "rb") as f:
-        pdf_bytes = f.read()
-
-    # Instead of saving to blob again, just call process_pdf with in-memory PDF
-    pdf_blob_path = blob_path.rsplit(".", 1)[0] + ".pdf"
-    from utils.blob_utils import upload_file
-    upload_file(io.BytesIO(pdf_bytes), pdf_blob_path, container_name=container_name)
-
-    return process_pdf(pdf_blob_path, container_name=container_name, output_container=output_container)
+# functions/docx_processor_1.py
+"""
+DOCX Processor (paged) — Linux-native, no DOCX → PDF conversion.
+Produces the PDF processor's per-page schema ({"page_number", "combined_text"}) so
+chunking downstream is unchanged. Word does not store page layout, so page
+boundaries are approximated from the page breaks Word last rendered
+(w:lastRenderedPageBreak), explicit page breaks, page-break-before paragraphs and
+new-page section breaks.
+"""
+
+from typing import Iterator, Optional
+from utils.blob_utils import download_blob_to_bytes
+from utils.db_utils import get_document_metadata
+from utils.helpers import normalize_whitespace
+from utils.page_stream import processed_blob_name, write_pages
+from functions.docx_processor import iter_docx_blocks
+
+
+def iter_docx_pages(docx_bytes: bytes) -> Iterator[dict]:
+    """
+    Yield {"page_number", "combined_text"} per approximate page, in order.
+    Breaks with no text since the previous one (e.g. an explicit break that Word
+    also recorded as rendered) do not create empty pages.
+    """
+    page_number = 1
+    lines = []
+    for kind, text in iter_docx_blocks(docx_bytes, page_breaks=True):
+        if kind != "page_break":
+            lines.append(text)
+        elif lines:
+            yield {"page_number": page_number, "combined_text": normalize_whitespace(" ".join(lines))}
+            page_number += 1
+            lines = []
+    if lines or page_number == 1:
+        yield {"page_number": page_number, "combined_text": normalize_whitespace(" ".join(lines))}
+
+
+def process_docx(blob_path: str, container_name: str = "documents", output_container: str = "processed",
+                 document_id: Optional[str] = None, output_blob: Optional[str] = None):
+    """
+    Process a DOCX file:
+    - Download from Azure Blob (in memory)
+    - Split into approximate pages straight from word/document.xml
+    - Stream page records to `output_container` with the PDF processor's schema
+      (as `output_blob`, or the input name with a .jsonl / .json extension)
+    """
+    docx_bytes = download_blob_to_bytes(blob_path, container_name)
+    metadata = get_document_metadata(document_id) if document_id else {}
+
+    output_blob = output_blob or processed_blob_name(blob_path.rsplit(".", 1)[0])
+    page_count = write_pages(output_container, output_blob, document_id, metadata, iter_docx_pages(docx_bytes))
+
+    print(f"[DOCX Processor] Processed '{container_name}/{blob_path}' -> '{output_container}/{output_blob}' ({page_count} pages)")
+    return f"{output_container}/{output_blob}"
+
+
+# Azure Function entry (docx-processing-queue)
+def main(msg: dict):
+    """
+    Azure Function trigger entry point.
+    Expected msg:
+      {
+        "input_blob": "container/blobname.docx",
+        "output_blob": "container/blobname.json",
+        "document_id": "12345"
+      }
+    """
+    container_name, blob_path = msg["input_blob"].split("/", 1)
+    output_container, output_blob = msg["output_blob"].split("/", 1)
+    process_docx(
+        blob_path,
+        container_name=container_name,
+        output_container=output_container,
+        document_id=msg["document_id"],
+        output_blob=output_blob
+    )
@@ -1,36 +1,47 @@
-# job_manager/__init__.py
-import logging
-import json
-import azure.functions as func
-from utils.blob_utils import get_blob_metadata
-from utils.servicebus_utils import send_servicebus_message
-
-def main(event: func.EventGridEvent):
-    try:
-        event_data = event.get_json()
-        blob_url = event_data["url"]
-
-        # Example blob_url:
-        # https://<account>.blob.core.windows.net/<container>/<path/to/file.pdf>
-        blob_path = "/".join(blob_url.split("/", 4)[4:])  # after container name
-        extension = blob_path.split(".")[-1].lower()
-
-        # Pull metadata directly from blob
-        metadata = get_blob_metadata(blob_path)
-
-        logging.info(f"[JobManager] New blob uploaded: {blob_path} ({extension})")
-
-        # Prepare job payload for Service Bus
-        job_payload = {
-            "blob_path": blob_path,
-            "extension": extension,
-            "metadata": metadata,
-            "stage": "processor"
-        }
-
-        send_servicebus_message(job_payload)
-        logging.info(f"[JobManager] Sent job to Service Bus: {job_payload}")
-
-    except Exception as e:
-        logging.error(f"[JobManager] Error handling Event Grid event: {e}")
-        raise
+# job_manager/__init__.py
+import logging
+import json
+import time
+import azure.functions as func
+from functions.content_router import route_blob
+from utils import servicebus_utils
+from utils.blob_utils import get_blob_metadata
+
+def main(event: func.EventGridEvent):
+    try:
+        event_data = event.get_json()
+        blob_url = event_data["url"]
+
+        # Example blob_url:
+        # https://<account>.blob.core.windows.net/<container>/<path/to/file.pdf>
+        container, blob_path = blob_url.split("/", 4)[3:]
+
+        # Sniff the real format and size (ranged reads) to pick the worker lane
+        route = route_blob(container, blob_path, event_data.get("contentLength"))
+        if route.error:
+            logging.error(f"[JobManager] Not queued: {blob_path}: {route.error}")
+            return
+
+        # Pull metadata directly from blob
+        metadata = get_blob_metadata(blob_path, container)
+
+        logging.info(f"[JobManager] New blob uploaded: {blob_path} ({route.sniffed.kind}, {route.lane} lane)")
+
+        # Prepare job payload for Service Bus
+        job_payload = {
+            "blob_path": blob_path,
+            "container": container,
+            "metadata": metadata,
+            "team_id": metadata.get("team_id"),
+            "stage": "processor",
+            **route.message_fields(),
+            "enqueued_at": time.time(),
+        }
+
+        # jobs-queue, or jobs-queue-bulk (worker_batch_bulk) for the bulk lane
+        servicebus_utils.send_message(route.queue, job_payload)
+        logging.info(f"[JobManager] Sent job to {route.queue}: {json.dumps(job_payload, default=str)}")
+
+    except Exception as e:
+        logging.error(f"[JobManager] Error handling Event Grid event: {e}")
+        raise
@@ -1,84 +1,240 @@
-# functions/pdf_processor.py
-
-"""
-PDF Processor — Page-wise combined text with metadata.
-Uses PyMuPDF for text extraction, falls back to OCR for image-only PDFs.
-"""
-
-import fitz  # PyMuPDF
-import io
-from utils.helpers import extract_images_from_pdf_page, ocr_image_pil, normalize_whitespace
-from utils.blob_utils import upload_json
-from utils.db_utils import get_document_metadata
-# from azure.storage.blob import BlobServiceClient
-# from config import AZURE_STORAGE_CONNECTION_STRING
-
-
-def process_pdf(input_blob_path: str, output_blob_path: str, document_id: str):
-    """
-    Process PDF from Azure Blob directly in memory.
-    """
-    # Step 1: Read PDF bytes directly from Blob
-    # blob_service = BlobServiceClient.from_connection_string(AZURE_STORAGE_CONNECTION_STRING)
-    # container_name, blob_name = input_blob_path.split("/", 1)
-    # blob_client = blob_service.get_blob_client(container=container_name, blob=blob_name)
-    # pdf_bytes = blob_client.download_blob().readall()
-
-    pdf_bytes = download_blob_to_bytes(blob_path, container_name)
-    pdf_stream = io.BytesIO(pdf_bytes)
-
-    # Step 2: Get metadata from DB
-    metadata = get_document_metadata(document_id)
-
-    # Step 3: Process PDF
-    pdf_doc = fitz.open(stream=pdf_stream, filetype="pdf")
-    pages_output = []
-
-    for page_index, page in enumerate(pdf_doc):
-        # Extract text
-        text = normalize_whitespace(page.get_text("text"))
-
-        # If text empty → OCR from images
-        if not text.strip():
-            images = extract_images_from_pdf_page(page)
-            ocr_text_parts = []
-            for img in images:
-                ocr_text_parts.append(ocr_image_pil(img))
-            text = normalize_whitespace(" ".join(ocr_text_parts))
-
-        pages_output.append({
-            "page_number": page_index + 1,
-            "combined_text": text
-        })
-
-    pdf_doc.close()
-
-    # Step 4: Build output JSON
-    output_data = {
-        "document_id": document_id,
-        "metadata": metadata,
-        "pages": pages_output
-    }
-
-    # Step 5: Upload JSON to Blob
-    upload_json(output_data, output_blob_path)
-
-    print(f"[PDF Processor] Processed '{input_blob_path}' -> '{output_blob_path}'")
-
-
-# Azure Function entry
-def main(msg: dict):
-    """
-    Azure Function trigger entry point.
-    Expected msg:
-      {
-        "input_blob": "container/blobname.pdf",
-        "output_blob": "container/blobname.json",
-        "document_id": "12345"
-      }
-    """
-    process_pdf(
-        input_blob_path=msg["input_blob"],
-        output_blob_path=msg["output_blob"],
-        document_id=msg["document_id"]
-    )
+# functions/pdf_processor.py
+
+"""
+PDF Processor — Page-wise combined text with metadata.
+Uses PyMuPDF for text extraction, falls back to OCR for image-only PDFs
+(selected and rescaled images, OCR'd on a bounded process pool).
+Large PDFs are extracted page-parallel on a process pool; each worker opens
+the document once from the shared bytes and results are returned in page order.
+"""
+
+import fitz  # PyMuPDF
+import io
+import os
+import math
+import hashlib
+from collections import deque
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Tuple
+from utils.helpers import normalize_whitespace, process_pool_context
+from utils.layout_utils import extract_layout
+from utils.ocr_utils import prepare_page_images, ocr_images, ocr_stats
+from utils.blob_utils import download_blob_to_bytes
+from utils.page_stream import RangedPageWriter, open_page_stream, write_pages
+from utils.checkpoint_utils import EXTRACTION_STAGE, load_checkpoints, record_checkpoint, clear_checkpoints
+from utils.db_utils import get_document_metadata
+from config import PDF_WORKERS, PDF_PARALLEL_MIN_PAGES, PDF_PAGES_PER_TASK, OUTPUT_FORMAT
+# from azure.storage.blob import BlobServiceClient
+# from config import AZURE_STORAGE_CONNECTION_STRING
+
+
+def _extract_page(page, page_index: int, ocr_memo: dict) -> dict:
+    # One layout pass: text, table candidates and image references together
+    layout = extract_layout(page)
+    text = normalize_whitespace(layout.text)
+
+    page_output = {
+        "page_number": page_index + 1,
+        "combined_text": text
+    }
+    if layout.tables:
+        page_output["tables"] = [[" | ".join(row) for row in table] for table in layout.tables]
+    if layout.images:
+        page_output["images"] = layout.images
+    # If text empty → queue the page's OCR-worthy images for the OCR stage
+    if not text.strip() and layout.images:
+        page_output["ocr_images"] = prepare_page_images(page, ocr_memo)
+    return page_output
+
+def _ocr_pages(pages_output: List[dict]) -> List[dict]:
+    """OCR stage: run every queued image of a page batch through the OCR pool at once."""
+    jobs = [(page, image) for page in pages_output for image in page.pop("ocr_images", [])]
+    if not jobs:
+        return pages_output
+    texts = ocr_images([image for _, image in jobs])
+    parts = {}
+    for (page, _), text in zip(jobs, texts):
+        parts.setdefault(id(page), []).append(text)
+    for page in pages_output:
+        if id(page) in parts:
+            page["combined_text"] = normalize_whitespace(" ".join(parts[id(page)]))
+    return pages_output
+
+
+# Per-worker document and OCR memo, set up once by the pool initializer
+_worker_doc = None
+_worker_ocr_memo = {}
+
+def _init_worker(pdf_bytes: bytes):
+    global _worker_doc
+    _worker_doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+
+def _extract_range(start: int, stop: int) -> List[dict]:
+    return [_extract_page(_worker_doc[i], i, _worker_ocr_memo) for i in range(start, stop)]
+
+
+def resolve_workers(workers: Optional[int] = None) -> int:
+    """Configured worker count; 0 means one per CPU."""
+    workers = PDF_WORKERS if workers is None else workers
+    return workers or os.cpu_count() or 1
+
+def _plan_ranges(page_count: int, per_range: int, done: Iterable[Tuple[int, int]] = ()) -> List[Tuple[int, int]]:
+    """Split the pages not covered by `done` ranges into [start, stop) ranges of at most `per_range` pages."""
+    gaps, pos = [], 0
+    for start, stop in sorted(done):
+        if start > pos:
+            gaps.append((pos, start))
+        pos = max(pos, stop)
+    if pos < page_count:
+        gaps.append((pos, page_count))
+    return [(start, min(start + per_range, stop)) for gap_start, stop in gaps for start in range(gap_start, stop, per_range)]
+
+def iter_extracted_ranges(pdf_bytes: bytes, workers: Optional[int] = None,
+                          min_pages: int = PDF_PARALLEL_MIN_PAGES,
+                          done: Iterable[Tuple[int, int]] = ()) -> Iterator[Tuple[int, int, List[dict]]]:
+    """
+    Yield (start, stop, pages) for every page range of a PDF not covered by `done`,
+    in page order; pages are {"page_number", "combined_text"} and pages without a
+    text layer are OCR'd per range. Documents with fewer than `min_pages` pages
+    (or a single worker) stay serial; larger ones are split into contiguous page
+    ranges for a process pool, with at most two ranges per worker in flight so
+    memory stays bounded.
+    """
+    workers = resolve_workers(workers)
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as pdf_doc:
+        page_count = pdf_doc.page_count
+        if workers <= 1 or page_count < min_pages:
+            ocr_memo = {}
+            for start, stop in _plan_ranges(page_count, PDF_PAGES_PER_TASK or 16, done):
+                yield start, stop, _ocr_pages([_extract_page(pdf_doc[i], i, ocr_memo) for i in range(start, stop)])
+            return
+
+    # Several ranges per worker keep the pool busy when page costs are uneven
+    per_task = PDF_PAGES_PER_TASK or max(1, math.ceil(page_count / (workers * 4)))
+    planned = _plan_ranges(page_count, per_task, done)
+    if not planned:
+        return
+    ranges = iter(planned)
+
+    # Workers start from a clean process (never forked from our threads) and get
+    # the document through the initializer
+    with ProcessPoolExecutor(max_workers=min(workers, len(planned)), mp_context=process_pool_context(),
+                             initializer=_init_worker, initargs=(pdf_bytes,)) as pool:
+        in_flight = deque((page_range, pool.submit(_extract_range, *page_range)) for page_range in islice(ranges, workers * 2))
+        while in_flight:
+            (start, stop), future = in_flight.popleft()
+            pages = future.result()
+            next_range = next(ranges, None)
+            if next_range is not None:
+                in_flight.append((next_range, pool.submit(_extract_range, *next_range)))
+            yield start, stop, _ocr_pages(pages)
+
+def iter_extracted_pages(pdf_bytes: bytes, workers: Optional[int] = None,
+                         min_pages: int = PDF_PARALLEL_MIN_PAGES) -> Iterator[dict]:
+    """Yield every page of a PDF, in page order (see iter_extracted_ranges)."""
+    for _, _, pages in iter_extracted_ranges(pdf_bytes, workers, min_pages):
+        yield from pages
+
+def _iter_new_ranges_resumable(pdf_bytes: bytes, document_id, metadata: dict, output_container: str,
+                               output_blob: str, resumed: list) -> Iterator[Tuple[int, int, List[dict]]]:
+    """
+    Yield (start, stop, pages) for the ranges not finished by an earlier attempt,
+    staging and checkpointing each one before it is yielded; the page stream is
+    committed once every range is done. Finished ranges are appended to `resumed`.
+    """
+    source_hash = hashlib.sha256(pdf_bytes).hexdigest()
+    writer = RangedPageWriter(output_container, output_blob, document_id, metadata, source_hash)
+    staged = writer.available()
+    done = [cp for cp in load_checkpoints(document_id, EXTRACTION_STAGE, source_hash).values() if cp.marker in staged]
+    resumed.extend(done)
+    markers = {cp.start: cp.marker for cp in done}
+
+    for start, stop, pages in iter_extracted_ranges(pdf_bytes, done=[(cp.start, cp.end) for cp in done]):
+        markers[start] = writer.write_range(start, stop, pages)
+        record_checkpoint(document_id, EXTRACTION_STAGE, start, stop, source_hash, markers[start])
+        yield start, stop, pages
+
+    writer.commit(markers[start] for start in sorted(markers))
+    clear_checkpoints(document_id, EXTRACTION_STAGE)
+    if done:
+        print(f"[PDF Processor] Resumed: {sum(cp.end - cp.start for cp in done)} pages reused from checkpoints")
+
+def extract_pages_resumable(pdf_bytes: bytes, document_id, metadata: dict,
+                            output_container: str, output_blob: str) -> int:
+    """
+    Extract a PDF into a JSONL page stream, one staged range at a time, recording
+    a checkpoint per range. A retry for the same bytes reuses the staged ranges
+    and only extracts (and OCRs) the rest. Returns the number of pages extracted now.
+    """
+    ranges = _iter_new_ranges_resumable(pdf_bytes, document_id, metadata, output_container, output_blob, [])
+    return sum(stop - start for start, stop, _ in ranges)
+
+def iter_pages_resumable(pdf_bytes: bytes, document_id, metadata: dict,
+                         output_container: str, output_blob: str) -> Iterator[dict]:
+    """
+    Every page of a PDF, in page order, while it is written to a checkpointed JSONL
+    page stream (see extract_pages_resumable). Pages are handed over as they are
+    extracted; when an earlier attempt already finished some ranges (staged blocks
+    cannot be read back), only the rest is extracted and the pages are then read
+    from the committed stream.
+    """
+    resumed = []
+    ranges = _iter_new_ranges_resumable(pdf_bytes, document_id, metadata, output_container, output_blob, resumed)
+    first = next(ranges, None)
+    if not resumed:
+        if first is not None:
+            yield from first[2]
+        for _, _, pages in ranges:
+            yield from pages
+        return
+    for _ in ranges:
+        pass
+    yield from open_page_stream(output_container, output_blob).pages
+
+def extract_pages(pdf_bytes: bytes, workers: Optional[int] = None,
+                  min_pages: int = PDF_PARALLEL_MIN_PAGES) -> List[dict]:
+    """All pages of a PDF as a list (see iter_extracted_pages)."""
+    return list(iter_extracted_pages(pdf_bytes, workers, min_pages))
+
+
+def process_pdf(input_blob_path: str, output_blob_path: str, document_id: str):
+    """
+    Process PDF from Azure Blob directly in memory; page records are streamed
+    to `output_blob_path` as they are extracted.
+    """
+    # Step 1: Read PDF bytes directly from Blob
+    container_name, blob_path = input_blob_path.split("/", 1)
+    pdf_bytes = download_blob_to_bytes(blob_path, container_name)
+
+    # Step 2: Get metadata from DB
+    metadata = get_document_metadata(document_id)
+
+    # Step 3: Process PDF (page-parallel for large documents) and
+    # Step 4: stream page records to Blob as they are produced (JSONL, checkpointed per page range)
+    output_container, output_blob = output_blob_path.split("/", 1)
+    if OUTPUT_FORMAT == "jsonl":
+        page_count = extract_pages_resumable(pdf_bytes, document_id, metadata, output_container, output_blob)
+    else:
+        page_count = write_pages(output_container, output_blob, document_id, metadata, iter_extracted_pages(pdf_bytes))
+
+    print(f"[PDF Processor] OCR: {ocr_stats()}")
+    print(f"[PDF Processor] Processed '{input_blob_path}' -> '{output_blob_path}' ({page_count} pages)")
+
+
+# Azure Function entry
+def main(msg: dict):
+    """
+    Azure Function trigger entry point.
+    Expected msg:
+      {
+        "input_blob": "container/blobname.pdf",
+        "output_blob": "container/blobname.json",
+        "document_id": "12345"
+      }
+    """
+    process_pdf(
+        input_blob_path=msg["input_blob"],
+        output_blob_path=msg["output_blob"],
+        document_id=msg["document_id"]
+    )
@@ -0,0 +1,100 @@
+# functions/pptx_processor.py
+
+"""
+PPTX Processor — per-slide records in the PDF processor's schema.
+Each slide becomes one "page": shape text (grouped shapes included) and tables in
+slide order, followed by the speaker notes, which often carry the substance of a
+deck. Table rows are also kept under "tables" as for PDF pages.
+"""
+
+import io
+from typing import Iterator, List
+from pptx import Presentation
+from pptx.shapes.group import GroupShape
+from utils.helpers import normalize_whitespace
+from utils.blob_utils import download_blob_to_bytes
+from utils.page_stream import write_pages
+from utils.db_utils import get_document_metadata
+
+
+def _iter_shapes(shapes) -> Iterator:
+    # isinstance, not shape_type: shape_type raises for p:sp shapes it cannot classify
+    for shape in shapes:
+        if isinstance(shape, GroupShape):
+            yield from _iter_shapes(shape.shapes)
+        else:
+            yield shape
+
+def _table_rows(table) -> List[str]:
+    rows = (" | ".join(normalize_whitespace(cell.text) for cell in row.cells) for row in table.rows)
+    return [row for row in rows if row.strip(" |")]
+
+def _notes_text(slide) -> str:
+    if not slide.has_notes_slide:
+        return ""
+    notes_frame = slide.notes_slide.notes_text_frame
+    return normalize_whitespace(notes_frame.text) if notes_frame is not None else ""
+
+
+def _extract_slide(slide, slide_index: int) -> dict:
+    parts, tables = [], []
+    for shape in _iter_shapes(slide.shapes):
+        if shape.has_text_frame:
+            parts.append(shape.text_frame.text)
+        elif getattr(shape, "has_table", False):
+            rows = _table_rows(shape.table)
+            if rows:
+                tables.append(rows)
+                parts.extend(rows)
+    notes = _notes_text(slide)
+    if notes:
+        parts.append(notes)
+
+    slide_output = {
+        "page_number": slide_index + 1,
+        "combined_text": normalize_whitespace(" ".join(parts))
+    }
+    if tables:
+        slide_output["tables"] = tables
+    if notes:
+        slide_output["notes"] = notes
+    return slide_output
+
+def iter_pptx_slides(pptx_bytes: bytes) -> Iterator[dict]:
+    """Yield {"page_number", "combined_text", ["tables"], ["notes"]} per slide, in order."""
+    presentation = Presentation(io.BytesIO(pptx_bytes))
+    for slide_index, slide in enumerate(presentation.slides):
+        yield _extract_slide(slide, slide_index)
+
+
+def process_pptx(input_blob_path: str, output_blob_path: str, document_id: str):
+    """
+    Process a PPTX deck from Azure Blob; slide records are streamed to
+    `output_blob_path` as they are extracted.
+    """
+    container_name, blob_path = input_blob_path.split("/", 1)
+    pptx_bytes = download_blob_to_bytes(blob_path, container_name)
+    metadata = get_document_metadata(document_id)
+
+    output_container, output_blob = output_blob_path.split("/", 1)
+    slide_count = write_pages(output_container, output_blob, document_id, metadata, iter_pptx_slides(pptx_bytes))
+
+    print(f"[PPTX Processor] Processed '{input_blob_path}' -> '{output_blob_path}' ({slide_count} slides)")
+
+
+# Azure Function entry (pptx-processing-queue)
+def main(msg: dict):
+    """
+    Azure Function trigger entry point.
+    Expected msg:
+      {
+        "input_blob": "container/blobname.pptx",
+        "output_blob": "container/blobname.json",
+        "document_id": "12345"
+      }
+    """
+    process_pptx(
+        input_blob_path=msg["input_blob"],
+        output_blob_path=msg["output_blob"],
+        document_id=msg["document_id"]
+    )
@@ -0,0 +1,128 @@
+# functions/processor_registry.py
+"""
+Processor registry — detected content type -> processor module.
+Modules are registered by name and imported on first use, so a job only loads
+the parser stack for its own type (a DOCX job never imports PyMuPDF or the
+Tesseract bindings) and cold starts stay cheap. `import_time_report` runs
+`python -X importtime` on a processor module so regressions show up in numbers.
+"""
+
+import re
+import sys
+import importlib
+import subprocess
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+from utils.sniff_utils import PDF, DOCX, XLSX, PPTX
+
+
+class ProcessorSpec(NamedTuple):
+    module: str     # exposes main(msg) taking {"input_blob", "output_blob", "document_id"}
+    extract: str    # module function: file bytes -> page records in the PDF schema
+    resumable: Optional[str] = None     # (bytes, document_id, metadata, container, blob) -> page records,
+                                        # checkpointed into the processed page stream as they are extracted
+
+
+_REGISTRY: Dict[str, ProcessorSpec] = {}
+
+def register(kind: str, module: str, extract: str, resumable: Optional[str] = None):
+    """Register (or replace) the processor for a content type."""
+    _REGISTRY[kind] = ProcessorSpec(module, extract, resumable)
+
+register(PDF, "functions.pdf_processor", "iter_extracted_pages", resumable="iter_pages_resumable")
+register(DOCX, "functions.docx_processor_1", "iter_docx_pages")
+register(XLSX, "functions.xlsx_processor", "iter_xlsx_records")
+register(PPTX, "functions.pptx_processor", "iter_pptx_slides")
+
+# Modules a processor's import must not pull in (checked by check_imports)
+FORBIDDEN_IMPORTS: Dict[str, Tuple[str, ...]] = {
+    DOCX: ("fitz", "pymupdf", "pytesseract"),
+    XLSX: ("fitz", "pymupdf", "pytesseract"),
+    PPTX: ("fitz", "pymupdf", "pytesseract"),
+}
+
+
+def registered_types() -> List[str]:
+    return list(_REGISTRY)
+
+def get_processor(kind: str):
+    """The processor module for a content type, imported on first use."""
+    spec = _REGISTRY.get(kind)
+    if spec is None:
+        raise ValueError(f"No processor registered for content type: {kind}")
+    return importlib.import_module(spec.module)
+
+def get_extractor(kind: str) -> Callable[[bytes], Iterator[dict]]:
+    """bytes -> page records for a content type."""
+    return getattr(get_processor(kind), _REGISTRY[kind].extract)
+
+def get_resumable_extractor(kind: str) -> Optional[Callable[..., Iterator[dict]]]:
+    """The checkpointed extractor for a content type, or None if it has none."""
+    spec = _REGISTRY.get(kind)
+    if spec is None or spec.resumable is None:
+        return None
+    return getattr(get_processor(kind), spec.resumable)
+
+def run_processor(kind: str, msg: dict):
+    """Run a processor's blob-to-blob entry point."""
+    return get_processor(kind).main(msg)
+
+
+# Import-time reporting -----------------------------------------------------
+
+_IMPORTTIME_RE = re.compile(r"^import time:\s+\d+ \|\s+(\d+) \|\s+(\S+)$")
+
+
+class ImportReport(NamedTuple):
+    module: str
+    total_us: int                         # cumulative import time of `module`
+    packages: List[Tuple[str, int]]       # (top-level package, cumulative us), slowest first
+    modules: List[str]                    # every module imported
+
+    def summary(self, top: int = 8) -> str:
+        slowest = ", ".join(f"{name} {us / 1000:.0f}ms" for name, us in self.packages[:top])
+        return f"{self.module}: {self.total_us / 1000:.0f}ms ({len(self.modules)} modules) — {slowest}"
+
+
+def import_time_report(module: str) -> ImportReport:
+    """Import `module` in a fresh interpreter under `-X importtime` and summarize it."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=Path(__file__).resolve().parent.parent,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed: {result.stderr.strip().splitlines()[-1:]}")
+
+    total, modules, packages = 0, [], {}
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if not match:
+            continue
+        cumulative, name = int(match.group(1)), match.group(2)
+        modules.append(name)
+        if name == module:
+            total = cumulative
+        # A package costs about as much as its slowest entry point (cumulative includes submodules)
+        package = name.split(".")[0]
+        packages[package] = max(packages.get(package, 0), cumulative)
+    packages.pop(module.split(".")[0], None)
+    return ImportReport(module, total, sorted(packages.items(), key=lambda kv: -kv[1]), modules)
+
+def check_imports() -> List[str]:
+    """Import-time report per registered processor; returns forbidden-import violations."""
+    violations = []
+    for kind, spec in _REGISTRY.items():
+        report = import_time_report(spec.module)
+        print(f"[ImportTime] {kind}: {report.summary()}")
+        loaded = {name.split(".")[0] for name in report.modules}
+        for forbidden in FORBIDDEN_IMPORTS.get(kind, ()):
+            if forbidden in loaded:
+                violations.append(f"{kind} processor imports {forbidden}")
+    return violations
+
+
+if __name__ == "__main__":
+    problems = check_imports()
+    for problem in problems:
+        print(f"[ImportTime] FAIL: {problem}")
+    sys.exit(1 if problems else 0)
@@ -0,0 +1,32 @@
+# worker_batch/__init__.py
+# Batch mode of the worker: many messages per invocation (cardinality "many").
+# worker/ (one message per invocation) ships disabled on the same queue: enable
+# only one of them. worker_batch_bulk/ runs this code on the bulk lane (jobs-queue-bulk).
+import logging
+import json
+from typing import List
+import azure.functions as func
+from config import WORKER_BATCH_QUEUE_NAME
+from functions.batch_worker import process_batch, settle_batch
+from utils import servicebus_utils
+
+def main(msgs: List[func.ServiceBusMessage]):
+    logging.info(f'[BatchWorker] Triggered with {len(msgs)} Service Bus messages.')
+
+    bodies = []
+    for msg in msgs:
+        try:
+            body = json.loads(msg.get_body().decode('utf-8'))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            # Can never succeed: park it instead of retrying
+            logging.error(f"[BatchWorker] Unreadable message {msg.message_id}: {e}")
+            servicebus_utils.send_message(f"{WORKER_BATCH_QUEUE_NAME}-failed", {"message_id": msg.message_id, "error": str(e)})
+            continue
+        # Queue wait is measured from the broker's enqueue time when it is known
+        if msg.enqueued_time_utc is not None:
+            body["enqueued_at"] = msg.enqueued_time_utc.timestamp()
+        bodies.append(body)
+
+    # Each message settles on its own; the invocation itself only fails on unexpected errors
+    settled = settle_batch(WORKER_BATCH_QUEUE_NAME, process_batch(bodies))
+    logging.info(f"[BatchWorker] Settled {len(bodies)} messages: {settled}")
@@ -0,0 +1,5 @@
+# worker_batch_bulk/__init__.py
+# The batch worker on the bulk lane (jobs-queue-bulk). Same code as worker_batch/
+# under its own trigger, so large documents never take the latency lane's
+# invocations; lanes.bulk_concurrency bounds how many run at once per process.
+from functions.worker_batch import main
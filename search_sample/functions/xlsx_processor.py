@@ -0,0 +1,124 @@
+# functions/xlsx_processor.py
+
+"""
+XLSX Processor — sheet/row-windowed text records in the PDF processor's schema.
+Workbooks are read with openpyxl in read-only mode, so sheets are streamed row by
+row from the archive instead of being loaded as cell objects; each record ("page")
+covers a window of rows of one sheet, prefixed with the sheet's header row so
+chunks keep their column context.
+"""
+
+import io
+import datetime
+from typing import Iterable, Iterator
+from openpyxl import load_workbook
+from utils.helpers import normalize_whitespace
+from utils.blob_utils import download_blob_to_bytes
+from utils.page_stream import write_pages
+from utils.db_utils import get_document_metadata
+from config import XLSX_ROWS_PER_RECORD, XLSX_MAX_RECORD_CHARS, XLSX_REPEAT_HEADER
+
+
+def _cell_text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    return normalize_whitespace(str(value))
+
+def _row_text(values: Iterable) -> str:
+    """Cells joined with " | " (as for PDF table rows); trailing empty cells dropped."""
+    cells = [_cell_text(value) for value in values]
+    while cells and not cells[-1]:
+        cells.pop()
+    return " | ".join(cells)
+
+
+def iter_sheet_windows(rows: Iterable[tuple], rows_per_record: int = XLSX_ROWS_PER_RECORD,
+                       max_chars: int = XLSX_MAX_RECORD_CHARS,
+                       repeat_header: bool = XLSX_REPEAT_HEADER) -> Iterator[tuple]:
+    """
+    Group a sheet's row values into windows.
+    Yields (first_row, last_row, header, lines) with 1-based sheet row numbers;
+    empty rows are skipped and the first non-empty row is taken as the header.
+    """
+    header, header_row = None, None
+    lines, first, last, size = [], None, None, 0
+    for row_number, values in enumerate(rows, start=1):
+        line = _row_text(values)
+        if not line:
+            continue
+        if header is None and repeat_header:
+            header, header_row = line, row_number
+            continue
+        if lines and (len(lines) >= rows_per_record or size + len(line) > max_chars):
+            yield first, last, header, lines
+            lines, first, size = [], None, 0
+        if first is None:
+            first = row_number
+        lines.append(line)
+        last = row_number
+        size += len(line) + 1
+    if lines:
+        yield first, last, header, lines
+    elif header is not None:
+        # A sheet with a single row: emit it on its own
+        yield header_row, header_row, None, [header]
+
+
+def iter_xlsx_records(xlsx_bytes: bytes, rows_per_record: int = XLSX_ROWS_PER_RECORD,
+                      max_chars: int = XLSX_MAX_RECORD_CHARS) -> Iterator[dict]:
+    """Yield {"page_number", "combined_text", "sheet", "rows"} per row window, sheet by sheet."""
+    workbook = load_workbook(io.BytesIO(xlsx_bytes), read_only=True, data_only=True)
+    try:
+        page_number = 0
+        for sheet in workbook.worksheets:
+            # Stored dimensions are often wrong; let the rows define the sheet instead
+            sheet.reset_dimensions()
+            windows = iter_sheet_windows(sheet.iter_rows(values_only=True), rows_per_record, max_chars)
+            for first, last, header, lines in windows:
+                page_number += 1
+                text = " ".join(([header] if header else []) + lines)
+                yield {
+                    "page_number": page_number,
+                    "combined_text": f"{sheet.title}: {text}",
+                    "sheet": sheet.title,
+                    "rows": [first, last],
+                }
+    finally:
+        workbook.close()
+
+
+def process_xlsx(input_blob_path: str, output_blob_path: str, document_id: str):
+    """
+    Process an XLSX workbook from Azure Blob; row-window records are streamed
+    to `output_blob_path` as each sheet is read.
+    """
+    container_name, blob_path = input_blob_path.split("/", 1)
+    xlsx_bytes = download_blob_to_bytes(blob_path, container_name)
+    metadata = get_document_metadata(document_id)
+
+    output_container, output_blob = output_blob_path.split("/", 1)
+    record_count = write_pages(output_container, output_blob, document_id, metadata, iter_xlsx_records(xlsx_bytes))
+
+    print(f"[XLSX Processor] Processed '{input_blob_path}' -> '{output_blob_path}' ({record_count} records)")
+
+
+# Azure Function entry (excel-processing-queue)
+def main(msg: dict):
+    """
+    Azure Function trigger entry point.
+    Expected msg:
+      {
+        "input_blob": "container/blobname.xlsx",
+        "output_blob": "container/blobname.json",
+        "document_id": "12345"
+      }
+    """
+    process_xlsx(
+        input_blob_path=msg["input_blob"],
+        output_blob_path=msg["output_blob"],
+        document_id=msg["document_id"]
+    )
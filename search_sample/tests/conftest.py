@@ -0,0 +1,64 @@
+# tests/conftest.py
+"""
+Test setup — run with `python -m pytest` from search_sample/.
+config.yaml ships without a database URL or storage connection string, so the
+tests point SEARCH_SAMPLE_CONFIG at a copy with a local SQLite file and the
+storage emulator's connection string (nothing connects at import time). The
+variable is inherited by subprocesses, e.g. the import-time checks.
+Tests never reach Azure, MosaicDB or the model endpoint: the functions that
+would are replaced with in-memory fakes per test (monkeypatch).
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+import yaml
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+_workdir = Path(tempfile.mkdtemp(prefix="search_sample_tests_"))
+with open(ROOT / "config.yaml", "r") as f:
+    _config = yaml.safe_load(f)
+_config["database"]["url"] = f"sqlite:///{_workdir / 'test.db'}"
+_config["azure"]["storage_connection_string"] = "UseDevelopmentStorage=true"
+_config["cache"]["dir"] = str(_workdir / "cache")
+_config["output"]["spool_dir"] = str(_workdir / "spool")
+_config["vector_codec"]["pca_path"] = str(_workdir / "cache" / "pca.npz")
+with open(_workdir / "config.yaml", "w") as f:
+    yaml.safe_dump(_config, f)
+os.environ["SEARCH_SAMPLE_CONFIG"] = str(_workdir / "config.yaml")
+
+
+
+@pytest.fixture
+def memory_checkpoints(monkeypatch):
+    """
+    In-memory processing_checkpoints table. Call it with the modules whose
+    load_checkpoints / record_checkpoint / clear_checkpoints should use it;
+    returns the table, {(document_id, stage, start): (Checkpoint, source_hash)}.
+    """
+    from utils.checkpoint_utils import Checkpoint
+    table = {}
+
+    def load(document_id, stage, source_hash=None):
+        return {start: checkpoint for (doc, st, start), (checkpoint, digest) in table.items()
+                if doc == document_id and st == stage and (source_hash is None or digest == source_hash)}
+
+    def record(document_id, stage, start, end, source_hash=None, marker=None):
+        table[(document_id, stage, start)] = (Checkpoint(start, end, marker), source_hash)
+
+    def clear(document_id, stage=None):
+        for key in [key for key in table if key[0] == document_id and stage in (None, key[1])]:
+            del table[key]
+
+    def install(*modules):
+        for module in modules:
+            monkeypatch.setattr(module, "load_checkpoints", load)
+            monkeypatch.setattr(module, "record_checkpoint", record)
+            monkeypatch.setattr(module, "clear_checkpoints", clear)
+        return table
+    return install
@@ -0,0 +1,106 @@
+import pytest
+
+import functions.batch_worker as batch_worker
+import functions.chunk_embed_processor as chunk_embed
+from utils import page_stream
+from utils.sniff_utils import DOCX, OK, Sniffed
+
+
+class _NoArtifact:
+    """Stands in for WriteBehindPages: passes pages through, writes nothing."""
+
+    names = []
+    error = None
+
+    def __init__(self, container_name, blob_name, *args, **kwargs):
+        self.names.append(blob_name)
+
+    def tee(self, pages):
+        return pages
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+@pytest.fixture
+def worker_env(monkeypatch):
+    statuses = []
+    monkeypatch.setattr(batch_worker, "sniff_blob", lambda path, container: Sniffed(DOCX, OK))
+    monkeypatch.setattr(batch_worker, "download_blob_to_bytes", lambda path, container: path.encode())
+    monkeypatch.setattr(batch_worker, "WriteBehindPages", _NoArtifact)
+    monkeypatch.setattr(chunk_embed, "update_job_status", lambda job_id, **kw: statuses.append((job_id, kw["status"])))
+    monkeypatch.setattr(chunk_embed, "store_embeddings", lambda **kw: None)
+    monkeypatch.setattr(chunk_embed, "generate_embeddings", lambda chunks: [[1.0, 0.0]] * len(chunks))
+    monkeypatch.setattr(chunk_embed, "INGEST_INCREMENTAL", False)
+    monkeypatch.setattr(chunk_embed, "DEDUP_ENABLED", False)
+    return statuses
+
+def _extractor(fail: bool):
+    def extract(data: bytes):
+        yield {"page_number": 1, "combined_text": "First page. It has two sentences."}
+        if fail:
+            raise ValueError("corrupt page 2")
+        yield {"page_number": 2, "combined_text": "Second page."}
+    return lambda kind: extract
+
+def _message(name: str) -> dict:
+    return {"blob_path": f"{name}.docx", "document_id": name, "metadata": {"job_id": f"job-{name}"}}
+
+
+def test_completed_document(worker_env, monkeypatch):
+    monkeypatch.setattr(batch_worker, "get_extractor", _extractor(fail=False))
+    result = batch_worker.process_document(_message("ok"))
+    assert result.status == batch_worker.COMPLETED
+    assert worker_env == [("job-ok", "COMPLETED")]
+
+def test_extraction_error_fails_job_and_propagates(worker_env, monkeypatch):
+    monkeypatch.setattr(batch_worker, "get_extractor", _extractor(fail=True))
+    with pytest.raises(ValueError, match="corrupt page 2"):
+        batch_worker.process_document(_message("bad"))
+    assert worker_env == [("job-bad", "FAILED")]
+
+def test_failed_document_in_batch_is_retried(worker_env, monkeypatch):
+    monkeypatch.setattr(batch_worker, "get_extractor", _extractor(fail=True))
+    results = batch_worker.process_batch([_message("bad")])
+    assert [r.status for r in results] == [batch_worker.FAILED]
+
+    sent = []
+    monkeypatch.setattr(batch_worker.servicebus_utils, "send_message", lambda queue, message: sent.append((queue, message)))
+    assert batch_worker.settle_batch("jobs-queue", results) == {"done": 0, "retried": 1, "parked": 0, "unsent": 0}
+    assert sent[0][0] == "jobs-queue" and sent[0][1]["delivery_attempt"] == 2
+
+def test_artifact_name_follows_output_format(worker_env, monkeypatch):
+    monkeypatch.setattr(batch_worker, "get_extractor", _extractor(fail=False))
+    monkeypatch.setattr(_NoArtifact, "names", [])
+    batch_worker.process_document(_message("named"))
+    assert _NoArtifact.names == ["processed/named.jsonl"]
+
+def test_artifact_write_failure_does_not_fail_completed_document(worker_env, monkeypatch):
+    def write_pages(container_name, blob_name, document_id, metadata, pages):
+        next(iter(pages))
+        raise ConnectionError("blob store unavailable")
+
+    monkeypatch.setattr(batch_worker, "get_extractor", _extractor(fail=False))
+    monkeypatch.setattr(batch_worker, "WriteBehindPages", page_stream.WriteBehindPages)
+    monkeypatch.setattr(page_stream, "write_pages", write_pages)
+    result = batch_worker.process_document(_message("unwritten"))
+    assert result.status == batch_worker.COMPLETED
+    assert worker_env == [("job-unwritten", "COMPLETED")]
+
+def test_failed_resend_does_not_fail_the_batch(monkeypatch):
+    results = [batch_worker.MessageResult({"blob_path": "ok.docx"}, batch_worker.COMPLETED),
+               batch_worker.MessageResult({"blob_path": "a.docx"}, batch_worker.FAILED, "boom"),
+               batch_worker.MessageResult({"blob_path": "b.docx"}, batch_worker.FAILED, "boom")]
+    sent = []
+
+    def send_message(queue, message):
+        if message["blob_path"] == "a.docx":
+            raise ConnectionError("service bus unavailable")
+        sent.append(message["blob_path"])
+
+    monkeypatch.setattr(batch_worker.servicebus_utils, "send_message", send_message)
+    assert batch_worker.settle_batch("jobs-queue", results) == {"done": 1, "retried": 1, "parked": 0, "unsent": 1}
+    assert sent == ["b.docx"]
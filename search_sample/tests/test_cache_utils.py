@@ -0,0 +1,67 @@
+import pytest
+
+import utils.embedding_utils as embedding_utils
+import utils.search_utils as search_utils
+from utils.cache_utils import EmbeddingCache, SQLiteLRUCache
+from utils.embedding_providers import EmbeddingProvider
+from utils.vector_codec import VectorCodec
+
+
+def test_lru_eviction_drops_least_recently_used(tmp_path):
+    cache = SQLiteLRUCache(tmp_path / "lru.sqlite", max_bytes=100)
+    cache.put_many({"a": b"x" * 30, "b": b"x" * 30, "c": b"x" * 30})
+    assert cache.get("a") is not None          # "a" is now more recent than "b"
+    cache.put("d", b"x" * 30)                  # 120 bytes > 100: evict down to 90
+    assert cache.get("b") is None
+    assert [cache.get(key) is not None for key in ("a", "c", "d")] == [True, True, True]
+    assert cache.stats()["bytes"] == 90
+
+def test_lru_replacing_an_entry_counts_its_size_once(tmp_path):
+    cache = SQLiteLRUCache(tmp_path / "lru.sqlite", max_bytes=100)
+    cache.put("a", b"x" * 40)
+    cache.put("a", b"x" * 10)
+    assert cache.stats()["bytes"] == 10
+    reopened = SQLiteLRUCache(tmp_path / "lru.sqlite", max_bytes=100)
+    assert reopened.stats()["bytes"] == 10
+
+def test_embedding_cache_round_trip_and_keys(tmp_path):
+    cache = EmbeddingCache(tmp_path / "emb.sqlite", max_bytes=1 << 20, model_id="model-a")
+    cache.put_vectors(["some  text"], [[0.1, 0.2]])
+    assert cache.get_vectors(["some text", "other"]) == [[0.1, 0.2], None]
+    assert cache.get_vectors(["some text"], model_id="model-b") == [None]
+
+
+class _CountingProvider(EmbeddingProvider):
+    name = "counting"
+
+    def __init__(self):
+        self.calls = []
+
+    def embed(self, texts):
+        self.calls.append(list(texts))
+        return [[1.0, 0.0] for _ in texts]
+
+
+def test_generate_embeddings_only_embeds_cache_misses(tmp_path, monkeypatch):
+    cache = EmbeddingCache(tmp_path / "emb.sqlite", max_bytes=1 << 20)
+    monkeypatch.setattr(embedding_utils, "get_embedding_cache", lambda: cache)
+    provider = _CountingProvider()
+    embedding_utils.generate_embeddings(["a", "b", "a"], provider=provider, use_cache=True)
+    embedding_utils.generate_embeddings(["a", "c"], provider=provider, use_cache=True)
+    assert provider.calls == [["a", "b"], ["c"]]
+
+def test_query_embedding_bypasses_cache(monkeypatch):
+    calls = []
+    monkeypatch.setattr(search_utils, "generate_embeddings",
+                        lambda texts, **kw: calls.append(kw) or [[0.6, 0.8]])
+    monkeypatch.setattr(search_utils, "get_codec", lambda: VectorCodec())
+    assert search_utils.embed_query("what is the notice period?") == pytest.approx([0.6, 0.8])
+    assert calls == [{"use_cache": False}]
+
+def test_lru_budget_is_shared_by_processes_using_the_file(tmp_path):
+    first = SQLiteLRUCache(tmp_path / "lru.sqlite", max_bytes=100)
+    second = SQLiteLRUCache(tmp_path / "lru.sqlite", max_bytes=100)  # another worker process
+    first.put_many({"a": b"x" * 30, "b": b"x" * 30})
+    second.put_many({"c": b"x" * 30, "d": b"x" * 30})
+    assert first.stats()["bytes"] == second.stats()["bytes"] == 90
+    assert first.get("a") is None
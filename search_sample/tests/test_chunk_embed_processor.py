@@ -0,0 +1,91 @@
+import pytest
+
+import functions.chunk_embed_processor as chunk_embed
+from utils.vector_codec import EncodedVectors, VectorCodec
+
+
+@pytest.fixture
+def stored(monkeypatch):
+    """Fake store: returns the store_embeddings calls made."""
+    calls = []
+    monkeypatch.setattr(chunk_embed, "update_job_status", lambda job_id, **kw: None)
+    monkeypatch.setattr(chunk_embed, "store_embeddings", lambda **kw: calls.append(kw))
+    monkeypatch.setattr(chunk_embed, "INGEST_INCREMENTAL", False)
+    monkeypatch.setattr(chunk_embed, "DEDUP_ENABLED", False)
+    return calls
+
+def _pages():
+    return [{"page_number": 1, "combined_text": "First page. It has two sentences."},
+            {"page_number": 2, "combined_text": "Second page."}]
+
+def _embed(chunks):
+    return [[0.6, 0.8, 0.0, 0.0] for _ in chunks]
+
+
+def test_disabled_codec_stores_raw_floats(stored, monkeypatch):
+    monkeypatch.setattr(chunk_embed, "VECTOR_CODEC_ENABLED", False)
+    chunk_embed.chunk_and_embed_pages(_pages(), {"job_id": "job", "document_id": "doc"}, embed=_embed)
+    assert stored
+    for call in stored:
+        assert call["vectors"] == _embed(call["chunks"])
+
+def test_enabled_codec_stores_encoded_vectors(stored, monkeypatch):
+    monkeypatch.setattr(chunk_embed, "VECTOR_CODEC_ENABLED", True)
+    monkeypatch.setattr(chunk_embed, "get_codec", lambda: VectorCodec("int8"))
+    chunk_embed.chunk_and_embed_pages(_pages(), {"job_id": "job", "document_id": "doc"}, embed=_embed)
+    assert stored
+    for call in stored:
+        assert isinstance(call["vectors"], EncodedVectors)
+        assert call["vectors"].encoding == "int8"
+
+
+def _long_pages(first_word="Alpha"):
+    # ~6 chunks of chunking.chunk_size words; the first word only appears in chunk 0
+    sentence = "The quick brown fox jumps over the lazy dog again and again."
+    text = " ".join([sentence] * 50)
+    return [{"page_number": n, "combined_text": (f"{first_word} starts here. " if n == 1 else "") + text}
+            for n in range(1, 7)]
+
+@pytest.fixture
+def resumable(stored, monkeypatch, memory_checkpoints):
+    """Small serial batches with in-memory checkpoints; returns the checkpoint table."""
+    monkeypatch.setattr(chunk_embed, "VECTOR_CODEC_ENABLED", False)
+    monkeypatch.setattr(chunk_embed, "INGEST_STREAM_BATCH_CHUNKS", 2)
+    monkeypatch.setattr(chunk_embed, "PIPELINE_EMBED_WORKERS", 1)
+    monkeypatch.setattr(chunk_embed, "PIPELINE_STORE_WORKERS", 1)
+    return memory_checkpoints(chunk_embed)
+
+def _fail_on_store(stored, monkeypatch, call):
+    def store(**kw):
+        if len(stored) + 1 == call:
+            raise ConnectionError("store unavailable")
+        stored.append(kw)
+    monkeypatch.setattr(chunk_embed, "store_embeddings", store)
+
+
+def test_retry_resumes_after_stored_batches(stored, resumable, monkeypatch):
+    metadata = {"job_id": "job", "document_id": "doc"}
+    _fail_on_store(stored, monkeypatch, call=2)
+    with pytest.raises(ConnectionError):
+        chunk_embed.chunk_and_embed_pages(_long_pages(), metadata, embed=_embed)
+    assert len(resumable) == 1
+
+    first_attempt = len(stored)
+    monkeypatch.setattr(chunk_embed, "store_embeddings", lambda **kw: stored.append(kw))
+    stats = chunk_embed.chunk_and_embed_pages(_long_pages(), metadata, embed=_embed)
+    assert stats["resumed"] == 2
+    assert stats["embedded"] == stats["chunks"] - 2
+    assert stored[first_attempt]["chunks"] != stored[0]["chunks"]
+    assert not resumable
+
+def test_changed_batch_is_not_resumed(stored, resumable, monkeypatch):
+    metadata = {"job_id": "job", "document_id": "doc"}
+    _fail_on_store(stored, monkeypatch, call=2)
+    with pytest.raises(ConnectionError):
+        chunk_embed.chunk_and_embed_pages(_long_pages("Alpha"), metadata, embed=_embed)
+
+    # Same positions and same last chunk id, but the batch's first chunk changed
+    monkeypatch.setattr(chunk_embed, "store_embeddings", lambda **kw: stored.append(kw))
+    stats = chunk_embed.chunk_and_embed_pages(_long_pages("Omega"), metadata, embed=_embed)
+    assert stats["resumed"] == 0
+    assert stats["embedded"] == stats["chunks"]
@@ -0,0 +1,29 @@
+import pytest
+
+import functions.content_router as content_router
+from config import WORKER_BATCH_QUEUE_NAME
+from utils.sniff_utils import CORRUPT, DOCX, OK, PDF, PPTX, SCANNED_PDF, UNSUPPORTED, XLSX, Sniffed
+
+
+@pytest.mark.parametrize("sniffed", [Sniffed(PDF, OK), Sniffed(PDF, OK, pdf_kind=SCANNED_PDF),
+                                     Sniffed(DOCX, OK), Sniffed(XLSX, OK), Sniffed(PPTX, OK)])
+def test_every_kind_goes_to_the_worker_queue(sniffed):
+    route = content_router.queue_for(sniffed)
+    assert route.error is None and route.queue == WORKER_BATCH_QUEUE_NAME
+
+@pytest.mark.parametrize("status", [CORRUPT, UNSUPPORTED])
+def test_bad_files_are_rejected(status):
+    route = content_router.queue_for(Sniffed(None, status, "bad bytes"))
+    assert route.queue is None and status in route.error
+
+def test_encrypted_pdfs_follow_config(monkeypatch):
+    sniffed = Sniffed(PDF, OK, encrypted=True)
+    monkeypatch.setattr(content_router, "SNIFF_REJECT_ENCRYPTED_PDF", True)
+    assert content_router.queue_for(sniffed).error == "Rejected encrypted PDF"
+    monkeypatch.setattr(content_router, "SNIFF_REJECT_ENCRYPTED_PDF", False)
+    assert content_router.queue_for(sniffed).error is None
+
+def test_extension_only_reports_mismatches(monkeypatch):
+    monkeypatch.setattr(content_router, "sniff_blob", lambda path, container: Sniffed(DOCX, OK, pages=1, size=10))
+    route = content_router.route_blob("documents", "renamed.pdf")
+    assert route.error is None and route.sniffed.kind == DOCX
@@ -0,0 +1,90 @@
+import threading
+
+import pytest
+
+import utils.dedup_utils as dedup_utils
+import utils.embedding_utils as embedding_utils
+from utils.cache_utils import EmbeddingCache
+from utils.dedup_utils import MinHasher, NearDuplicateIndex, similarity
+from utils.embedding_providers import EmbeddingProvider
+
+_TEMPLATE = ("This agreement is entered into by the parties named below and remains in force "
+             "until terminated in writing by either party with thirty days notice to the {} office.")
+
+
+class _CountingProvider(EmbeddingProvider):
+    name = "counting"
+
+    def __init__(self):
+        self.calls = []
+
+    def embed(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+def test_signature_similarity_tracks_shared_shingles():
+    hasher = MinHasher(num_perm=128)
+    base = hasher.signature(_TEMPLATE.format("London"))
+    assert similarity(base, hasher.signature(_TEMPLATE.format("London").upper())) == 1.0
+    assert similarity(base, hasher.signature(_TEMPLATE.format("Paris"))) >= 0.75
+    assert similarity(base, hasher.signature("An unrelated sentence about quarterly revenue figures.")) < 0.2
+
+def test_index_finds_near_duplicates_and_prunes(tmp_path):
+    index = NearDuplicateIndex(tmp_path / "minhash.sqlite", threshold=0.8, num_perm=128, bands=32, max_entries=2)
+    london = index.hasher.signature(_TEMPLATE.format("London"))
+    index.add_many([(london, "key-london")])
+    assert index.find(index.hasher.signature(_TEMPLATE.format("London office and")))[0] == "key-london"
+    assert index.find(index.hasher.signature("Completely different text with nothing shared at all.")) is None
+    index.add_many([(index.hasher.signature(f"filler text number {n} for pruning"), f"key-{n}") for n in range(2)])
+    assert index.stats()["index_entries"] == 2
+    assert index.find(london) is None
+
+def test_bands_must_divide_permutations(tmp_path):
+    with pytest.raises(ValueError):
+        NearDuplicateIndex(tmp_path / "minhash.sqlite", num_perm=128, bands=30)
+
+
+@pytest.fixture
+def dedup(tmp_path, monkeypatch):
+    """Embedding cache and signature index in tmp_path; returns the provider."""
+    cache = EmbeddingCache(tmp_path / "emb.sqlite", max_bytes=1 << 20, model_id="counting")
+    index = NearDuplicateIndex(tmp_path / "minhash.sqlite", threshold=0.8, num_perm=128, bands=32)
+    monkeypatch.setattr(dedup_utils, "EMBEDDING_CACHE_ENABLED", True)
+    monkeypatch.setattr(dedup_utils, "get_embedding_cache", lambda: cache)
+    monkeypatch.setattr(embedding_utils, "get_embedding_cache", lambda: cache)
+    monkeypatch.setattr(dedup_utils, "get_near_duplicate_index", lambda: index)
+    return _CountingProvider()
+
+def test_near_duplicates_reuse_vectors_within_and_across_documents(dedup):
+    first = [_TEMPLATE.format("London"), "Short chunk.", _TEMPLATE.format("London office and")]
+    vectors = dedup_utils.embed_with_near_dedup(first, provider=dedup)
+    assert dedup.calls == [first[:2]]
+    assert vectors[2] == vectors[0]
+
+    second = [_TEMPLATE.format("London office")]
+    assert dedup_utils.embed_with_near_dedup(second, provider=dedup) == [vectors[0]]
+    assert len(dedup.calls) == 1
+
+def test_reingesting_identical_text_indexes_it_once(dedup):
+    index = dedup_utils.get_near_duplicate_index()
+    for _ in range(3):
+        dedup_utils.embed_with_near_dedup([_TEMPLATE.format("Berlin")], provider=dedup)
+    assert index.stats()["index_entries"] == 1
+
+def test_evicted_match_counts_as_near_duplicate_not_reuse(dedup):
+    index = dedup_utils.get_near_duplicate_index()
+    index.add_many([(index.hasher.signature(_TEMPLATE.format("London")), "evicted-key")])
+    dedup_utils.embed_with_near_dedup([_TEMPLATE.format("London office and")], provider=dedup)
+    stats = index.stats()
+    assert (stats["checked"], stats["near_duplicates"], stats["reused"], stats["embedded"]) == (1, 1, 0, 1)
+
+def test_counts_from_concurrent_calls_add_up(tmp_path):
+    index = NearDuplicateIndex(tmp_path / "minhash.sqlite")
+    threads = [threading.Thread(target=lambda: [index.count(checked=1, reused=1) for _ in range(1000)])
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert index.stats()["checked"] == 4000 and index.stats()["dedup_rate"] == 1.0
@@ -0,0 +1,84 @@
+import io
+import zipfile
+
+import functions.docx_processor as docx_processor
+from functions.docx_processor import iter_docx_blocks
+from functions.docx_processor_1 import iter_docx_pages
+
+_MAIN = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+
+def _docx(body: str, prefix: str = "w") -> bytes:
+    """A minimal DOCX whose body is written with the `w:` prefix, renamed to `prefix`."""
+    xml = (f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+           f'<w:document xmlns:w="{_MAIN}"><w:body>{body}</w:body></w:document>')
+    xml = xml.replace("w:", f"{prefix}:").replace("xmlns:w=", f"xmlns:{prefix}=")
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("word/document.xml", xml)
+    return buffer.getvalue()
+
+def _p(text: str, properties: str = "", runs: str = "") -> str:
+    return f"<w:p><w:pPr>{properties}</w:pPr>{runs}<w:r><w:t>{text}</w:t></w:r></w:p>"
+
+def _sect(section_type: str = "") -> str:
+    start = f'<w:type w:val="{section_type}"/>' if section_type else ""
+    return f"<w:sectPr>{start}</w:sectPr>"
+
+def _pages(docx_bytes: bytes):
+    return [page["combined_text"] for page in iter_docx_pages(docx_bytes)]
+
+
+def test_blocks_without_page_breaks():
+    row = "<w:tr><w:tc>" + _p("a") + "</w:tc><w:tc>" + _p("b") + "</w:tc></w:tr>"
+    docx = _docx(_p("Intro") + f"<w:tbl>{row}</w:tbl>" + _p("Next", _sect())
+                 + _p("End", '<w:pageBreakBefore/>') + _sect())
+    assert list(iter_docx_blocks(docx)) == [
+        ("paragraph", "Intro"), ("table_row", "a | b"), ("paragraph", "Next"), ("paragraph", "End")]
+
+def test_explicit_rendered_and_before_breaks():
+    docx = _docx(_p("one", runs='<w:r><w:t>half</w:t><w:br w:type="page"/></w:r>')
+                 + _p("two", runs="<w:r><w:lastRenderedPageBreak/></w:r>")
+                 + _p("three", "<w:pageBreakBefore/>"))
+    assert _pages(docx) == ["half", "one", "two", "three"]
+
+def test_break_in_table_applies_after_row():
+    row = '<w:tr><w:tc><w:p><w:r><w:t>x</w:t><w:br w:type="page"/><w:t>y</w:t></w:r></w:p></w:tc></w:tr>'
+    docx = _docx(f"<w:tbl>{row}</w:tbl>" + _p("after"))
+    assert _pages(docx) == ["xy", "after"]
+
+def test_section_types_start_pages():
+    docx = _docx(_p("first", _sect("nextPage")) + _p("second", _sect("continuous"))
+                 + _p("third", _sect()) + _p("fourth") + _sect("continuous"))
+    # A break follows the start type of the section after it: "third" defaults to a new page
+    assert _pages(docx) == ["first second", "third fourth"]
+
+def test_section_types_with_other_namespace_prefix():
+    body = _p("first", _sect()) + _p("second") + _sect("continuous")
+    assert _pages(_docx(body, prefix="ns0")) == _pages(_docx(body)) == ["first second"]
+    body = _p("first", _sect("continuous")) + _p("second") + _sect("oddPage")
+    assert _pages(_docx(body, prefix="wp")) == ["first", "second"]
+
+def test_empty_document_has_one_page():
+    assert list(iter_docx_pages(_docx(_sect()))) == [{"page_number": 1, "combined_text": ""}]
+
+def test_page_break_before_honours_its_value():
+    docx = _docx(_p("one") + _p("two", '<w:pageBreakBefore w:val="false"/>')
+                 + _p("three", '<w:pageBreakBefore w:val="0"/>') + _p("four", '<w:pageBreakBefore w:val="1"/>'))
+    assert _pages(docx) == ["one two three", "four"]
+
+def test_parsed_elements_are_detached(monkeypatch):
+    bodies = []
+    iterparse = docx_processor.ET.iterparse
+
+    def spy(source, events):
+        for event, elem in iterparse(source, events):
+            if event == "start" and elem.tag.endswith("}body"):
+                bodies.append(elem)
+            yield event, elem
+
+    monkeypatch.setattr(docx_processor.ET, "iterparse", spy)
+    row = "<w:tr><w:tc>" + _p("cell") + "</w:tc></w:tr>"
+    blocks = list(iter_docx_blocks(_docx("".join(_p(f"p{n}") for n in range(50)) + f"<w:tbl>{row * 20}</w:tbl>")))
+    assert len(blocks) == 70
+    assert len(bodies[0]) == 0
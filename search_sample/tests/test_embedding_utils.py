@@ -0,0 +1,161 @@
+import threading
+import time
+
+import pytest
+import requests
+
+import utils.embedding_utils as embedding_utils
+from utils.vector_codec import EncodedVectors
+
+
+class _Response:
+    def __init__(self, status_code=200, body=None):
+        self.status_code = status_code
+        self._body = body or {}
+
+    def json(self):
+        return self._body
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+def _vector(text):
+    return [float(len(text)), 1.0]
+
+@pytest.fixture
+def endpoint(monkeypatch):
+    """Fake model endpoint; records request sizes and the peak number of concurrent requests."""
+    state = {"requests": [], "running": 0, "peak": 0, "max_texts": None}
+    lock = threading.Lock()
+
+    def post_json(url, payload, limiter=None):
+        with lock:
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+        try:
+            time.sleep(0.01)
+            if "text" in payload:
+                state["requests"].append(1)
+                return _Response(body={"embedding": _vector(payload["text"])})
+            texts = payload["texts"]
+            state["requests"].append(len(texts))
+            if state["max_texts"] is not None and len(texts) > state["max_texts"]:
+                return _Response(413)
+            return _Response(body={"embeddings": [_vector(t) for t in texts]})
+        finally:
+            with lock:
+                state["running"] -= 1
+
+    monkeypatch.setattr(embedding_utils, "post_json", post_json)
+    return state
+
+
+def test_in_flight_limit_is_shared_by_concurrent_callers(endpoint, monkeypatch):
+    monkeypatch.setattr(embedding_utils, "_request_slots", threading.BoundedSemaphore(3))
+    texts = [f"chunk {n}" for n in range(12)]
+    results = {}
+
+    def caller(name):
+        results[name] = embedding_utils.embed_with_mosaic(texts, batched=False, max_in_flight=4)
+
+    threads = [threading.Thread(target=caller, args=(name,)) for name in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert endpoint["peak"] <= 3
+    assert all(results[name] == [_vector(t) for t in texts] for name in range(3))
+
+
+def test_paged_insert_sends_refs_and_never_resends_unsafe_failures(monkeypatch):
+    sent = []
+
+    def post_json(url, payload, idempotent=True):
+        assert url.endswith("/bulk_insert") and not idempotent
+        sent.append(payload)
+        if len(sent) == 2:
+            raise requests.ReadTimeout("read")
+        return _Response(body={})
+
+    monkeypatch.setattr(embedding_utils, "post_json", post_json)
+    monkeypatch.setattr(embedding_utils, "MOSAICDB_INSERT_MAX_IN_FLIGHT", 1)
+    chunks = [f"chunk {n}" for n in range(5)]
+    refs = [{"chunk_index": 10 + n} for n in range(5)]
+    encoded = EncodedVectors.from_floats([[1.0, 0.0]] * 5)
+    monkeypatch.setattr(embedding_utils, "_insert_page_ranges", lambda chunks, bpv: [(0, 2), (2, 4), (4, 5)])
+    with pytest.raises(RuntimeError, match="Bulk insert failed"):
+        embedding_utils.store_embeddings("doc", chunks, encoded, paged=True, chunk_refs=refs)
+    assert len(sent) == 3                  # the failed page is not resent
+    assert "offset" not in sent[0]
+    assert [ref["chunk_index"] for ref in sent[0]["refs"]] == [10, 11]
+
+
+def test_batches_are_capped_by_count_and_bytes():
+    texts = ["a" * 10] * 5 + ["b" * 100] + ["c"] * 2
+    batches = list(embedding_utils.iter_batches(texts, max_chunks=3, max_bytes=50))
+    assert [len(batch) for batch in batches] == [3, 2, 1, 2]
+    assert sum(batches, []) == texts        # the oversized chunk gets a batch of its own
+
+def test_batch_rejected_as_too_large_is_split(endpoint):
+    endpoint["max_texts"] = 3
+    texts = [f"chunk number {n}" * (n + 1) for n in range(8)]
+    vectors = embedding_utils.embed_with_mosaic(texts, batched=True, max_in_flight=1)
+    assert vectors == [_vector(t) for t in texts]
+    assert endpoint["requests"] == [8, 4, 2, 2, 4, 2, 2]
+
+def test_single_chunk_too_large_raises(endpoint):
+    endpoint["max_texts"] = 0
+    with pytest.raises(embedding_utils.PayloadTooLargeError):
+        embedding_utils.embed_with_mosaic(["chunk"], batched=True, max_in_flight=1)
+
+
+def _sentences(count, start=0):
+    return " ".join(f"Sentence {n} has  five\twords." for n in range(start, start + count))
+
+def test_chunk_offsets_point_back_into_pages():
+    pages = {1: _sentences(7), 2: "  " + _sentences(5, start=7) + " trailing words", 3: ""}
+    chunks = list(embedding_utils.iter_chunks(pages.items(), max_tokens=12, overlap=3))
+    assert [chunk.index for chunk in chunks] == list(range(len(chunks)))
+    assert any(chunk.start_page != chunk.end_page for chunk in chunks)
+    for chunk in chunks:
+        if chunk.start_page == chunk.end_page:
+            source = pages[chunk.start_page][chunk.start_offset:chunk.end_offset]
+        else:
+            source = pages[chunk.start_page][chunk.start_offset:] + " " + pages[chunk.end_page][:chunk.end_offset]
+        assert source.split() == chunk.text.split()
+    assert chunks[0].ref() == {"chunk_index": 0, "start_page": 1, "start_offset": 0,
+                               "end_page": chunks[0].end_page, "end_offset": chunks[0].end_offset}
+
+def test_sentence_spanning_pages():
+    pages = [(1, "First sentence ends. Second one starts"), (2, "and ends here. Third.")]
+    chunks = list(embedding_utils.iter_chunks(pages, max_tokens=6, overlap=0))
+    assert [chunk.text for chunk in chunks] == ["First sentence ends.", "Second one starts and ends here.", "Third."]
+    assert (chunks[1].start_page, chunks[1].start_offset) == (1, 21)
+    assert (chunks[1].end_page, chunks[1].end_offset) == (2, len("and ends here."))
+    assert (chunks[2].start_page, chunks[2].start_offset) == (2, len("and ends here. "))
+
+def test_chunk_text_matches_iter_chunks_and_overlaps():
+    text = _sentences(40)
+    chunks = embedding_utils.chunk_text(text, max_tokens=20, overlap=5)
+    assert chunks == [chunk.text for chunk in embedding_utils.iter_chunks(text, 20, 5)]
+    assert all(len(chunk.split()) <= 20 for chunk in chunks)
+    for previous, current in zip(chunks, chunks[1:]):
+        assert current.split()[:5] == previous.split()[-5:]
+
+
+def test_rows_are_keyed_by_document_and_chunk_id(monkeypatch):
+    sent = []
+    monkeypatch.setattr(embedding_utils, "post_json", lambda url, payload, **kw: sent.append((url, payload)) or _Response())
+    embedding_utils.store_embeddings("doc", ["a"], [[1.0, 0.0]], paged=False, chunk_ids=["f:0"])
+    embedding_utils.store_embeddings("doc", ["a"], [[1.0, 0.0]], paged=True, chunk_ids=["f:0"])
+    embedding_utils.delete_embeddings("doc", ["f:0"])
+    embedding_utils.update_chunk_refs("doc", ["f:0"], [{"chunk_index": 0}])
+    insert, bulk_insert, delete, update = (payload for _, payload in sent)
+    assert insert["embeddings"][0]["id"] == bulk_insert["ids"][0] == delete["ids"][0] == update["updates"][0]["id"] == "doc:f:0"
+
+def test_oversized_sentence_stays_whole():
+    long_sentence = " ".join(["word"] * 30) + "."
+    chunks = list(embedding_utils.iter_chunks(f"Short one. {long_sentence} Tail.", max_tokens=10, overlap=0))
+    assert [len(chunk.text.split()) for chunk in chunks] == [2, 30, 1]
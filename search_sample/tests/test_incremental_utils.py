@@ -0,0 +1,28 @@
+from utils.incremental_utils import assign_chunk_ids, chunk_fingerprint, diff_chunks, row_ids
+
+
+def test_fingerprint_ignores_whitespace_and_depends_on_namespace():
+    assert chunk_fingerprint("a  b\nc", "model-a") == chunk_fingerprint("a b c", "model-a")
+    assert chunk_fingerprint("a b c", "model-a") != chunk_fingerprint("a b c", "model-b")
+
+def test_repeated_texts_get_occurrence_numbers_across_batches():
+    seen = {}
+    first = assign_chunk_ids(["header", "body"], "ns", seen)
+    second = assign_chunk_ids(["header"], "ns", seen)
+    assert [chunk_id.rsplit(":", 1)[1] for chunk_id, _ in first + second] == ["0", "0", "1"]
+    assert first[0][1] == second[0][1]
+    assert [chunk_id for chunk_id, _ in first + second] == \
+        [chunk_id for chunk_id, _ in assign_chunk_ids(["header", "body", "header"], "ns")]
+
+def test_diff_keeps_unchanged_chunks():
+    previous = [chunk_id for chunk_id, _ in assign_chunk_ids(["intro", "old", "header", "header"], "ns")]
+    current = [chunk_id for chunk_id, _ in assign_chunk_ids(["intro", "header", "new"], "ns")]
+    diff = diff_chunks(previous, current)
+    assert diff.kept == [0, 1] and diff.new == [2]
+    assert diff.stale == sorted([previous[1], previous[3]])
+
+def test_identical_chunks_of_two_documents_get_distinct_row_ids():
+    ids = [chunk_id for chunk_id, _ in assign_chunk_ids(["Confidential. Do not distribute."], "ns")]
+    assert ids == [chunk_id for chunk_id, _ in assign_chunk_ids(["Confidential. Do not distribute."], "ns")]
+    assert row_ids("doc-a", ids) != row_ids("doc-b", ids)
+    assert row_ids("doc-a", ids) == [f"doc-a:{ids[0]}"]
@@ -0,0 +1,74 @@
+import threading
+
+import functions.content_router as content_router
+import utils.lane_utils as lane_utils
+from config import LANE_LATENCY_MAX_PAGES, LANE_LATENCY_MAX_SCANNED_PAGES, WORKER_BATCH_QUEUE_NAME
+from utils.lane_utils import BULK, LATENCY, FairQueue, choose_lane, lane_queue, run_by_lane
+from utils.sniff_utils import OK, PDF, SCANNED_PDF, TEXT_PDF, Sniffed
+
+# Lane clocks are shared by the whole process: each test uses its own team names
+
+
+def _drain(queue):
+    return [queue.pop() for _ in range(len(queue))]
+
+def test_fair_queue_interleaves_teams():
+    queue = FairQueue(BULK, weights={})
+    for n in range(4):
+        queue.push(f"a{n}", "interleave-a")
+    for n in range(2):
+        queue.push(f"b{n}", "interleave-b")
+    assert _drain(queue) == ["a0", "b0", "a1", "b1", "a2", "a3"]
+
+def test_fair_queue_weights_and_costs():
+    queue = FairQueue(BULK, weights={"weighted-heavy": 2})
+    for n in range(4):
+        queue.push(f"h{n}", "weighted-heavy")
+    for n in range(2):
+        queue.push(f"l{n}", "weighted-light")
+    assert _drain(queue) == ["h0", "l0", "h1", "h2", "l1", "h3"]
+
+def test_fair_queue_tags_carry_over_between_dispatches():
+    first = FairQueue(LATENCY, weights={})
+    first.push("import", "carry-a", cost=100)
+    assert _drain(first) == ["import"]
+    second = FairQueue(LATENCY, weights={})
+    second.push("a", "carry-a")
+    second.push("b", "carry-b")
+    assert _drain(second) == ["b", "a"]
+
+
+def test_choose_lane():
+    assert choose_lane(Sniffed(PDF, OK, pages=2, size=1000)) == (LATENCY, "")
+    assert choose_lane(Sniffed(PDF, OK, pages=LANE_LATENCY_MAX_PAGES + 1, size=1000))[0] == BULK
+    scanned = LANE_LATENCY_MAX_SCANNED_PAGES + 1
+    assert choose_lane(Sniffed(PDF, OK, pdf_kind=TEXT_PDF, pages=scanned, size=1000))[0] == LATENCY
+    assert choose_lane(Sniffed(PDF, OK, pdf_kind=SCANNED_PDF, pages=scanned, size=1000))[0] == BULK
+    assert choose_lane(Sniffed(PDF, OK, pages=2), size_bytes=1 << 40)[0] == BULK
+
+def test_route_blob_sends_bulk_documents_to_bulk_worker_queue(monkeypatch):
+    pages = {"small.pdf": 2, "large.pdf": LANE_LATENCY_MAX_PAGES + 1}
+    monkeypatch.setattr(content_router, "sniff_blob",
+                        lambda path, container: Sniffed(PDF, OK, pdf_kind=TEXT_PDF, pages=pages[path], size=1000))
+    small = content_router.route_blob("documents", "small.pdf")
+    large = content_router.route_blob("documents", "large.pdf")
+    assert (small.queue, small.lane) == (WORKER_BATCH_QUEUE_NAME, LATENCY)
+    assert (large.queue, large.lane) == (lane_queue(WORKER_BATCH_QUEUE_NAME, BULK), BULK)
+    assert large.message_fields()["lane"] == BULK
+
+def test_run_by_lane_returns_results_in_input_order():
+    bodies = [{"n": n, "lane": BULK if n % 3 == 0 else LATENCY, "team_id": f"order-{n % 2}"} for n in range(12)]
+    assert run_by_lane(bodies, lambda body: body["n"], workers=3) == list(range(12))
+
+def test_run_by_lane_waits_for_slots_held_elsewhere(monkeypatch):
+    monkeypatch.setitem(lane_utils._SLOTS, LATENCY, threading.BoundedSemaphore(1))
+    lane_utils._SLOTS[LATENCY].acquire()        # held by another invocation
+    results = []
+    dispatcher = threading.Thread(target=lambda: results.extend(
+        run_by_lane([{"lane": LATENCY, "team_id": "held"}], lambda body: "done", workers=2)))
+    dispatcher.start()
+    dispatcher.join(0.2)
+    assert dispatcher.is_alive() and not results
+    lane_utils._release_slot(LATENCY)
+    dispatcher.join(1)
+    assert results == ["done"]
@@ -0,0 +1,34 @@
+import fitz
+
+from benchmarks.synthetic import synthetic_table_pdf
+from utils.layout_utils import extract_layout
+
+
+def _image_pdf() -> bytes:
+    doc = fitz.open()
+    pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 40, 30), False)
+    pixmap.clear_with(200)
+    text_page = doc.new_page()
+    text_page.insert_text((36, 36), "A caption above the figure.", fontsize=9)
+    text_page.insert_image(fitz.Rect(36, 60, 236, 210), pixmap=pixmap)
+    doc.new_page().insert_image(fitz.Rect(0, 0, 400, 300), pixmap=pixmap)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def test_layout_lists_image_placements_without_data():
+    with fitz.open(stream=_image_pdf(), filetype="pdf") as pdf:
+        captioned, scanned = (extract_layout(page, tables=False) for page in pdf)
+    assert "A caption above the figure." in captioned.text
+    assert captioned.images == [{"bbox": [36.0, 60.0, 236.0, 210.0], "width": 40, "height": 30}]
+    assert scanned.text == "" and len(scanned.images) == 1
+
+def test_layout_text_matches_get_text():
+    with fitz.open(stream=synthetic_table_pdf(1), filetype="pdf") as pdf:
+        page = pdf[0]
+        layout = extract_layout(page, tables=True)
+        assert layout.text.split() == page.get_text("text").split()
+        assert layout.images == []
+        assert len(layout.tables) == 1 and len(layout.tables[0][0]) == 5
+        assert extract_layout(page, tables=False).tables == []
@@ -0,0 +1,30 @@
+import os
+
+import pytest
+from PIL import Image
+
+from utils import ocr_utils
+
+
+def test_ocr_pool_runs_in_separate_processes_and_shuts_down(monkeypatch):
+    monkeypatch.setattr(ocr_utils, "OCR_WORKERS", 2)
+    pool = ocr_utils.get_ocr_pool()
+    assert ocr_utils.get_ocr_pool() is pool
+    assert pool.submit(os.getpid).result() != os.getpid()
+    ocr_utils.shutdown_ocr_pool()
+    assert ocr_utils._ocr_pool is None
+    ocr_utils.shutdown_ocr_pool()           # no pool: nothing to do
+
+def test_preparing_images_never_opens_the_ocr_cache(monkeypatch):
+    monkeypatch.setattr(ocr_utils, "get_ocr_cache", lambda: pytest.fail("OCR cache opened"))
+    image = Image.linear_gradient("L").resize((400, 300))
+    prepared = ocr_utils.prepare_image(image, display_width_pt=400 * 72 / 300)
+    again = ocr_utils.prepare_image(image.convert("RGB"), display_width_pt=400 * 72 / 300)
+    assert prepared.key == again.key and prepared.png.startswith(b"\x89PNG")
+
+def test_disabled_cache_is_not_opened_for_ocr(monkeypatch):
+    monkeypatch.setattr(ocr_utils, "OCR_CACHE_ENABLED", False)
+    monkeypatch.setattr(ocr_utils, "get_ocr_cache", lambda: pytest.fail("OCR cache opened"))
+    monkeypatch.setattr(ocr_utils, "ocr_many", lambda images, lang: ["text"] * len(images))
+    image = ocr_utils.OcrImage("key", b"png")
+    assert ocr_utils.ocr_images([image, image]) == ["text", "text"]
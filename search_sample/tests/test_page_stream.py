@@ -0,0 +1,74 @@
+import functools
+import json
+
+import pytest
+
+from utils import page_stream
+
+
+@pytest.fixture
+def spool(monkeypatch, request):
+    """Spool target; each test writes its own blob, returned as (name, spool path)."""
+    monkeypatch.setattr(page_stream, "PageStreamWriter", functools.partial(page_stream.PageStreamWriter, target="spool"))
+    name = f"processed/{request.node.name}.jsonl"
+    return name, page_stream._spool_path("processed", name)
+
+def _pages(count):
+    return ({"page_number": n, "combined_text": f"page {n}"} for n in range(1, count + 1))
+
+
+def test_write_behind_commits_fully_consumed_pages(spool):
+    name, _ = spool
+    with page_stream.WriteBehindPages("processed", name, "doc", {}) as artifact:
+        seen = [page["page_number"] for page in artifact.tee(_pages(5))]
+    assert seen == [1, 2, 3, 4, 5]
+    stream = page_stream.open_page_stream("processed", name, target="spool")
+    assert stream.header["document_id"] == "doc"
+    assert [page["page_number"] for page in stream.pages] == seen
+
+def test_write_behind_aborts_on_error(spool):
+    name, path = spool
+    with pytest.raises(RuntimeError):
+        with page_stream.WriteBehindPages("processed", name, "doc", {}) as artifact:
+            for page in artifact.tee(_pages(5)):
+                if page["page_number"] == 3:
+                    raise RuntimeError("embedding failed")
+    assert not path.exists()
+    assert not path.with_name(path.name + ".part").exists()
+
+def test_write_behind_aborts_partially_consumed_pages(spool):
+    name, path = spool
+    with page_stream.WriteBehindPages("processed", name, "doc", {}) as artifact:
+        pages = artifact.tee(_pages(5))
+        next(pages)
+        pages.close()
+    assert not path.exists()
+
+def _fail_after_first_page(container_name, blob_name, document_id, metadata, pages):
+    next(iter(pages))
+    raise ConnectionError("blob store unavailable")
+
+@pytest.mark.parametrize("raise_errors", [True, False])
+def test_write_behind_writer_failure(spool, monkeypatch, raise_errors):
+    monkeypatch.setattr(page_stream, "write_pages", _fail_after_first_page)
+    artifact = page_stream.WriteBehindPages("processed", spool[0], "doc", {}, max_pending=1,
+                                            raise_errors=raise_errors)
+    assert [page["page_number"] for page in artifact.tee(_pages(5))] == [1, 2, 3, 4, 5]
+    if raise_errors:
+        with pytest.raises(ConnectionError):
+            artifact.close()
+    else:
+        artifact.close()
+    assert isinstance(artifact.error, ConnectionError)
+
+def test_processed_blob_name():
+    assert page_stream.processed_blob_name("processed/doc", "jsonl") == "processed/doc.jsonl"
+    assert page_stream.processed_blob_name("processed/doc", "json") == "processed/doc.json"
+
+def test_open_page_stream_reads_legacy_json(spool):
+    _, path = spool
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"document_id": "doc", "metadata": {}, "pages": [{"page": 1, "text": "old"}]}))
+    stream = page_stream.open_page_stream("processed", spool[0], target="spool")
+    assert stream.header["document_id"] == "doc"
+    assert list(stream.pages) == [{"page": 1, "text": "old"}]
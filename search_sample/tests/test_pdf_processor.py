@@ -0,0 +1,54 @@
+import functools
+
+import pytest
+
+import functions.pdf_processor as pdf_processor
+from benchmarks.synthetic import synthetic_pdf
+from utils import page_stream
+
+
+@pytest.fixture
+def spool_env(monkeypatch, memory_checkpoints):
+    """Spool output target and in-memory checkpoints; returns the extracted ranges."""
+    memory_checkpoints(pdf_processor)
+    extracted = []
+    iter_ranges = pdf_processor.iter_extracted_ranges
+
+    def spy(*args, **kwargs):
+        for start, stop, pages in iter_ranges(*args, **kwargs):
+            extracted.append((start, stop))
+            yield start, stop, pages
+
+    monkeypatch.setattr(pdf_processor, "iter_extracted_ranges", spy)
+    monkeypatch.setattr(pdf_processor, "RangedPageWriter", functools.partial(page_stream.RangedPageWriter, target="spool"))
+    monkeypatch.setattr(pdf_processor, "open_page_stream", functools.partial(page_stream.open_page_stream, target="spool"))
+    return extracted
+
+def _resumable(pdf_bytes):
+    return pdf_processor.iter_pages_resumable(pdf_bytes, "doc", {"document_id": "doc"}, "processed", "processed/doc.jsonl")
+
+
+def test_resumable_pages_stream_and_commit(spool_env):
+    pages = list(_resumable(synthetic_pdf(24)))
+    assert [p["page_number"] for p in pages] == list(range(1, 25))
+    stream = page_stream.open_page_stream("processed", "processed/doc.jsonl", target="spool")
+    assert [p["page_number"] for p in stream.pages] == list(range(1, 25))
+
+def test_retry_extracts_only_missing_ranges(spool_env):
+    pdf_bytes = synthetic_pdf(24)
+    first = _resumable(pdf_bytes)
+    for _ in range(16):
+        next(first)
+    first.close()       # the worker failed after the first range
+    assert spool_env == [(0, 16)]
+
+    pages = list(_resumable(pdf_bytes))
+    assert spool_env == [(0, 16), (16, 24)]
+    assert [p["page_number"] for p in pages] == list(range(1, 25))
+    assert "Page 3 line 0" in pages[2]["combined_text"]
+
+def test_parallel_extraction_matches_serial():
+    pdf_bytes = synthetic_pdf(12)
+    serial = pdf_processor.extract_pages(pdf_bytes, workers=1)
+    parallel = pdf_processor.extract_pages(pdf_bytes, workers=2, min_pages=1)
+    assert parallel == serial and len(serial) == 12
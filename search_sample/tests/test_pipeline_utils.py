@@ -0,0 +1,68 @@
+import threading
+import time
+
+import pytest
+
+from utils.pipeline_utils import map_in_order, prefetch
+
+
+def _counted(count, taken):
+    for item in range(count):
+        taken.append(item)
+        yield item
+
+def test_map_in_order_keeps_input_order():
+    def slow_for_small(item):
+        time.sleep(0.002 * (10 - item))
+        return item * item
+    assert list(map_in_order(slow_for_small, range(10), workers=4, max_pending=2)) == [n * n for n in range(10)]
+
+def test_map_in_order_bounds_items_taken_ahead():
+    taken = []
+    results = map_in_order(lambda item: item, _counted(100, taken), workers=2, max_pending=1)
+    assert next(results) == 0
+    time.sleep(0.05)
+    # Nothing beyond workers + max_pending items is pulled while the consumer waits
+    assert taken == [0, 1, 2]
+    results.close()
+
+def test_map_in_order_raises_stage_errors_in_order():
+    def fail_on_three(item):
+        if item == 3:
+            raise ValueError("bad item")
+        return item
+    results = map_in_order(fail_on_three, range(10), workers=3)
+    assert [next(results) for _ in range(3)] == [0, 1, 2]
+    with pytest.raises(ValueError, match="bad item"):
+        next(results)
+
+def test_prefetch_stops_producer_when_closed():
+    taken = []
+    items = prefetch(_counted(1000, taken), maxsize=4)
+    assert next(items) == 0
+    items.close()
+    assert len(taken) < 10
+
+def test_prefetch_raises_producer_errors():
+    def produce():
+        yield 1
+        raise RuntimeError("extraction failed")
+    items = prefetch(produce(), maxsize=2)
+    assert next(items) == 1
+    with pytest.raises(RuntimeError, match="extraction failed"):
+        next(items)
+
+def test_stages_run_concurrently():
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def stage(item):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.01)
+        with lock:
+            active[0] -= 1
+        return item
+
+    assert list(map_in_order(stage, prefetch(range(8), maxsize=2), workers=3)) == list(range(8))
+    assert peak[0] > 1
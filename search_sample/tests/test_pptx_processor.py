@@ -0,0 +1,37 @@
+import io
+
+from pptx import Presentation
+from pptx.enum.shapes import MSO_SHAPE
+from pptx.util import Inches
+
+from functions.pptx_processor import iter_pptx_slides
+
+
+def _deck() -> bytes:
+    presentation = Presentation()
+    slide = presentation.slides.add_slide(presentation.slide_layouts[6])
+    group = slide.shapes.add_group_shape()
+    group.shapes.add_textbox(Inches(1), Inches(1), Inches(3), Inches(1)).text_frame.text = "Grouped text"
+    table = slide.shapes.add_table(2, 2, Inches(1), Inches(3), Inches(4), Inches(1)).table
+    for r, row in enumerate([["Name", "Qty"], ["Bolts", "12"]]):
+        for c, value in enumerate(row):
+            table.cell(r, c).text = value
+    # A p:sp without preset geometry or txBox: python-pptx cannot classify its shape_type
+    odd = slide.shapes.add_shape(MSO_SHAPE.RECTANGLE, Inches(5), Inches(1), Inches(2), Inches(1))
+    odd.text_frame.text = "Unclassified shape"
+    geometry = odd._element.spPr.prstGeom
+    geometry.getparent().remove(geometry)
+    slide.notes_slide.notes_text_frame.text = "Speaker notes"
+    presentation.slides.add_slide(presentation.slide_layouts[6])
+    data = io.BytesIO()
+    presentation.save(data)
+    return data.getvalue()
+
+
+def test_slides_include_grouped_unclassified_tables_and_notes():
+    first, second = iter_pptx_slides(_deck())
+    assert first["page_number"] == 1
+    assert first["combined_text"] == "Grouped text Name | Qty Bolts | 12 Unclassified shape Speaker notes"
+    assert first["tables"] == [["Name | Qty", "Bolts | 12"]]
+    assert first["notes"] == "Speaker notes"
+    assert second == {"page_number": 2, "combined_text": ""}
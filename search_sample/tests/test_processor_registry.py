@@ -0,0 +1,35 @@
+import importlib.util
+
+import pytest
+
+from functions.processor_registry import check_imports, get_extractor, get_processor, import_time_report, registered_types
+from utils.sniff_utils import PDF, DOCX, XLSX, PPTX
+
+PARSER_STACKS = {"fitz", "pymupdf", "openpyxl", "pptx"}
+
+
+def _loaded_packages(module: str) -> set:
+    return {name.split(".")[0] for name in import_time_report(module).modules}
+
+
+def test_registry_resolves_every_kind():
+    assert set(registered_types()) == {PDF, DOCX, XLSX, PPTX}
+    for kind in registered_types():
+        assert callable(get_extractor(kind))
+        assert callable(get_processor(kind).main)
+
+def test_unknown_kind_is_rejected():
+    with pytest.raises(ValueError):
+        get_processor("txt")
+
+def test_batch_worker_import_loads_no_parser_stack():
+    assert not _loaded_packages("functions.batch_worker") & PARSER_STACKS
+
+@pytest.mark.parametrize("module", ["functions.worker", "functions.worker_batch"])
+def test_worker_entry_import_loads_no_parser_stack(module):
+    if importlib.util.find_spec("azure.functions") is None:
+        pytest.skip("azure-functions is not installed")
+    assert not _loaded_packages(module) & PARSER_STACKS
+
+def test_processors_import_only_their_own_stack():
+    assert check_imports() == []
@@ -0,0 +1,63 @@
+import pytest
+import requests
+
+import utils.retry_utils as retry_utils
+
+
+class _Response:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.headers = {}
+
+
+class _Session:
+    """Answers POSTs from a script of status codes / exceptions."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def post(self, url, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return _Response(outcome)
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(retry_utils.time, "sleep", lambda seconds: None)
+
+
+@pytest.mark.parametrize("idempotent", [True, False])
+def test_connect_timeouts_are_retried(idempotent):
+    session = _Session(requests.ConnectTimeout("connect"), 200)
+    resp = retry_utils.post_with_retry("http://x/insert", session=session, max_retries=2, idempotent=idempotent)
+    assert resp.status_code == 200 and session.calls == 2
+
+def test_read_timeout_is_not_retried_for_inserts():
+    session = _Session(requests.ReadTimeout("read"), 200)
+    with pytest.raises(requests.ReadTimeout):
+        retry_utils.post_with_retry("http://x/insert", session=session, max_retries=2, idempotent=False)
+    assert session.calls == 1
+
+def test_read_timeout_is_retried_for_idempotent_requests():
+    session = _Session(requests.ReadTimeout("read"), 200)
+    assert retry_utils.post_with_retry("http://x/embed", session=session, max_retries=2).status_code == 200
+
+@pytest.mark.parametrize("status,idempotent,calls", [
+    (503, False, 2), (429, False, 2), (502, False, 1), (504, False, 1), (502, True, 2), (400, True, 1),
+])
+def test_status_retries(status, idempotent, calls):
+    session = _Session(status, 200)
+    retry_utils.post_with_retry("http://x/insert", session=session, max_retries=2, idempotent=idempotent)
+    assert session.calls == calls
+
+def test_is_safe_to_resend():
+    refused = requests.HTTPError(response=_Response(503))
+    gateway = requests.HTTPError(response=_Response(504))
+    assert retry_utils.is_safe_to_resend(requests.ConnectTimeout())
+    assert retry_utils.is_safe_to_resend(refused)
+    assert not retry_utils.is_safe_to_resend(gateway)
+    assert not retry_utils.is_safe_to_resend(requests.ReadTimeout())
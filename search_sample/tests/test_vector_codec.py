@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from utils.vector_codec import EncodedVectors, VectorCodec, fit_pca
+
+
+def _unit_vectors(rows=50, dim=32, seed=0):
+    matrix = np.random.default_rng(seed).normal(size=(rows, dim)).astype(np.float32)
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+@pytest.mark.parametrize("quantization,tolerance", [("none", 0.0), ("float16", 1e-3), ("int8", 1e-2)])
+def test_round_trip(quantization, tolerance):
+    vectors = _unit_vectors()
+    encoded = VectorCodec(quantization).encode(vectors)
+    assert encoded.codes.shape == vectors.shape
+    assert np.abs(encoded.decode() - vectors).max() <= tolerance
+
+def test_int8_bytes_per_vector_includes_scale():
+    encoded = VectorCodec("int8").encode(_unit_vectors(dim=32))
+    assert encoded.bytes_per_vector == 32 + 4
+    assert encoded.slice(0, 5).decode().shape == (5, 32)
+
+def test_reduction_renormalizes_and_matches_queries():
+    vectors = _unit_vectors()
+    for codec in (VectorCodec(reduction="truncate", target_dim=8),
+                  VectorCodec(reduction="pca", target_dim=8, pca_model=fit_pca(vectors, 8))):
+        decoded = codec.encode(vectors).decode()
+        assert decoded.shape == (50, 8)
+        assert np.allclose(np.linalg.norm(decoded, axis=1), 1.0, atol=1e-5)
+        assert np.allclose(codec.transform_query(vectors[0]), decoded[0], atol=1e-5)
+
+def test_payload_fields():
+    encoded = VectorCodec("int8").encode(_unit_vectors(rows=3, dim=4))
+    payload = encoded.to_payload()
+    assert payload["dim"] == 4 and payload["vector_encoding"] == "int8" and "scales" in payload
+    assert "scales" not in EncodedVectors.from_floats(_unit_vectors(rows=3, dim=4), "float16").to_payload()
@@ -0,0 +1,41 @@
+import datetime
+import io
+
+from openpyxl import Workbook
+
+from functions.xlsx_processor import iter_sheet_windows, iter_xlsx_records
+
+
+def test_windows_repeat_header_and_skip_empty_rows():
+    rows = [("Name", "Qty", None), (None,), (None, None), ("Bolts", 12.0), ("Nuts", 3), ("Washers", 7)]
+    windows = list(iter_sheet_windows(rows, rows_per_record=2, max_chars=1000, repeat_header=True))
+    assert windows == [
+        (4, 5, "Name | Qty", ["Bolts | 12", "Nuts | 3"]),
+        (6, 6, "Name | Qty", ["Washers | 7"]),
+    ]
+
+def test_windows_close_early_on_long_rows():
+    rows = [("header",), ("x" * 30,), ("y" * 30,), ("z",)]
+    windows = list(iter_sheet_windows(rows, rows_per_record=100, max_chars=50, repeat_header=True))
+    assert [(first, last) for first, last, _, _ in windows] == [(2, 2), (3, 4)]
+
+def test_single_row_sheet_and_no_header():
+    assert list(iter_sheet_windows([("only",)], repeat_header=True)) == [(1, 1, None, ["only"])]
+    windows = list(iter_sheet_windows([("a",), ("b",)], rows_per_record=1, repeat_header=False))
+    assert windows == [(1, 1, None, ["a"]), (2, 2, None, ["b"])]
+
+def test_workbook_records_number_pages_across_sheets():
+    workbook = Workbook()
+    first = workbook.active
+    first.title = "Parts"
+    first.append(["Name", "Shipped"])
+    first.append(["Bolts", datetime.date(2024, 5, 1)])
+    second = workbook.create_sheet("Notes")
+    second.append(["Remark"])
+    second.append(["Late delivery"])
+    data = io.BytesIO()
+    workbook.save(data)
+
+    records = list(iter_xlsx_records(data.getvalue()))
+    assert [(r["page_number"], r["sheet"], r["rows"]) for r in records] == [(1, "Parts", [2, 2]), (2, "Notes", [2, 2])]
+    assert records[0]["combined_text"] == "Parts: Name | Shipped Bolts | 2024-05-01T00:00:00"
@@ -0,0 +1,213 @@
+# utils/cache_utils.py
+"""
+Cache utilities — persistent, size-bounded LRU caches backed by local SQLite files.
+Used to avoid recomputing embeddings for chunks we have already seen and
+OCR for images that recur across documents (letterheads, stamps, cover sheets).
+"""
+
+import time
+import array
+import hashlib
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from config import (
+    CACHE_DIR,
+    EMBEDDING_CACHE_MAX_BYTES,
+    EMBEDDING_MODEL_ID,
+    OCR_CACHE_MAX_BYTES
+)
+
+# SQLite's default limit on host parameters per statement is 999
+_SQL_BATCH = 500
+
+
+class SQLiteLRUCache:
+    """
+    Key/value cache stored in a single SQLite file.
+    Entries are evicted least-recently-used first once the stored values exceed
+    `max_bytes`. Safe to share between threads of one process; several processes
+    may share the file, since usage is always read back from the database.
+    Hit/miss counters are per process.
+    """
+
+    def __init__(self, path: Path, max_bytes: int):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY,"
+            " value BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access)")
+        # Covering index: SUM(size) scans it instead of the rows holding the values
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_size ON entries(size)")
+
+    def _stored_bytes(self) -> int:
+        """Bytes stored by every process using the file."""
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        """Look up `keys`, returning values in the same order (None for misses)."""
+        found: Dict[str, bytes] = {}
+        unique = list(dict.fromkeys(keys))
+        with self._lock:
+            now = time.time()
+            for i in range(0, len(unique), _SQL_BATCH):
+                part = unique[i:i + _SQL_BATCH]
+                marks = ",".join("?" * len(part))
+                rows = self._conn.execute(f"SELECT key, value FROM entries WHERE key IN ({marks})", part).fetchall()
+                found.update(rows)
+                if rows:
+                    self._conn.execute(
+                        f"UPDATE entries SET last_access = ? WHERE key IN ({','.join('?' * len(rows))})",
+                        [now] + [k for k, _ in rows]
+                    )
+            values = [found.get(k) for k in keys]
+            hit_count = sum(v is not None for v in values)
+            self.hits += hit_count
+            self.misses += len(values) - hit_count
+        return values
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.get_many([key])[0]
+
+    def put_many(self, items: Dict[str, bytes]):
+        """Insert or replace entries, then evict LRU entries if over budget."""
+        if not items:
+            return
+        with self._lock:
+            now = time.time()
+            keys = list(items)
+            for i in range(0, len(keys), _SQL_BATCH):
+                part = keys[i:i + _SQL_BATCH]
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO entries (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                    [(k, items[k], len(items[k]), now) for k in part]
+                )
+            total = self._stored_bytes()
+            if total > self.max_bytes:
+                self._evict(total)
+
+    def put(self, key: str, value: bytes):
+        self.put_many({key: value})
+
+    def _evict(self, total: int):
+        """Drop oldest entries until usage (`total` bytes now) is back under 90% of `max_bytes`."""
+        target = int(self.max_bytes * 0.9)
+        doomed = []
+        freed = 0
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY last_access"):
+            if total - freed <= target:
+                break
+            doomed.append(key)
+            freed += size
+        for i in range(0, len(doomed), _SQL_BATCH):
+            part = doomed[i:i + _SQL_BATCH]
+            self._conn.execute(f"DELETE FROM entries WHERE key IN ({','.join('?' * len(part))})", part)
+        logging.info(f"[Cache] Evicted {len(doomed)} entries ({freed} bytes) from {self.path.name}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": entries,
+                "bytes": self._stored_bytes(),
+                "max_bytes": self.max_bytes,
+            }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class EmbeddingCache(SQLiteLRUCache):
+    """
+    Content-addressed embedding cache keyed by sha256(model id, normalized chunk text).
+    `model_id` defaults to embedding.model_id; providers pass their own.
+    Vectors are stored as packed float64 so cached results are bit-identical.
+    """
+
+    def __init__(self, path: Path, max_bytes: int, model_id: str = EMBEDDING_MODEL_ID):
+        super().__init__(path, max_bytes)
+        self.model_id = model_id
+
+    def key_for(self, text: str, model_id: Optional[str] = None) -> str:
+        digest = hashlib.sha256()
+        digest.update((model_id or self.model_id).encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(" ".join(text.split()).encode("utf-8"))
+        return digest.hexdigest()
+
+    def get_vectors(self, texts: Sequence[str], model_id: Optional[str] = None) -> List[Optional[List[float]]]:
+        blobs = self.get_many([self.key_for(t, model_id) for t in texts])
+        return [array.array("d", b).tolist() if b is not None else None for b in blobs]
+
+    def get_vectors_by_keys(self, keys: Sequence[str]) -> List[Optional[List[float]]]:
+        return [array.array("d", b).tolist() if b is not None else None for b in self.get_many(keys)]
+
+    def put_vectors(self, texts: Sequence[str], vectors: Sequence[Sequence[float]], model_id: Optional[str] = None):
+        self.put_many({self.key_for(t, model_id): array.array("d", v).tobytes() for t, v in zip(texts, vectors)})
+
+
+_embedding_cache: Optional[EmbeddingCache] = None
+_embedding_cache_lock = threading.Lock()
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Process-wide embedding cache, opened on first use."""
+    global _embedding_cache
+    with _embedding_cache_lock:
+        if _embedding_cache is None:
+            _embedding_cache = EmbeddingCache(Path(CACHE_DIR) / "embeddings.sqlite", EMBEDDING_CACHE_MAX_BYTES)
+        return _embedding_cache
+
+
+def ocr_cache_key(mode: str, size: tuple, pixels: bytes, settings: str) -> str:
+    """OCR cache key of an image; pure, so hashing never opens the cache."""
+    digest = hashlib.sha256()
+    digest.update(f"{mode}|{size[0]}x{size[1]}|{settings}".encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(pixels)
+    return digest.hexdigest()
+
+class OcrCache(SQLiteLRUCache):
+    """
+    OCR text cache keyed by sha256(decoded pixels, image mode/size, OCR settings),
+    so the same image re-encoded in another PDF still hits (see ocr_cache_key).
+    """
+
+    key_for = staticmethod(ocr_cache_key)
+
+    def get_texts(self, keys: Sequence[str]) -> List[Optional[str]]:
+        return [b.decode("utf-8") if b is not None else None for b in self.get_many(keys)]
+
+    def put_texts(self, items: Dict[str, str]):
+        self.put_many({key: text.encode("utf-8") for key, text in items.items()})
+
+
+_ocr_cache: Optional[OcrCache] = None
+_ocr_cache_lock = threading.Lock()
+
+def get_ocr_cache() -> OcrCache:
+    """Process-wide OCR cache, opened on first use."""
+    global _ocr_cache
+    with _ocr_cache_lock:
+        if _ocr_cache is None:
+            _ocr_cache = OcrCache(Path(CACHE_DIR) / "ocr.sqlite", OCR_CACHE_MAX_BYTES)
+        return _ocr_cache
@@ -0,0 +1,72 @@
+# utils/checkpoint_utils.py
+"""
+Checkpoint utilities — resumable processing for very large documents.
+Stages record completed ranges in the processing_checkpoints table; a retry
+skips ranges that are already done. Documents without a database UUID (or with
+checkpoint.enabled off) simply run without checkpoints.
+"""
+
+import uuid
+import logging
+from typing import Dict, NamedTuple, Optional
+
+from config import CHECKPOINT_ENABLED
+from db import crud
+from db.session import SessionLocal
+
+EXTRACTION_STAGE = "extraction"
+EMBEDDING_STAGE = "embedding"
+
+
+class Checkpoint(NamedTuple):
+    start: int
+    end: int
+    marker: Optional[str]
+
+
+def _as_uuid(document_id) -> Optional[uuid.UUID]:
+    if not CHECKPOINT_ENABLED:
+        return None
+    try:
+        return uuid.UUID(str(document_id))
+    except ValueError:
+        return None
+
+def load_checkpoints(document_id, stage: str, source_hash: Optional[str] = None) -> Dict[int, Checkpoint]:
+    """Completed ranges of `stage` by start position; ranges recorded for other source bytes are ignored."""
+    doc_uuid = _as_uuid(document_id)
+    if doc_uuid is None:
+        return {}
+    db = SessionLocal()
+    try:
+        rows = crud.get_checkpoints(db, doc_uuid, stage)
+    finally:
+        db.close()
+    checkpoints = {
+        row.range_start: Checkpoint(row.range_start, row.range_end, row.marker)
+        for row in rows if source_hash is None or row.source_hash == source_hash
+    }
+    if checkpoints:
+        logging.info(f"[Checkpoint] Resuming {stage} of document {document_id}: {len(checkpoints)} ranges done")
+    return checkpoints
+
+def record_checkpoint(document_id, stage: str, start: int, end: int,
+                      source_hash: Optional[str] = None, marker: Optional[str] = None):
+    doc_uuid = _as_uuid(document_id)
+    if doc_uuid is None:
+        return
+    db = SessionLocal()
+    try:
+        crud.add_checkpoint(db, doc_uuid, stage, start, end, source_hash, marker)
+    finally:
+        db.close()
+
+def clear_checkpoints(document_id, stage: Optional[str] = None):
+    doc_uuid = _as_uuid(document_id)
+    if doc_uuid is None:
+        return
+    db = SessionLocal()
+    try:
+        crud.clear_checkpoints(db, doc_uuid, stage)
+    finally:
+        db.close()
@@ -0,0 +1,258 @@
+# utils/dedup_utils.py
+"""
+Near-duplicate utilities — MinHash/LSH detection of templated chunks before embedding.
+Chunks whose estimated Jaccard similarity (word shingles) to an already-embedded chunk
+reaches `dedup.threshold` reuse that chunk's vector from the embedding cache instead of
+calling the model. Signatures live in a persistent local SQLite index so matches work
+across documents and runs.
+"""
+
+import zlib
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import (
+    CACHE_DIR,
+    EMBEDDING_CACHE_ENABLED,
+    DEDUP_THRESHOLD,
+    DEDUP_NUM_PERM,
+    DEDUP_BANDS,
+    DEDUP_SHINGLE_SIZE,
+    DEDUP_MIN_WORDS,
+    DEDUP_MAX_ENTRIES
+)
+from utils.cache_utils import get_embedding_cache
+from utils.embedding_providers import EmbeddingProvider, get_provider
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+class MinHasher:
+    """MinHash over lowercase word shingles, vectorized with NumPy."""
+
+    def __init__(self, num_perm: int = DEDUP_NUM_PERM, shingle_size: int = DEDUP_SHINGLE_SIZE, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self._a = rng.integers(1, (1 << 61) - 1, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, (1 << 61) - 1, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        words = text.lower().split()
+        size = min(self.shingle_size, len(words)) or 1
+        shingles = {" ".join(words[i:i + size]) for i in range(max(1, len(words) - size + 1))}
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+        # (a * h + b) mod p, truncated to 32 bits; uint64 overflow is part of the hash family
+        with np.errstate(over="ignore"):
+            permuted = ((hashes[:, None] * self._a + self._b) % _MERSENNE_PRIME) & _MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+
+def similarity(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two MinHash signatures."""
+    return float(np.count_nonzero(sig_a == sig_b)) / len(sig_a)
+
+
+class NearDuplicateIndex:
+    """
+    Persistent LSH index: each signature is split into `bands` bands whose hashes are
+    bucket keys. Candidates sharing a bucket are verified against `threshold`.
+    Each entry points at the embedding-cache key of the chunk that was embedded;
+    a key is indexed once, however often its text is ingested.
+    """
+
+    def __init__(self, path: Path, threshold: float = DEDUP_THRESHOLD, num_perm: int = DEDUP_NUM_PERM,
+                 bands: int = DEDUP_BANDS, max_entries: int = DEDUP_MAX_ENTRIES):
+        if num_perm % bands:
+            raise ValueError(f"dedup.num_perm ({num_perm}) must be a multiple of dedup.bands ({bands})")
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.max_entries = max_entries
+        self.hasher = MinHasher(num_perm)
+        # near_duplicates: matches found; reused: those whose vector was still cached
+        self.stats_counters = {"checked": 0, "near_duplicates": 0, "reused": 0, "embedded": 0}
+        self._stats_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS signatures ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " cache_key TEXT NOT NULL,"
+            " signature BLOB NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets ("
+            " band INTEGER NOT NULL, bucket INTEGER NOT NULL, sig_id INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_buckets ON buckets(band, bucket)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_buckets_sig ON buckets(sig_id)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_signatures_key ON signatures(cache_key)")
+
+    def band_keys(self, signature: np.ndarray) -> List[int]:
+        keys = []
+        for band in range(self.bands):
+            digest = hashlib.blake2b(signature[band * self.rows:(band + 1) * self.rows].tobytes(), digest_size=8).digest()
+            keys.append(int.from_bytes(digest, "little") & 0x7FFFFFFFFFFFFFFF)  # fits SQLite INTEGER
+        return keys
+
+    def find(self, signature: np.ndarray) -> Optional[Tuple[str, float]]:
+        """Best stored match at or above the threshold: (cache_key, similarity)."""
+        with self._lock:
+            candidates = set()
+            for band, key in enumerate(self.band_keys(signature)):
+                rows = self._conn.execute("SELECT sig_id FROM buckets WHERE band = ? AND bucket = ?", (band, key))
+                candidates.update(row[0] for row in rows)
+            if not candidates:
+                return None
+            marks = ",".join("?" * len(candidates))
+            rows = self._conn.execute(f"SELECT cache_key, signature FROM signatures WHERE id IN ({marks})", list(candidates)).fetchall()
+        best = None
+        for cache_key, blob in rows:
+            score = similarity(signature, np.frombuffer(blob, dtype=np.uint32))
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (cache_key, score)
+        return best
+
+    def add_many(self, entries: List[Tuple[np.ndarray, str]]):
+        """Index (signature, cache_key) pairs, skipping keys that are already indexed."""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            for signature, cache_key in entries:
+                if self._conn.execute("SELECT 1 FROM signatures WHERE cache_key = ?", (cache_key,)).fetchone():
+                    continue
+                cur = self._conn.execute(
+                    "INSERT INTO signatures (cache_key, signature) VALUES (?, ?)", (cache_key, signature.tobytes())
+                )
+                self._conn.executemany(
+                    "INSERT INTO buckets (band, bucket, sig_id) VALUES (?, ?, ?)",
+                    [(band, key, cur.lastrowid) for band, key in enumerate(self.band_keys(signature))]
+                )
+            self._conn.execute("COMMIT")
+            self._prune()
+
+    def _prune(self):
+        """Drop the oldest signatures beyond `max_entries`."""
+        count = self._conn.execute("SELECT COUNT(*) FROM signatures").fetchone()[0]
+        if count <= self.max_entries:
+            return
+        cutoff = self._conn.execute(
+            "SELECT id FROM signatures ORDER BY id LIMIT 1 OFFSET ?", (count - self.max_entries,)
+        ).fetchone()[0]
+        self._conn.execute("DELETE FROM buckets WHERE sig_id < ?", (cutoff,))
+        self._conn.execute("DELETE FROM signatures WHERE id < ?", (cutoff,))
+
+    def count(self, **deltas: int):
+        """Add one call's counts; embed workers call this concurrently."""
+        with self._stats_lock:
+            for name, delta in deltas.items():
+                self.stats_counters[name] += delta
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM signatures").fetchone()[0]
+        with self._stats_lock:
+            counters = dict(self.stats_counters)
+        checked = counters["checked"]
+        return {
+            **counters,
+            "dedup_rate": counters["reused"] / checked if checked else 0.0,
+            "index_entries": entries,
+        }
+
+
+_index: Optional[NearDuplicateIndex] = None
+_index_lock = threading.Lock()
+
+def get_near_duplicate_index() -> NearDuplicateIndex:
+    """Process-wide signature index, opened on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = NearDuplicateIndex(Path(CACHE_DIR) / "minhash.sqlite")
+        return _index
+
+
+def embed_with_near_dedup(chunks: List[str], provider: Optional[EmbeddingProvider] = None) -> List[List[float]]:
+    """
+    Drop-in for generate_embeddings: chunks that near-duplicate an already embedded
+    chunk (in the persistent index or earlier in this batch) reuse its vector; only
+    the rest are embedded. Requires the embedding cache, which holds the vectors.
+    """
+    # imported here: embedding_utils is the heavier module and may import this one later
+    from utils.embedding_utils import generate_embeddings
+
+    provider = provider or get_provider()
+    if not EMBEDDING_CACHE_ENABLED:
+        logging.warning("[Dedup] Embedding cache disabled; near-duplicate reuse skipped.")
+        return generate_embeddings(chunks, provider=provider)
+
+    index = get_near_duplicate_index()
+    cache = get_embedding_cache()
+    keys = [cache.key_for(text, provider.model_id) for text in chunks]
+
+    # Which chunk each text reuses: a cache key (stored match) or a position in this batch
+    stored_match: Dict[int, str] = {}
+    local_match: Dict[int, int] = {}
+    signatures: Dict[int, np.ndarray] = {}
+    local_buckets: Dict[Tuple[int, int], List[int]] = {}
+
+    checked = 0
+    for idx, text in enumerate(chunks):
+        if len(text.split()) < DEDUP_MIN_WORDS:
+            continue
+        checked += 1
+        signature = index.hasher.signature(text)
+        match = index.find(signature)
+        if match is not None and match[0] != keys[idx]:
+            stored_match[idx] = match[0]
+            continue
+        band_keys = index.band_keys(signature)
+        candidates = {j for band, key in enumerate(band_keys) for j in local_buckets.get((band, key), ())}
+        best = max(candidates, key=lambda j: similarity(signature, signatures[j]), default=None)
+        if best is not None and similarity(signature, signatures[best]) >= index.threshold:
+            local_match[idx] = best
+            continue
+        signatures[idx] = signature
+        for band, key in enumerate(band_keys):
+            local_buckets.setdefault((band, key), []).append(idx)
+
+    near = len(stored_match) + len(local_match)
+    # Vectors of stored representatives (may have been evicted from the cache)
+    reused_keys = list(dict.fromkeys(stored_match.values()))
+    reused = dict(zip(reused_keys, cache.get_vectors_by_keys(reused_keys)))
+    for idx in [i for i, key in stored_match.items() if reused[key] is None]:
+        del stored_match[idx]
+        signatures[idx] = index.hasher.signature(chunks[idx])
+
+    to_embed = [idx for idx in range(len(chunks)) if idx not in stored_match and idx not in local_match]
+    fresh = dict(zip(to_embed, generate_embeddings([chunks[i] for i in to_embed], provider=provider)))
+    index.add_many([(signatures[idx], keys[idx]) for idx in to_embed if idx in signatures])
+
+    vectors = []
+    for idx in range(len(chunks)):
+        if idx in stored_match:
+            vectors.append(reused[stored_match[idx]])
+        elif idx in local_match:
+            vectors.append(fresh[local_match[idx]])
+        else:
+            vectors.append(fresh[idx])
+
+    reused_count = len(stored_match) + len(local_match)
+    index.count(checked=checked, near_duplicates=near, reused=reused_count, embedded=len(to_embed))
+    logging.info(
+        f"[Dedup] {reused_count}/{len(chunks)} chunks reused a near-duplicate vector "
+        f"({len(stored_match)} from index, {len(local_match)} within document, "
+        f"{near - reused_count} evicted from the cache); {len(to_embed)} embedded."
+    )
+    return vectors
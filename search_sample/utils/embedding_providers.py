@@ -0,0 +1,118 @@
+# utils/embedding_providers.py
+"""
+Embedding providers — one interface behind generate_embeddings / embed_query.
+Dispatches on `embedding.provider` in config.yaml:
+- "mosaic": MosaicML / Databricks model serving endpoint (batched, concurrent, retried)
+- "local":  in-process CPU hashing + random-projection embedder (no network)
+"""
+
+import re
+import zlib
+import logging
+from typing import Dict, List, Optional, Type
+
+import numpy as np
+
+from config import (
+    EMBEDDING_PROVIDER,
+    EMBEDDING_MODEL_ID,
+    EMBEDDING_BATCHED,
+    EMBEDDING_MAX_IN_FLIGHT,
+    EMBEDDING_LOCAL_DIMENSION,
+    EMBEDDING_LOCAL_BUCKETS,
+    EMBEDDING_LOCAL_SEED
+)
+
+
+class EmbeddingProvider:
+    """Base class: turn a list of texts into vectors, in the same order."""
+
+    name = "base"
+
+    @property
+    def model_id(self) -> str:
+        """Identity used to namespace cached vectors."""
+        return self.name
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        raise NotImplementedError
+
+
+class MosaicProvider(EmbeddingProvider):
+    name = "mosaic"
+
+    def __init__(self, batched: bool = EMBEDDING_BATCHED, max_in_flight: int = EMBEDDING_MAX_IN_FLIGHT):
+        self.batched = batched
+        self.max_in_flight = max_in_flight
+
+    @property
+    def model_id(self) -> str:
+        return EMBEDDING_MODEL_ID
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        # embedding_utils imports this module, so resolve the HTTP path lazily
+        from utils.embedding_utils import embed_with_mosaic
+        return embed_with_mosaic(texts, batched=self.batched, max_in_flight=self.max_in_flight)
+
+
+class LocalHashingProvider(EmbeddingProvider):
+    """
+    Deterministic CPU embedder: lowercase word tokens are hashed (crc32) into
+    `buckets` sublinear term counts, projected with a fixed Gaussian matrix to
+    `dimension` and L2-normalized. No semantic quality — meant for offline
+    ingestion runs and throughput benchmarks (benchmarks.embedding_providers).
+    """
+
+    name = "local"
+    _token_re = re.compile(r"\w+")
+
+    def __init__(self, dimension: int = EMBEDDING_LOCAL_DIMENSION, buckets: int = EMBEDDING_LOCAL_BUCKETS,
+                 seed: int = EMBEDDING_LOCAL_SEED, batch_size: int = 256):
+        self.dimension = dimension
+        self.buckets = buckets
+        self.seed = seed
+        self.batch_size = batch_size
+        rng = np.random.default_rng(seed)
+        self._projection = (rng.standard_normal((buckets, dimension)) / np.sqrt(dimension)).astype(np.float32)
+
+    @property
+    def model_id(self) -> str:
+        return f"local-hash-{self.dimension}-{self.buckets}-{self.seed}"
+
+    def _bucket_ids(self, text: str) -> List[int]:
+        return [zlib.crc32(tok.encode("utf-8")) % self.buckets for tok in self._token_re.findall(text.lower())]
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts[start:start + self.batch_size]
+            rows, cols = [], []
+            for row, text in enumerate(batch):
+                ids = self._bucket_ids(text)
+                rows.extend([row] * len(ids))
+                cols.extend(ids)
+            counts = np.zeros((len(batch), self.buckets), dtype=np.float32)
+            np.add.at(counts, (np.asarray(rows, dtype=np.intp), np.asarray(cols, dtype=np.intp)), 1.0)
+            dense = np.log1p(counts) @ self._projection
+            norms = np.linalg.norm(dense, axis=1, keepdims=True)
+            dense /= np.where(norms == 0, 1.0, norms)
+            vectors.extend(dense.tolist())
+        return vectors
+
+
+# provider name -> class
+PROVIDERS: Dict[str, Type[EmbeddingProvider]] = {
+    MosaicProvider.name: MosaicProvider,
+    LocalHashingProvider.name: LocalHashingProvider,
+}
+
+_instances: Dict[str, EmbeddingProvider] = {}
+
+def get_provider(name: Optional[str] = None) -> EmbeddingProvider:
+    """Return the (shared) provider registered under `name`, default embedding.provider."""
+    name = (name or EMBEDDING_PROVIDER).lower()
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown embedding provider '{name}', expected one of {sorted(PROVIDERS)}")
+    if name not in _instances:
+        _instances[name] = PROVIDERS[name]()
+    return _instances[name]
@@ -1,97 +1,542 @@
-"""
-Embedding utilities — handles text chunking and embedding generation via MosaicML / Databricks model serving.
-Stores vectors directly into MosaicDB.
-"""
-
-import re
-import logging
-import requests
-from typing import List
-from config import (
-    MOSAICDB_URI,
-    MOSAIC_API_KEY,
-    MOSAIC_MODEL_ENDPOINT,
-    CHUNK_SIZE,
-    CHUNK_OVERLAP
-)
-
-def normalize_whitespace(text: str) -> str:
-    """Collapse multiple spaces/newlines into single spaces."""
-    return re.sub(r'\s+', ' ', text).strip()
-
-def chunk_text(text: str, max_tokens: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP) -> List[str]:
-    """
-    Split text into chunks of `max_tokens` words with `overlap` words carried over.
-    Sentence-aware splitting when possible.
-    """
-    text = normalize_whitespace(text)
-    sentences = re.split(r'(?<=[.?!])\s+', text)
-
-    chunks = []
-    current_chunk = []
-    token_count = 0
-
-    for sentence in sentences:
-        sentence_tokens = sentence.split()
-        if token_count + len(sentence_tokens) > max_tokens:
-            if current_chunk:
-                chunks.append(" ".join(current_chunk))
-            if overlap > 0 and chunks:
-                overlap_tokens = chunks[-1].split()[-overlap:]
-                current_chunk = overlap_tokens + sentence_tokens
-            else:
-                current_chunk = sentence_tokens
-            token_count = len(current_chunk)
-        else:
-            current_chunk.extend(sentence_tokens)
-            token_count += len(sentence_tokens)
-
-    if current_chunk:
-        chunks.append(" ".join(current_chunk))
-
-    logging.info(f"[Chunking] Created {len(chunks)} chunks (size={max_tokens}, overlap={overlap}).")
-    return chunks
-
-def generate_embeddings(chunks: List[str]) -> List[List[float]]:
-    """
-    Generate embeddings from MosaicML / Databricks model serving endpoint.
-    """
-    headers = {
-        "Authorization": f"Bearer {MOSAIC_API_KEY}",
-        "Content-Type": "application/json"
-    }
-
-    embeddings = []
-    for idx, chunk in enumerate(chunks, start=1):
-        payload = {"text": chunk}
-        resp = requests.post(MOSAIC_MODEL_ENDPOINT, headers=headers, json=payload)
-        resp.raise_for_status()
-        result = resp.json()
-
-        if "embedding" not in result:
-            raise ValueError(f"Invalid response from Mosaic endpoint: {result}")
-
-        embeddings.append(result["embedding"])
-        logging.debug(f"[Embedding] Generated vector {idx}/{len(chunks)}")
-
-    logging.info(f"[Embedding] Generated {len(embeddings)} embeddings.")
-    return embeddings
-
-def store_embeddings(document_id: str, chunks: List[str], vectors: List[List[float]], metadata: dict = None):
-    """
-    Store embeddings into MosaicDB with optional metadata.
-    """
-    headers = {
-        "Authorization": f"Bearer {MOSAIC_API_KEY}",
-        "Content-Type": "application/json"
-    }
-    payload = {
-        "document_id": document_id,
-        "embeddings": [
-            {"chunk": chunk, "vector": vector, "metadata": metadata or {}}
-            for chunk, vector in zip(chunks, vectors)
-        ]
-    }
-    resp = requests.post(f"{MOSAICDB_URI}/insert", headers=headers, json=payload)
-    resp.raise_for_status()
-    logging.info(f"[MosaicDB] Stored {len(vectors)} embeddings for document {document_id}.")
+"""
+Embedding utilities — handles text chunking and embedding generation via MosaicML / Databricks model serving
+(or any provider registered in utils.embedding_providers).
+Stores vectors directly into MosaicDB.
+"""
+
+import re
+import json
+import time
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Iterator, Iterable, Callable, NamedTuple, Optional, Tuple, Union
+from config import (
+    MOSAICDB_URI,
+    MOSAIC_MODEL_ENDPOINT,
+    MOSAICDB_BULK_INSERT,
+    MOSAICDB_INSERT_PAGE_ROWS,
+    MOSAICDB_INSERT_PAGE_MAX_BYTES,
+    MOSAICDB_VECTOR_ENCODING,
+    MOSAICDB_INSERT_MAX_IN_FLIGHT,
+    MOSAICDB_INSERT_PAGE_RETRIES,
+    CHUNK_SIZE,
+    CHUNK_OVERLAP,
+    EMBEDDING_BATCHED,
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_BATCH_MAX_BYTES,
+    EMBEDDING_MAX_IN_FLIGHT,
+    EMBEDDING_REQUESTS_PER_SECOND,
+    EMBEDDING_BURST,
+    EMBEDDING_CACHE_ENABLED
+)
+from utils.retry_utils import TokenBucket, is_safe_to_resend
+from utils.http_utils import post_json
+from utils.cache_utils import get_embedding_cache
+from utils.embedding_providers import EmbeddingProvider, get_provider
+from utils.vector_codec import EncodedVectors
+from utils.incremental_utils import row_ids
+
+# Shared by every embedding request made from this process: the rate limit, and
+# embedding.max_in_flight requests at once across all callers (pipeline embed
+# workers, concurrent documents), not per call
+_rate_limiter = TokenBucket(EMBEDDING_REQUESTS_PER_SECOND, EMBEDDING_BURST)
+_request_slots = threading.BoundedSemaphore(max(1, EMBEDDING_MAX_IN_FLIGHT))
+
+def normalize_whitespace(text: str) -> str:
+    """Collapse multiple spaces/newlines into single spaces."""
+    return re.sub(r'\s+', ' ', text).strip()
+
+class Chunk(NamedTuple):
+    """A chunk plus where it came from: page numbers and character offsets within those pages."""
+    index: int
+    text: str
+    start_page: int
+    start_offset: int
+    end_page: int
+    end_offset: int
+
+    def ref(self) -> dict:
+        return {
+            "chunk_index": self.index,
+            "start_page": self.start_page,
+            "start_offset": self.start_offset,
+            "end_page": self.end_page,
+            "end_offset": self.end_offset,
+        }
+
+_SENTENCE_BREAK_RE = re.compile(r"(?<=[.?!])\s+")
+_WORD_RE = re.compile(r"\S+")
+_SENTENCE_END = (".", "?", "!")
+
+class _Piece(NamedTuple):
+    """Run of words inside one page: offsets of its first word start / last word end."""
+    page: int
+    text: str
+    start: int
+    end: int
+    count: int
+
+def _iter_pieces(page_number: int, text: str) -> Iterator[Tuple[_Piece, List[str]]]:
+    """Yield the sentence pieces of one page with their words (split in C, no per-word Python work)."""
+    pos = 0
+    for brk in _SENTENCE_BREAK_RE.finditer(text):
+        segment = text[pos:brk.start()]
+        words = segment.split()
+        if words:
+            lead = len(segment) - len(segment.lstrip())
+            yield _Piece(page_number, text, pos + lead, brk.start(), len(words)), words
+        pos = brk.end()
+    segment = text[pos:]
+    words = segment.split()
+    if words:
+        lead = len(segment) - len(segment.lstrip())
+        yield _Piece(page_number, text, pos + lead, pos + len(segment.rstrip()), len(words)), words
+
+def _word_start(piece: _Piece, skip: int) -> int:
+    """Offset of word number `skip` inside `piece` (only evaluated at chunk boundaries)."""
+    if skip == 0:
+        return piece.start
+    for idx, match in enumerate(_WORD_RE.finditer(piece.text, piece.start, piece.end)):
+        if idx == skip:
+            return match.start()
+    raise ValueError("word index outside piece")
+
+def iter_chunks(pages: Union[str, Iterable[Tuple[int, str]]], max_tokens: int = CHUNK_SIZE,
+                overlap: int = CHUNK_OVERLAP) -> Iterator[Chunk]:
+    """
+    Stream chunks of `max_tokens` words with `overlap` words carried over, walking the
+    text once. `pages` is a string (treated as page 1) or an iterable of
+    (page_number, text) pairs, consumed lazily, so memory stays at one page plus the
+    chunk being built. Sentences end at words ending in . ? or ! and may span pages;
+    sentences are never split, so a sentence longer than `max_tokens` becomes one
+    oversized chunk (as chunk_text always did).
+    Produces exactly the texts of `chunk_text`.
+    """
+    if isinstance(pages, str):
+        pages = [(1, pages)]
+
+    # chunk being filled: its words, the pieces they come from, words to skip in pieces[0]
+    words: List[str] = []
+    pieces: List[_Piece] = []
+    skip = 0
+    emitted = 0
+    # sentence being assembled (may continue onto the next page)
+    sentence_words: List[str] = []
+    sentence_pieces: List[_Piece] = []
+
+    def make_chunk() -> Chunk:
+        return Chunk(emitted, " ".join(words), pieces[0].page, _word_start(pieces[0], skip),
+                     pieces[-1].page, pieces[-1].end)
+
+    def overlap_tail():
+        """Pieces and skip for the last `overlap` words of the chunk just emitted."""
+        keep = min(overlap, len(words))
+        need = keep
+        idx = len(pieces) - 1
+        while True:
+            available = pieces[idx].count - (skip if idx == 0 else 0)
+            if available >= need:
+                return words[-keep:], pieces[idx:], pieces[idx].count - need
+            need -= available
+            idx -= 1
+
+    def close_sentence():
+        nonlocal words, pieces, skip, emitted
+        if len(words) + len(sentence_words) > max_tokens:
+            has_previous = emitted > 0
+            if words:
+                yield make_chunk()
+                emitted += 1
+                has_previous = True
+            if overlap > 0 and has_previous:
+                tail_words, tail_pieces, skip = overlap_tail()
+                words = tail_words + sentence_words
+                pieces = tail_pieces + sentence_pieces
+            else:
+                words, pieces, skip = list(sentence_words), list(sentence_pieces), 0
+        else:
+            words.extend(sentence_words)
+            pieces.extend(sentence_pieces)
+
+    for page_number, text in pages:
+        for piece, piece_words in _iter_pieces(page_number, text):
+            sentence_words.extend(piece_words)
+            sentence_pieces.append(piece)
+            if piece_words[-1].endswith(_SENTENCE_END):
+                yield from close_sentence()
+                sentence_words, sentence_pieces = [], []
+
+    if sentence_words:
+        yield from close_sentence()
+    if words:
+        yield make_chunk()
+
+def chunk_text(text: str, max_tokens: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP) -> List[str]:
+    """
+    Split text into chunks of `max_tokens` words with `overlap` words carried over.
+    Sentence-aware splitting when possible. See `iter_chunks` for the streaming form.
+    """
+    chunks = [chunk.text for chunk in iter_chunks(text, max_tokens, overlap)]
+    logging.info(f"[Chunking] Created {len(chunks)} chunks (size={max_tokens}, overlap={overlap}).")
+    return chunks
+
+def _text_payload_bytes(text: str) -> int:
+    """Approximate bytes a text adds to a JSON request body (quoted + separator)."""
+    return len(json.dumps(text, ensure_ascii=False).encode("utf-8")) + 2
+
+def _next_batch(chunks: List[str], start: int, max_chunks: int, max_bytes: int) -> List[str]:
+    """
+    Return the longest slice of `chunks` starting at `start` that holds at most
+    `max_chunks` texts and `max_bytes` of JSON payload. A single oversized chunk
+    still gets its own batch so nothing is dropped.
+    """
+    end = start
+    batch_bytes = 0
+    while end < len(chunks) and end - start < max_chunks:
+        size = _text_payload_bytes(chunks[end])
+        if end > start and batch_bytes + size > max_bytes:
+            break
+        batch_bytes += size
+        end += 1
+    return chunks[start:end]
+
+def iter_batches(chunks: List[str], max_chunks: int = EMBEDDING_BATCH_SIZE,
+                 max_bytes: int = EMBEDDING_BATCH_MAX_BYTES) -> Iterator[List[str]]:
+    """Yield consecutive batches of `chunks` capped by chunk count and payload bytes."""
+    start = 0
+    while start < len(chunks):
+        batch = _next_batch(chunks, start, max_chunks, max_bytes)
+        start += len(batch)
+        yield batch
+
+def _embed_single(chunk: str) -> List[float]:
+    """One chunk per request: {"text": ...} -> {"embedding": [...]}."""
+    with _request_slots:
+        resp = post_json(MOSAIC_MODEL_ENDPOINT, {"text": chunk}, limiter=_rate_limiter)
+    resp.raise_for_status()
+    result = resp.json()
+
+    if "embedding" not in result:
+        raise ValueError(f"Invalid response from Mosaic endpoint: {result}")
+
+    return result["embedding"]
+
+class PayloadTooLargeError(Exception):
+    """Raised when the model endpoint rejects a request body as too large (HTTP 413)."""
+
+def _embed_batch(batch: List[str]) -> List[List[float]]:
+    """Many chunks per request: {"texts": [...]} -> {"embeddings": [[...], ...]}."""
+    with _request_slots:
+        resp = post_json(MOSAIC_MODEL_ENDPOINT, {"texts": batch}, limiter=_rate_limiter)
+    if resp.status_code == 413:
+        raise PayloadTooLargeError(f"Payload of {len(batch)} chunks rejected by Mosaic endpoint")
+    resp.raise_for_status()
+    result = resp.json()
+
+    vectors = result.get("embeddings")
+    if not isinstance(vectors, list) or len(vectors) != len(batch):
+        raise ValueError(f"Invalid batch response from Mosaic endpoint: expected {len(batch)} embeddings, got {result}")
+
+    return vectors
+
+def _embed_batch_splitting(batch: List[str]) -> List[List[float]]:
+    """Embed a batch, halving it recursively whenever the endpoint answers 413."""
+    try:
+        return _embed_batch(batch)
+    except PayloadTooLargeError:
+        if len(batch) == 1:
+            raise
+        mid = len(batch) // 2
+        logging.warning(f"[Embedding] Payload too large for {len(batch)} chunks, splitting into {mid}+{len(batch) - mid}.")
+        return _embed_batch_splitting(batch[:mid]) + _embed_batch_splitting(batch[mid:])
+
+def _map_in_flight(fn: Callable, items: list, max_in_flight: int) -> list:
+    """
+    Apply `fn` to every item with at most `max_in_flight` calls running at once.
+    Results are returned in input order; the first failure cancels pending work.
+    """
+    if max_in_flight <= 1 or len(items) <= 1:
+        return [fn(item) for item in items]
+
+    executor = ThreadPoolExecutor(max_workers=min(max_in_flight, len(items)), thread_name_prefix="embed")
+    try:
+        futures = [executor.submit(fn, item) for item in items]
+        return [f.result() for f in futures]
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+def embed_with_mosaic(chunks: List[str], batched: bool = EMBEDDING_BATCHED,
+                      max_in_flight: int = EMBEDDING_MAX_IN_FLIGHT) -> List[List[float]]:
+    """
+    Embed `chunks` on the MosaicML / Databricks model serving endpoint (no cache).
+    With `batched=True`, chunks are packed into requests capped by
+    EMBEDDING_BATCH_SIZE chunks and EMBEDDING_BATCH_MAX_BYTES bytes; a batch
+    rejected with 413 is split in half and retried.
+    Up to `max_in_flight` requests of this call run concurrently, within the
+    process-wide embedding.max_in_flight limit, throttled by a shared token
+    bucket and retried with backoff on 429/503.
+    """
+    if batched:
+        batches = list(iter_batches(chunks))
+        results = _map_in_flight(_embed_batch_splitting, batches, max_in_flight)
+        return [vector for vectors in results for vector in vectors]
+    return _map_in_flight(_embed_single, chunks, max_in_flight)
+
+def generate_embeddings(chunks: List[str], provider: Optional[EmbeddingProvider] = None,
+                        use_cache: bool = EMBEDDING_CACHE_ENABLED) -> List[List[float]]:
+    """
+    Generate embeddings with the configured provider (embedding.provider) or `provider`.
+    With `use_cache=True`, vectors are first looked up in the local embedding
+    cache and only misses (deduplicated) go to the provider.
+    Output order always matches `chunks`.
+    """
+    provider = provider or get_provider()
+
+    if not use_cache:
+        embeddings = provider.embed(chunks)
+        logging.info(f"[Embedding] Generated {len(embeddings)} embeddings with '{provider.name}'.")
+        return embeddings
+
+    cache = get_embedding_cache()
+    embeddings = cache.get_vectors(chunks, model_id=provider.model_id)
+    hits = sum(vector is not None for vector in embeddings)
+
+    # Embed each distinct missing text once, then fan results back out
+    missing = list(dict.fromkeys(chunk for chunk, vector in zip(chunks, embeddings) if vector is None))
+    if missing:
+        fresh = dict(zip(missing, provider.embed(missing)))
+        cache.put_vectors(list(fresh), list(fresh.values()), model_id=provider.model_id)
+        embeddings = [vector if vector is not None else fresh[chunk] for chunk, vector in zip(chunks, embeddings)]
+
+    logging.info(
+        f"[Embedding] Generated {len(embeddings)} embeddings with '{provider.name}' "
+        f"({hits} cache hits, {len(missing)} distinct texts embedded)."
+    )
+    return embeddings
+
+class CoalescingEmbedder:
+    """
+    Pool embedding calls from concurrent callers (e.g. several small documents of
+    one Service Bus batch) into full batches. A call blocks until its vectors are
+    back; a batch is sent once `batch_size` chunks are pending or the oldest call
+    has waited `linger_seconds`. Vectors are split back per call, in order; when a
+    pooled batch fails its calls are resent one by one, so only the failing call errors.
+    """
+
+    def __init__(self, embed: Callable[[List[str]], List[List[float]]],
+                 batch_size: int = EMBEDDING_BATCH_SIZE * EMBEDDING_MAX_IN_FLIGHT, linger_seconds: float = 0.05):
+        self._embed = embed
+        self.batch_size = batch_size
+        self.linger_seconds = linger_seconds
+        self._pending: List[Tuple[List[str], Future, float]] = []
+        self._pending_chunks = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self.batches = 0
+        self.chunks = 0
+        self._thread = threading.Thread(target=self._run, name="embed-coalesce", daemon=True)
+        self._thread.start()
+
+    def __call__(self, chunks: List[str]) -> List[List[float]]:
+        if not chunks:
+            return []
+        future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("CoalescingEmbedder is closed")
+            self._pending.append((chunks, future, time.monotonic()))
+            self._pending_chunks += len(chunks)
+            self._cond.notify()
+        return future.result()
+
+    def _take_batch(self) -> List[Tuple[List[str], Future, float]]:
+        # Whole calls only; a call larger than batch_size goes out on its own
+        batch, size = [], 0
+        while self._pending and (not batch or size + len(self._pending[0][0]) <= self.batch_size):
+            call = self._pending.pop(0)
+            batch.append(call)
+            size += len(call[0])
+        self._pending_chunks -= size
+        return batch
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._pending_chunks >= self.batch_size or (self._closed and self._pending):
+                        break
+                    if self._closed:
+                        return
+                    if self._pending:
+                        wait = self._pending[0][2] + self.linger_seconds - time.monotonic()
+                        if wait <= 0:
+                            break
+                        self._cond.wait(wait)
+                    else:
+                        self._cond.wait()
+                batch = self._take_batch()
+            self._send(batch)
+
+    def _send(self, batch: List[Tuple[List[str], Future, float]]):
+        texts = [chunk for chunks, _, _ in batch for chunk in chunks]
+        try:
+            vectors = self._embed(texts)
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            # One caller's bad input must not fail the others: resend each call alone
+            logging.warning(f"[Embedding] Pooled batch of {len(batch)} calls failed ({e}); retrying calls separately")
+            for call in batch:
+                self._send([call])
+            return
+        self.batches += 1
+        self.chunks += len(texts)
+        offset = 0
+        for chunks, future, _ in batch:
+            future.set_result(vectors[offset:offset + len(chunks)])
+            offset += len(chunks)
+
+    def close(self):
+        """Send whatever is pending and stop the background thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+def _insert_page_ranges(chunks: List[str], bytes_per_vector: int,
+                        max_rows: int = MOSAICDB_INSERT_PAGE_ROWS,
+                        max_bytes: int = MOSAICDB_INSERT_PAGE_MAX_BYTES) -> List[Tuple[int, int]]:
+    """Split row indices into [start, end) pages bounded by row count and encoded size."""
+    vector_bytes = (bytes_per_vector * 4 + 2) // 3  # base64 expansion
+    ranges = []
+    start = 0
+    page_bytes = 0
+    for idx, chunk in enumerate(chunks):
+        row_bytes = _text_payload_bytes(chunk) + vector_bytes
+        if idx > start and (idx - start >= max_rows or page_bytes + row_bytes > max_bytes):
+            ranges.append((start, idx))
+            start = idx
+            page_bytes = 0
+        page_bytes += row_bytes
+    if start < len(chunks):
+        ranges.append((start, len(chunks)))
+    return ranges
+
+def _store_embeddings_paged(document_id: str, chunks: List[str], encoded: EncodedVectors, metadata: dict,
+                            chunk_refs: Optional[List[dict]], chunk_ids: Optional[List[str]]):
+    """
+    Send rows to {MOSAICDB_URI}/bulk_insert in bounded pages. Each page carries the
+    shared document metadata once and its vectors as one base64 block (plus per-row
+    scales for int8). Inserts are not idempotent: a failed page is only resent when
+    it cannot have been applied (see retry_utils.is_safe_to_resend), and the pages
+    that went through are never resent.
+    """
+    if not len(encoded):
+        return
+    ranges = _insert_page_ranges(chunks, encoded.bytes_per_vector)
+
+    def send_page(page: Tuple[int, int]) -> Optional[Exception]:
+        start, end = page
+        payload = {
+            "document_id": document_id,
+            "metadata": metadata,
+            "count": end - start,
+            "chunks": chunks[start:end],
+            **encoded.slice(start, end).to_payload(),
+        }
+        if chunk_refs is not None:
+            payload["refs"] = chunk_refs[start:end]
+        if chunk_ids is not None:
+            payload["ids"] = row_ids(document_id, chunk_ids[start:end])
+        try:
+            resp = post_json(f"{MOSAICDB_URI}/bulk_insert", payload, idempotent=False)
+            resp.raise_for_status()
+        except Exception as e:
+            return e
+        return None
+
+    pending = ranges
+    for round_no in range(MOSAICDB_INSERT_PAGE_RETRIES + 1):
+        errors = _map_in_flight(send_page, pending, MOSAICDB_INSERT_MAX_IN_FLIGHT)
+        failed = [(page, err) for page, err in zip(pending, errors) if err is not None]
+        if not failed:
+            break
+        unsafe = [err for _, err in failed if not is_safe_to_resend(err)]
+        if unsafe:
+            raise RuntimeError(f"Bulk insert failed for document {document_id}: {unsafe[0]}") from unsafe[0]
+        pending = [page for page, _ in failed]
+        logging.warning(f"[MosaicDB] {len(failed)}/{len(ranges)} insert pages failed for document {document_id} (round {round_no + 1}).")
+    else:
+        raise RuntimeError(
+            f"Bulk insert failed for document {document_id}: pages {[page for page, _ in failed]} "
+            f"still failing, last error: {failed[-1][1]}"
+        )
+
+def store_embeddings(document_id: str, chunks: List[str], vectors: Union[List[List[float]], EncodedVectors],
+                     metadata: dict = None, paged: bool = MOSAICDB_BULK_INSERT,
+                     encoding: str = MOSAICDB_VECTOR_ENCODING, chunk_refs: Optional[List[dict]] = None,
+                     chunk_ids: Optional[List[str]] = None):
+    """
+    Store embeddings into MosaicDB with optional metadata.
+    `vectors` are raw floats or the output of the vector codec stage
+    (utils.vector_codec); raw floats are sent as `encoding` (float32/float16).
+    `chunk_refs` (see `Chunk.ref`) carries per-chunk page numbers, offsets and
+    chunk_index (the row's position in the document); `chunk_ids` gives rows
+    stable ids (see utils.incremental_utils; sent as row_ids, prefixed with the
+    document id) so they can be deleted or updated later.
+    With `paged=True`, rows go through the paged, base64-encoded bulk insert;
+    otherwise everything is sent in one JSON POST to /insert.
+    """
+    if paged:
+        encoded = vectors if isinstance(vectors, EncodedVectors) else EncodedVectors.from_floats(vectors, encoding)
+        _store_embeddings_paged(document_id, chunks, encoded, metadata or {}, chunk_refs, chunk_ids)
+        logging.info(f"[MosaicDB] Stored {len(encoded)} embeddings for document {document_id} (paged, {encoded.encoding}).")
+        return
+
+    if isinstance(vectors, EncodedVectors):
+        vectors = vectors.decode().tolist()
+    payload = {
+        "document_id": document_id,
+        "embeddings": [
+            {"chunk": chunk, "vector": vector, "metadata": metadata or {}}
+            for chunk, vector in zip(chunks, vectors)
+        ]
+    }
+    if chunk_refs is not None:
+        for row, ref in zip(payload["embeddings"], chunk_refs):
+            row["ref"] = ref
+    if chunk_ids is not None:
+        for row, row_id in zip(payload["embeddings"], row_ids(document_id, chunk_ids)):
+            row["id"] = row_id
+    resp = post_json(f"{MOSAICDB_URI}/insert", payload, idempotent=False)
+    resp.raise_for_status()
+    logging.info(f"[MosaicDB] Stored {len(vectors)} embeddings for document {document_id}.")
+
+def delete_embeddings(document_id: str, chunk_ids: List[str], page_size: int = MOSAICDB_INSERT_PAGE_ROWS):
+    """Delete rows of a document from MosaicDB by chunk id."""
+    for start in range(0, len(chunk_ids), page_size):
+        ids = row_ids(document_id, chunk_ids[start:start + page_size])
+        resp = post_json(f"{MOSAICDB_URI}/delete", {"document_id": document_id, "ids": ids})
+        resp.raise_for_status()
+    logging.info(f"[MosaicDB] Deleted {len(chunk_ids)} stale embeddings for document {document_id}.")
+
+def update_chunk_refs(document_id: str, chunk_ids: List[str], chunk_refs: List[dict],
+                      page_size: int = MOSAICDB_INSERT_PAGE_ROWS):
+    """Refresh page/offset refs of already-stored rows (no vectors are sent)."""
+    for start in range(0, len(chunk_ids), page_size):
+        updates = [
+            {"id": row_id, "ref": ref}
+            for row_id, ref in zip(row_ids(document_id, chunk_ids[start:start + page_size]),
+                                   chunk_refs[start:start + page_size])
+        ]
+        resp = post_json(f"{MOSAICDB_URI}/update", {"document_id": document_id, "updates": updates})
+        resp.raise_for_status()
@@ -0,0 +1,132 @@
+# utils/http_utils.py
+"""
+HTTP utilities — one shared, pooled client layer for MosaicDB and model-serving traffic.
+Keeps connections alive across calls, applies connect/read timeouts and optional
+gzip request bodies. `post_json` is the sync path (requests), `apost_json` the
+async path (httpx) for the FastAPI search service.
+"""
+
+import json
+import gzip
+import asyncio
+import logging
+import threading
+from typing import Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import (
+    MOSAIC_API_KEY,
+    HTTP_POOL_SIZE,
+    HTTP_CONNECT_TIMEOUT_SECONDS,
+    HTTP_READ_TIMEOUT_SECONDS,
+    HTTP_GZIP_REQUESTS,
+    HTTP_GZIP_MIN_BYTES,
+    RETRY_MAX_ATTEMPTS
+)
+from utils.retry_utils import TokenBucket, post_with_retry, retry_delay_for, backoff_delay, RETRYABLE_STATUS_CODES
+
+DEFAULT_HEADERS = {
+    "Authorization": f"Bearer {MOSAIC_API_KEY}",
+    "Content-Type": "application/json",
+    "Accept-Encoding": "gzip, deflate",
+}
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+_async_client: Optional[httpx.AsyncClient] = None
+
+
+def get_session() -> requests.Session:
+    """Process-wide requests.Session with a keep-alive pool sized by http.pool_size."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update(DEFAULT_HEADERS)
+            _session = session
+        return _session
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Process-wide httpx.AsyncClient; must be first used from the serving event loop."""
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(
+            headers=DEFAULT_HEADERS,
+            limits=httpx.Limits(max_connections=HTTP_POOL_SIZE, max_keepalive_connections=HTTP_POOL_SIZE),
+            timeout=httpx.Timeout(HTTP_READ_TIMEOUT_SECONDS, connect=HTTP_CONNECT_TIMEOUT_SECONDS),
+        )
+    return _async_client
+
+
+def encode_json_body(payload, compress: bool = HTTP_GZIP_REQUESTS):
+    """
+    Serialize `payload` to compact JSON bytes. When `compress` is set and the body is
+    at least http.gzip_min_bytes, gzip it. Returns (body, extra_headers).
+    """
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if compress and len(body) >= HTTP_GZIP_MIN_BYTES:
+        return gzip.compress(body, compresslevel=5), {"Content-Encoding": "gzip"}
+    return body, {}
+
+
+def post_json(url: str, payload, limiter: Optional[TokenBucket] = None,
+              compress: bool = HTTP_GZIP_REQUESTS, max_retries: int = RETRY_MAX_ATTEMPTS,
+              idempotent: bool = True) -> requests.Response:
+    """
+    POST a JSON payload through the shared session, with timeouts and retries
+    (limited to safe cases for non-idempotent requests, see post_with_retry).
+    """
+    body, headers = encode_json_body(payload, compress)
+    return post_with_retry(
+        url,
+        limiter=limiter,
+        max_retries=max_retries,
+        session=get_session(),
+        idempotent=idempotent,
+        data=body,
+        headers=headers,
+        timeout=(HTTP_CONNECT_TIMEOUT_SECONDS, HTTP_READ_TIMEOUT_SECONDS),
+    )
+
+
+async def apost_json(url: str, payload, compress: bool = HTTP_GZIP_REQUESTS,
+                     max_retries: int = RETRY_MAX_ATTEMPTS) -> httpx.Response:
+    """Async counterpart of `post_json` on the shared httpx client."""
+    body, headers = encode_json_body(payload, compress)
+    client = get_async_client()
+    for attempt in range(max_retries + 1):
+        try:
+            resp = await client.post(url, content=body, headers=headers)
+        except httpx.TransportError as e:
+            if attempt == max_retries:
+                raise
+            delay = backoff_delay(attempt)
+            logging.warning(f"[HTTP] POST {url} failed ({e}), retry {attempt + 1}/{max_retries} in {delay:.2f}s")
+        else:
+            if resp.status_code not in RETRYABLE_STATUS_CODES or attempt == max_retries:
+                return resp
+            delay = retry_delay_for(resp, attempt)
+            logging.warning(f"[HTTP] POST {url} returned {resp.status_code}, retry {attempt + 1}/{max_retries} in {delay:.2f}s")
+        await asyncio.sleep(delay)
+
+
+def close_session():
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+async def aclose_client():
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
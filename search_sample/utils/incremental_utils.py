@@ -0,0 +1,56 @@
+# utils/incremental_utils.py
+"""
+Incremental re-ingestion utilities — chunk fingerprints and chunk-set diffs.
+A chunk id is "<fingerprint>:<occurrence>", where the fingerprint is
+sha256(namespace, normalized chunk text) and the namespace identifies the embedding
+model and vector codec, so switching either one re-embeds everything.
+Chunk ids repeat across documents that share text (boilerplate, templates), so
+rows in MosaicDB are keyed by row_id: the chunk id prefixed with the document id.
+"""
+
+import hashlib
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+
+def chunk_fingerprint(text: str, namespace: str) -> str:
+    digest = hashlib.sha256()
+    digest.update(namespace.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(" ".join(text.split()).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def assign_chunk_ids(texts: Iterable[str], namespace: str,
+                     seen: Optional[Dict[str, int]] = None) -> List[Tuple[str, str]]:
+    """
+    Return (chunk_id, fingerprint) per text; repeated texts get increasing occurrence numbers.
+    Pass the same `seen` dict across calls to number a document streamed in batches.
+    """
+    seen = {} if seen is None else seen
+    ids = []
+    for text in texts:
+        fingerprint = chunk_fingerprint(text, namespace)
+        occurrence = seen.get(fingerprint, 0)
+        seen[fingerprint] = occurrence + 1
+        ids.append((f"{fingerprint}:{occurrence}", fingerprint))
+    return ids
+
+
+def row_ids(document_id, chunk_ids: Iterable[str]) -> List[str]:
+    """MosaicDB row ids of a document's chunks: "<document_id>:<chunk_id>"."""
+    return [f"{document_id}:{chunk_id}" for chunk_id in chunk_ids]
+
+
+class ChunkDiff(NamedTuple):
+    new: List[int]        # positions (in the current chunk list) to embed and insert
+    kept: List[int]       # positions already stored under the same chunk id
+    stale: List[str]      # previously stored chunk ids to delete
+
+
+def diff_chunks(previous_ids: Iterable[str], current_ids: List[str]) -> ChunkDiff:
+    previous = set(previous_ids)
+    current = set(current_ids)
+    new = [idx for idx, chunk_id in enumerate(current_ids) if chunk_id not in previous]
+    kept = [idx for idx, chunk_id in enumerate(current_ids) if chunk_id in previous]
+    stale = sorted(previous - current)
+    return ChunkDiff(new, kept, stale)
@@ -0,0 +1,219 @@
+# utils/lane_utils.py
+"""
+Scheduling lanes — keep small documents from waiting behind huge ones.
+- choose_lane(): latency or bulk lane, from the blob size and the sniffed page
+  count (scanned PDFs get a lower page limit: every page is OCR'd)
+- lane_queue(): bulk work goes to `<queue>-bulk`, consumed by its own function
+- run_by_lane(): runs messages with a separate concurrency budget per lane and
+  picks each lane's next message by weighted fair queuing over team_id, so one
+  team's bulk import cannot take a lane from the others
+- queue_wait_report(): time from enqueue to processing start, per lane
+"""
+
+import time
+import heapq
+import itertools
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
+from config import (
+    LANE_LATENCY_MAX_BYTES,
+    LANE_LATENCY_MAX_PAGES,
+    LANE_LATENCY_MAX_SCANNED_PAGES,
+    LANE_BULK_QUEUE_SUFFIX,
+    LANE_LATENCY_CONCURRENCY,
+    LANE_BULK_CONCURRENCY,
+    LANE_DEFAULT_TEAM_WEIGHT,
+    LANE_TEAM_WEIGHTS
+)
+from utils.sniff_utils import PDF, SCANNED_PDF, Sniffed
+
+LATENCY, BULK = "latency", "bulk"
+LANES = (LATENCY, BULK)     # dispatch order: latency work starts first when both lanes have room
+
+R = TypeVar("R")
+
+
+def choose_lane(sniffed: Sniffed, size_bytes: Optional[int] = None) -> Tuple[str, str]:
+    """(lane, reason) for a sniffed document; `size_bytes` defaults to the sniffed blob size."""
+    size = size_bytes if size_bytes is not None else sniffed.size
+    if size is not None and size > LANE_LATENCY_MAX_BYTES:
+        return BULK, f"{size} bytes"
+    scanned = sniffed.kind == PDF and sniffed.pdf_kind == SCANNED_PDF
+    max_pages = LANE_LATENCY_MAX_SCANNED_PAGES if scanned else LANE_LATENCY_MAX_PAGES
+    if sniffed.pages is not None and sniffed.pages > max_pages:
+        return BULK, f"{sniffed.pages} {'scanned ' if scanned else ''}pages"
+    return LATENCY, ""
+
+def lane_queue(queue_name: str, lane: str) -> str:
+    """Queue for a lane; the latency lane keeps the original queue name."""
+    return queue_name if lane == LATENCY else f"{queue_name}{LANE_BULK_QUEUE_SUFFIX}"
+
+def lane_of(body: dict) -> str:
+    lane = body.get("lane")
+    return lane if lane in LANES else LATENCY
+
+
+# Weighted fair queuing ------------------------------------------------------
+
+class _LaneClock:
+    """Virtual time of a lane and each team's last finish tag, shared by every dispatch in the process."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.vtime = 0.0
+        self.finish: Dict[str, float] = {}
+
+_CLOCKS = {lane: _LaneClock() for lane in LANES}
+
+
+class FairQueue:
+    """
+    Start-time fair queuing over teams: while several teams are backlogged, each
+    gets a share of the lane proportional to its weight, measured in pages. Tags
+    carry over between dispatches (via the lane clock), so a team that just ran
+    a large import queues behind teams that did not.
+    """
+
+    def __init__(self, lane: str, weights: Optional[Dict[str, float]] = None,
+                 default_weight: float = LANE_DEFAULT_TEAM_WEIGHT):
+        self._clock = _CLOCKS[lane]
+        self._weights = LANE_TEAM_WEIGHTS if weights is None else weights
+        self._default_weight = default_weight
+        self._heap: List[Tuple[float, int, object]] = []
+        self._seq = itertools.count()
+
+    def push(self, item, team: str, cost: float = 1.0):
+        weight = max(float(self._weights.get(team, self._default_weight)), 1e-6)
+        clock = self._clock
+        with clock.lock:
+            start = max(clock.vtime, clock.finish.get(team, 0.0))
+            clock.finish[team] = start + cost / weight
+            if len(clock.finish) > 4096:
+                # Teams whose tags the lane has passed start fresh anyway
+                clock.finish = {t: f for t, f in clock.finish.items() if f > clock.vtime}
+        heapq.heappush(self._heap, (start, next(self._seq), item))
+
+    def pop(self):
+        start, _, item = heapq.heappop(self._heap)
+        with self._clock.lock:
+            self._clock.vtime = max(self._clock.vtime, start)
+        return item
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+def _team(body: dict) -> str:
+    return str(body.get("team_id") or body.get("metadata", {}).get("team_id") or "")
+
+def _cost(body: dict) -> float:
+    return float(max(1, body.get("pages") or 1))
+
+
+# Queue-wait reporting -------------------------------------------------------
+
+class _WaitStats:
+    def __init__(self, window: int = 1024):
+        self.lock = threading.Lock()
+        self.recent = deque(maxlen=window)
+        self.count = 0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        with self.lock:
+            self.recent.append(seconds)
+            self.count += 1
+            self.max = max(self.max, seconds)
+
+    def report(self) -> dict:
+        with self.lock:
+            recent = sorted(self.recent)
+            count, longest = self.count, self.max
+        if not recent:
+            return {"count": 0}
+        pick = lambda q: round(recent[min(len(recent) - 1, int(q * len(recent)))], 3)
+        return {"count": count, "p50_s": pick(0.5), "p95_s": pick(0.95), "max_s": round(longest, 3)}
+
+_WAITS = {lane: _WaitStats() for lane in LANES}
+
+
+def record_queue_wait(body: dict) -> Optional[float]:
+    """Record enqueue -> now for a message that is starting; None without an `enqueued_at`."""
+    enqueued_at = body.get("enqueued_at")
+    if enqueued_at is None:
+        return None
+    seconds = max(0.0, time.time() - float(enqueued_at))
+    _WAITS[lane_of(body)].record(seconds)
+    return seconds
+
+def queue_wait_report() -> Dict[str, dict]:
+    """Queue-wait percentiles per lane over recent messages of this process."""
+    return {lane: stats.report() for lane, stats in _WAITS.items()}
+
+
+# Dispatch -------------------------------------------------------------------
+
+# Per-process budgets: concurrent invocations on one host share them
+_SLOTS = {LATENCY: threading.BoundedSemaphore(LANE_LATENCY_CONCURRENCY),
+          BULK: threading.BoundedSemaphore(LANE_BULK_CONCURRENCY)}
+# Signalled whenever a slot is released; dispatchers waiting on another
+# invocation's slots sleep on it until the release count moves
+_slot_freed = threading.Condition()
+_slot_releases = 0
+
+def _release_slot(lane: str):
+    global _slot_releases
+    _SLOTS[lane].release()
+    with _slot_freed:
+        _slot_releases += 1
+        _slot_freed.notify_all()
+
+
+def _run_in_slot(lane: str, fn: Callable[[dict], R], body: dict) -> R:
+    try:
+        record_queue_wait(body)
+        return fn(body)
+    finally:
+        _release_slot(lane)
+
+def run_by_lane(bodies: List[dict], fn: Callable[[dict], R], workers: int) -> List[R]:
+    """
+    Run fn(body) for every message on up to `workers` threads, within each lane's
+    concurrency budget, picking messages fairly across teams. Results come back in
+    input order. Neither lane can hold all the workers while the other has work:
+    the bulk lane keeps its share of `workers` (by budget), latency the rest.
+    """
+    workers = max(1, workers)
+    queues = {lane: FairQueue(lane) for lane in LANES}
+    for index, body in enumerate(bodies):
+        queues[lane_of(body)].push(index, _team(body), _cost(body))
+    share = round(workers * LANE_BULK_CONCURRENCY / (LANE_LATENCY_CONCURRENCY + LANE_BULK_CONCURRENCY))
+    bulk_share = min(LANE_BULK_CONCURRENCY, max(1, share)) if workers > 1 else 0
+
+    results: List[Optional[R]] = [None] * len(bodies)
+    running: Dict[object, Tuple[int, str]] = {}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="lane") as executor:
+        while running or any(queues.values()):
+            with _slot_freed:
+                releases = _slot_releases
+            for lane in LANES:
+                # Latency work leaves room for the bulk lane's share while bulk work waits
+                reserved = 0
+                if lane == LATENCY and queues[BULK]:
+                    in_bulk = sum(1 for _, running_lane in running.values() if running_lane == BULK)
+                    reserved = max(0, min(bulk_share, len(queues[BULK])) - in_bulk)
+                while (queues[lane] and len(running) + reserved < workers
+                       and _SLOTS[lane].acquire(blocking=False)):
+                    index = queues[lane].pop()
+                    running[executor.submit(_run_in_slot, lane, fn, bodies[index])] = (index, lane)
+            if running:
+                done, _ = wait(running, timeout=0.1, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[running.pop(future)[0]] = future.result()
+            else:
+                # Every slot of the waiting lanes is held by another invocation
+                with _slot_freed:
+                    _slot_freed.wait_for(lambda: _slot_releases != releases)
+    return results
@@ -0,0 +1,144 @@
+# utils/layout_utils.py
+"""
+Layout utilities — single-pass page layout from one PyMuPDF TextPage.
+The page is analysed once (page.get_textpage); blocks and words are then read from
+that same TextPage to produce, together:
+- text blocks (bbox + text) and the page's combined text
+- table candidates, found from word geometry: rows of horizontally separated cells
+  whose columns line up across consecutive rows (opt-in, pdf.layout_tables: reading
+  word geometry roughly halves throughput)
+- image references (bbox, pixel size) from page.get_image_info, only for pages that
+  use images; image data is never decoded or kept
+"""
+
+from typing import List, NamedTuple
+
+import fitz  # PyMuPDF
+import numpy as np
+
+from config import PDF_LAYOUT_TABLES
+
+# Keep ligatures/whitespace like get_text("text"); no image blocks (they carry the image data)
+_TEXTPAGE_FLAGS = fitz.TEXT_PRESERVE_LIGATURES | fitz.TEXT_PRESERVE_WHITESPACE | fitz.TEXT_MEDIABOX_CLIP
+
+# A gap wider than this many word heights between words of one line starts a new cell
+_CELL_GAP_EM = 1.0
+# Cells whose vertical centers are within this fraction of the word height share a row
+_ROW_TOLERANCE = 0.5
+# Rows further apart than this many word heights end a table
+_ROW_GAP_LINES = 2.0
+
+
+class Cell(NamedTuple):
+    x0: float
+    y0: float
+    x1: float
+    y1: float
+    text: tuple                   # (first word, end word) indices into the page's words
+
+
+class PageLayout(NamedTuple):
+    text: str                     # combined text, same content as get_text("text")
+    blocks: List[dict]            # {"bbox": [...], "text": ...}
+    tables: List[List[List[str]]] # table candidates: rows of cell texts
+    images: List[dict]            # {"bbox": [...], "width", "height"}
+
+
+def _round_bbox(bbox) -> List[float]:
+    return [round(v, 1) for v in bbox]
+
+def word_cells(words: list) -> List[Cell]:
+    """
+    Merge words (sorted by block/line/word number) into cells: a cell ends at a line
+    break or at a horizontal gap wider than the word height. Vectorized, since most
+    pages are plain text: when no two cells share a row there can be no table and
+    no cells are returned.
+    """
+    coords = np.array([word[:4] for word in words], dtype=np.float64)
+    lines = np.array([(word[5] << 20) | word[6] for word in words], dtype=np.int64)
+    heights = coords[:, 3] - coords[:, 1]
+    same_line = lines[1:] == lines[:-1]
+    wide_gap = coords[1:, 0] - coords[:-1, 2] > heights[1:] * _CELL_GAP_EM
+    starts = np.flatnonzero(np.concatenate(([True], ~same_line | wide_gap)))
+    ends = np.append(starts[1:], len(words))
+    x0 = np.minimum.reduceat(coords[:, 0], starts)
+    y0 = np.minimum.reduceat(coords[:, 1], starts)
+    x1 = np.maximum.reduceat(coords[:, 2], starts)
+    y1 = np.maximum.reduceat(coords[:, 3], starts)
+    centers = np.sort((y0 + y1) / 2)
+    if not np.any(np.diff(centers) <= (y1 - y0).min() * _ROW_TOLERANCE):
+        return []
+    return [
+        Cell(x0[i], y0[i], x1[i], y1[i], (starts[i], ends[i]))
+        for i in range(len(starts))
+    ]
+
+def _group_rows(cells: List[Cell]) -> List[List[Cell]]:
+    rows: List[List[Cell]] = []
+    row_center = None
+    for cell in sorted(cells, key=lambda c: ((c.y0 + c.y1) / 2, c.x0)):
+        center = (cell.y0 + cell.y1) / 2
+        if rows and abs(center - row_center) <= (cell.y1 - cell.y0) * _ROW_TOLERANCE:
+            rows[-1].append(cell)
+            continue
+        rows.append([cell])
+        row_center = center
+    return [sorted(row, key=lambda c: c.x0) for row in rows]
+
+def _columns_align(upper: List[Cell], lower: List[Cell]) -> bool:
+    if len(upper) != len(lower):
+        return False
+    return all(a.x0 <= b.x1 and b.x0 <= a.x1 for a, b in zip(upper, lower))
+
+def detect_tables(cells: List[Cell], words: list) -> List[List[List[str]]]:
+    """Table candidates: 2+ consecutive, vertically close rows of 2+ aligned cells."""
+    if not cells:
+        return []
+    tables, current = [], []
+    previous = None
+    for row in _group_rows(cells):
+        height = max(c.y1 - c.y0 for c in row)
+        continues = (
+            previous is not None and len(row) >= 2
+            and row[0].y0 - max(c.y1 for c in previous) <= height * _ROW_GAP_LINES
+            and _columns_align(previous, row)
+        )
+        if continues:
+            current.append(row)
+        else:
+            if len(current) >= 2:
+                tables.append(current)
+            current = [row] if len(row) >= 2 else []
+        previous = row
+    if len(current) >= 2:
+        tables.append(current)
+    # Cell texts are joined only for cells that ended up in a table
+    return [
+        [[" ".join(word[4] for word in words[c.text[0]:c.text[1]]) for c in row] for row in table]
+        for table in tables
+    ]
+
+def extract_layout(page, tables: bool = PDF_LAYOUT_TABLES) -> PageLayout:
+    """
+    Text blocks, table candidates and image references of a page from one layout pass.
+    With `tables=False` word geometry is not read and no table candidates are produced.
+    """
+    textpage = page.get_textpage(flags=_TEXTPAGE_FLAGS)
+    blocks, texts = [], []
+    for x0, y0, x1, y1, text, _, _ in textpage.extractBLOCKS():
+        if text.strip():
+            blocks.append({"bbox": _round_bbox((x0, y0, x1, y1)), "text": text})
+            texts.append(text)
+
+    # Placements only (no decoding). Pages without image resources skip the scan, but
+    # pages without text always get it: a scanned page may use inline images.
+    images = []
+    if not texts or page.get_images():
+        images = [
+            {"bbox": _round_bbox(info["bbox"]), "width": info["width"], "height": info["height"]}
+            for info in page.get_image_info()
+        ]
+
+    words = textpage.extractWORDS() if tables else []
+    cells = word_cells(words) if words else []
+    return PageLayout("".join(texts), blocks, detect_tables(cells, words), images)
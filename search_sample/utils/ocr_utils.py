@@ -0,0 +1,210 @@
+# utils/ocr_utils.py
+"""
+OCR utilities — selective, parallel OCR for scanned PDF pages.
+- skips images too small or too flat (low entropy) to carry text, e.g. logos and icons
+- rescales each image to `ocr.target_dpi` from its displayed size on the page
+- renders the whole page once when it is made of many image fragments
+- runs Tesseract on a bounded pool of worker processes
+- reuses results: an in-document memo by xref and a persistent cache keyed by image hash
+"""
+
+import io
+import os
+import atexit
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+from config import (
+    OCR_CACHE_ENABLED,
+    OCR_LANG,
+    OCR_WORKERS,
+    OCR_TESSERACT_CONFIG,
+    OCR_MIN_SIDE,
+    OCR_MIN_AREA,
+    OCR_MIN_ENTROPY,
+    OCR_TARGET_DPI,
+    OCR_MAX_SCALE,
+    OCR_FRAGMENT_THRESHOLD
+)
+from utils.cache_utils import get_ocr_cache, ocr_cache_key
+from utils.helpers import process_pool_context
+
+POINTS_PER_INCH = 72.0
+
+
+class OcrImage(NamedTuple):
+    """An image ready for Tesseract: cache key and grayscale PNG bytes."""
+    key: str
+    png: bytes
+
+
+def image_entropy(image: Image.Image) -> float:
+    """Shannon entropy (bits) of a grayscale thumbnail; blank or flat images score near 0."""
+    gray = image.convert("L")
+    gray.thumbnail((256, 256))
+    return gray.entropy()
+
+def is_ocr_candidate(image: Image.Image) -> bool:
+    width, height = image.size
+    if min(width, height) < OCR_MIN_SIDE or width * height < OCR_MIN_AREA:
+        return False
+    return image_entropy(image) >= OCR_MIN_ENTROPY
+
+def target_size(image: Image.Image, display_width_pt: float, target_dpi: int = OCR_TARGET_DPI) -> tuple:
+    """Pixel size at which the image's displayed width corresponds to `target_dpi`."""
+    if display_width_pt <= 0:
+        return image.size
+    effective_dpi = image.width / (display_width_pt / POINTS_PER_INCH)
+    scale = min(target_dpi / effective_dpi, OCR_MAX_SCALE)
+    if abs(scale - 1.0) < 0.1:
+        return image.size
+    return max(1, round(image.width * scale)), max(1, round(image.height * scale))
+
+def _settings(size: tuple) -> str:
+    return f"{OCR_LANG}|{OCR_TESSERACT_CONFIG}|{size[0]}x{size[1]}"
+
+def _to_png(image: Image.Image) -> bytes:
+    buf = io.BytesIO()
+    image.save(buf, format="PNG")
+    return buf.getvalue()
+
+def render_page(page, dpi: int = OCR_TARGET_DPI) -> OcrImage:
+    pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+    key = ocr_cache_key("L", (pix.width, pix.height), pix.samples, _settings((pix.width, pix.height)))
+    return OcrImage(key, pix.tobytes("png"))
+
+def prepare_image(image: Image.Image, display_width_pt: float) -> OcrImage:
+    gray = image.convert("L")
+    size = target_size(gray, display_width_pt)
+    key = ocr_cache_key(gray.mode, gray.size, gray.tobytes(), _settings(size))
+    if size != gray.size:
+        gray = gray.resize(size, Image.LANCZOS)
+    return OcrImage(key, _to_png(gray))
+
+
+def prepare_page_images(page, memo: Optional[Dict[int, Optional[OcrImage]]] = None) -> List[OcrImage]:
+    """
+    Pick and prepare the images of a page worth OCR-ing.
+    Pages with many image fragments (or inline images that can't be extracted)
+    are rendered once as a whole instead. `memo` (per document, keyed by xref)
+    makes an image repeated on every page decoded and prepared once.
+    """
+    memo = {} if memo is None else memo
+    try:
+        infos = page.get_image_info(xrefs=True)
+    except Exception as e:
+        logging.warning(f"[OCR] Could not list images on page {page.number + 1}: {e}")
+        return []
+    if not infos:
+        return []
+    if len(infos) >= OCR_FRAGMENT_THRESHOLD or any(info.get("xref", 0) == 0 for info in infos):
+        return [render_page(page)]
+
+    prepared, seen = [], set()
+    for info in infos:
+        xref = info["xref"]
+        if xref in seen:
+            continue
+        seen.add(xref)
+        if xref not in memo:
+            memo[xref] = None
+            try:
+                image = Image.open(io.BytesIO(page.parent.extract_image(xref)["image"]))
+                image.load()
+                if is_ocr_candidate(image):
+                    memo[xref] = prepare_image(image, fitz.Rect(info["bbox"]).width)
+            except Exception:
+                continue
+        if memo[xref] is not None:
+            prepared.append(memo[xref])
+    return prepared
+
+
+def _init_ocr_worker():
+    # One Tesseract thread per process; the pool provides the parallelism
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+def ocr_png(png_bytes: bytes, lang: str = OCR_LANG, tesseract_config: str = OCR_TESSERACT_CONFIG) -> str:
+    """Run Tesseract on PNG bytes; failures are non-fatal and return an empty string."""
+    import pytesseract  # only OCR workers pay for the Tesseract bindings
+    try:
+        return pytesseract.image_to_string(Image.open(io.BytesIO(png_bytes)), lang=lang, config=tesseract_config) or ""
+    except Exception as e:
+        logging.warning(f"[OCR] Tesseract failed: {e}")
+        return ""
+
+
+_ocr_pool: Optional[ProcessPoolExecutor] = None
+_ocr_pool_lock = threading.Lock()
+
+def resolve_ocr_workers() -> int:
+    return OCR_WORKERS or os.cpu_count() or 1
+
+def get_ocr_pool() -> ProcessPoolExecutor:
+    """
+    Process-wide bounded OCR pool, created on first use from whichever thread OCRs
+    first, so its workers are started by forkserver/spawn, never forked from a
+    threaded process.
+    """
+    global _ocr_pool
+    with _ocr_pool_lock:
+        if _ocr_pool is None:
+            _ocr_pool = ProcessPoolExecutor(max_workers=resolve_ocr_workers(), mp_context=process_pool_context(),
+                                            initializer=_init_ocr_worker)
+        return _ocr_pool
+
+def shutdown_ocr_pool():
+    """Stop the OCR workers; runs at process exit, a later OCR call starts a new pool."""
+    global _ocr_pool
+    with _ocr_pool_lock:
+        pool, _ocr_pool = _ocr_pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+atexit.register(shutdown_ocr_pool)
+
+def ocr_many(images: List[bytes], lang: str = OCR_LANG) -> List[str]:
+    """OCR prepared PNG images, in order; parallel when more than one worker is configured."""
+    if not images:
+        return []
+    if len(images) == 1 or resolve_ocr_workers() <= 1:
+        return [ocr_png(png, lang) for png in images]
+    return list(get_ocr_pool().map(ocr_png, images, [lang] * len(images)))
+
+
+_stats = {"images": 0, "in_document_reuse": 0, "ocr_runs": 0}
+
+def ocr_images(images: List[OcrImage], lang: str = OCR_LANG) -> List[str]:
+    """
+    OCR prepared images, in order. Identical images are OCR'd once per call and
+    results are served from / written to the persistent OCR cache when enabled.
+    """
+    unique = list(dict.fromkeys(image.key for image in images))
+    _stats["images"] += len(images)
+    _stats["in_document_reuse"] += len(images) - len(unique)
+
+    texts = dict(zip(unique, get_ocr_cache().get_texts(unique))) if OCR_CACHE_ENABLED else dict.fromkeys(unique)
+    missing = {image.key: image.png for image in images if texts[image.key] is None}
+    if missing:
+        results = dict(zip(missing, ocr_many(list(missing.values()), lang)))
+        _stats["ocr_runs"] += len(results)
+        texts.update(results)
+        if OCR_CACHE_ENABLED:
+            get_ocr_cache().put_texts(results)
+    return [texts[image.key] for image in images]
+
+def ocr_stats() -> dict:
+    """OCR reuse metrics for this process: in-document memo, persistent cache, overall."""
+    images = _stats["images"]
+    stats = {
+        **_stats,
+        "hit_rate": (images - _stats["ocr_runs"]) / images if images else 0.0,
+    }
+    if OCR_CACHE_ENABLED:
+        stats["cache"] = get_ocr_cache().stats()
+    return stats
@@ -0,0 +1,349 @@
+# utils/page_stream.py
+"""
+Page stream utilities — newline-delimited (JSONL) processed output.
+Line 1 is a header {"format", "document_id", "metadata"}; every following line is one
+page record in the processor's schema. Pages are written incrementally to a staged
+block blob (or a local spool file) and read back as a stream, so neither the
+processors nor the chunk/embed stage hold the whole document in memory.
+Legacy single-JSON outputs are still readable. WriteBehindPages persists pages on a
+background thread while the worker keeps using them in memory.
+"""
+
+import os
+import json
+import uuid
+import queue
+import base64
+import logging
+import threading
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+from azure.storage.blob import BlobBlock, ContentSettings
+from config import OUTPUT_FORMAT, OUTPUT_TARGET, OUTPUT_SPOOL_DIR, OUTPUT_BLOCK_BYTES, OUTPUT_WRITE_BEHIND_PAGES
+from utils.blob_utils import blob_service_client, upload_json
+
+STREAM_FORMAT = "pages.jsonl"
+
+
+def processed_blob_name(stem: str, output_format: str = OUTPUT_FORMAT) -> str:
+    """`<stem>.jsonl` for page streams, `<stem>.json` for output.format "json"."""
+    return f"{stem}.json" if output_format == "json" else f"{stem}.jsonl"
+
+def _spool_path(container_name: str, blob_name: str) -> Path:
+    return Path(OUTPUT_SPOOL_DIR) / container_name / blob_name
+
+
+class PageStreamWriter:
+    """
+    Append page records to `container_name/blob_name` as JSONL.
+    Blob target: lines are buffered up to `block_bytes`, staged as blocks and
+    committed on close, so the blob appears atomically. Spool target: a local
+    file written to `<name>.part` and renamed on close.
+    Use as a context manager; on error nothing is committed.
+    """
+
+    def __init__(self, container_name: str, blob_name: str, document_id, metadata: dict,
+                 target: str = OUTPUT_TARGET, block_bytes: int = OUTPUT_BLOCK_BYTES):
+        self.container_name = container_name
+        self.blob_name = blob_name
+        self.target = target
+        self.block_bytes = block_bytes
+        self.pages = 0
+        self._buffer = bytearray()
+        self._block_ids = []
+        self._block_prefix = uuid.uuid4().hex[:16]
+        if target == "spool":
+            self._path = _spool_path(container_name, blob_name)
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(f"{self._path}.part", "wb")
+        elif target == "blob":
+            self._blob_client = blob_service_client.get_blob_client(container=container_name, blob=blob_name)
+        else:
+            raise ValueError(f"Unknown output.target '{target}' (expected 'blob' or 'spool').")
+        self._write_line({"format": STREAM_FORMAT, "document_id": document_id, "metadata": metadata})
+
+    def _write_line(self, record: dict):
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+        if self.target == "spool":
+            self._file.write(line)
+            return
+        self._buffer += line
+        if len(self._buffer) >= self.block_bytes:
+            self._stage_block()
+
+    def _stage_block(self):
+        if not self._buffer:
+            return
+        # Block ids must be base64 strings of equal length within a blob
+        block_id = base64.b64encode(f"{self._block_prefix}-{len(self._block_ids):08d}".encode()).decode()
+        self._blob_client.stage_block(block_id=block_id, data=bytes(self._buffer))
+        self._block_ids.append(block_id)
+        self._buffer.clear()
+
+    def write_page(self, record: dict):
+        self._write_line(record)
+        self.pages += 1
+
+    def close(self):
+        if self.target == "spool":
+            self._file.close()
+            os.replace(f"{self._path}.part", self._path)
+        else:
+            self._stage_block()
+            self._blob_client.commit_block_list(
+                [BlobBlock(block_id=block_id) for block_id in self._block_ids],
+                content_settings=ContentSettings(content_type="application/x-ndjson")
+            )
+        logging.info(f"[PageStream] Wrote {self.pages} pages to {self.container_name}/{self.blob_name} ({self.target})")
+
+    def abort(self):
+        # Uncommitted blob blocks are discarded by the service
+        if self.target == "spool":
+            self._file.close()
+            Path(f"{self._path}.part").unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+def write_pages(container_name: str, blob_name: str, document_id, metadata: dict, pages: Iterable[dict],
+                output_format: str = OUTPUT_FORMAT) -> int:
+    """Write processed pages as a JSONL stream (or, for output.format "json", one JSON document)."""
+    if output_format == "json":
+        pages = list(pages)
+        upload_json({"document_id": document_id, "metadata": metadata, "pages": pages}, container_name, blob_name)
+        return len(pages)
+    with PageStreamWriter(container_name, blob_name, document_id, metadata) as writer:
+        for page in pages:
+            writer.write_page(page)
+    return writer.pages
+
+
+class _WriteAborted(Exception):
+    pass
+
+class WriteBehindPages:
+    """
+    Persist page records with write_pages on a background thread.
+    `tee(pages)` yields every record unchanged and queues it for the writer, so the
+    caller is only held back when the writer falls `max_pending` pages behind.
+    close() waits for the write and commits it only if the pages were consumed to
+    the end; a partially consumed stream is aborted. Writer errors are re-raised
+    from close(), or only logged and kept in `error` with `raise_errors=False`
+    (for best-effort artifacts the caller must not fail on).
+    """
+
+    _END = object()
+    _ABORT = object()
+
+    def __init__(self, container_name: str, blob_name: str, document_id, metadata: dict,
+                 max_pending: int = OUTPUT_WRITE_BEHIND_PAGES, raise_errors: bool = True):
+        self.blob_name = blob_name
+        self.pages = 0
+        self.raise_errors = raise_errors
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._complete = False
+        self.error: Optional[Exception] = None
+        self._thread = threading.Thread(
+            target=self._run, args=(container_name, blob_name, document_id, metadata),
+            name="page-write-behind", daemon=True
+        )
+        self._thread.start()
+
+    def _drain(self) -> Iterator[dict]:
+        while True:
+            page = self._queue.get()
+            if page is self._END:
+                return
+            if page is self._ABORT:
+                raise _WriteAborted()
+            yield page
+
+    def _run(self, container_name, blob_name, document_id, metadata):
+        try:
+            self.pages = write_pages(container_name, blob_name, document_id, metadata, self._drain())
+        except _WriteAborted:
+            logging.warning(f"[PageStream] Write-behind of {blob_name} aborted (pages not fully consumed)")
+        except Exception as e:
+            self.error = e
+            logging.error(f"[PageStream] Write-behind of {blob_name} failed: {e}")
+            # Keep draining so the producer never blocks on a dead writer
+            try:
+                for _ in self._drain():
+                    pass
+            except _WriteAborted:
+                pass
+
+    def tee(self, pages: Iterable[dict]) -> Iterator[dict]:
+        for page in pages:
+            self._queue.put(page)
+            yield page
+        self._complete = True
+
+    def close(self):
+        self._queue.put(self._END if self._complete else self._ABORT)
+        self._thread.join()
+        if self.error is not None and self.raise_errors:
+            raise self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            # Do not mask the caller's error with the writer's
+            self._queue.put(self._ABORT)
+            self._thread.join()
+        return False
+
+
+class PageStream(NamedTuple):
+    header: dict            # {"document_id", "metadata", ...}
+    pages: Iterator[dict]   # page records, lazily parsed
+
+
+def _iter_file(path: Path, read_size: int = 1 << 20) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        while True:
+            data = f.read(read_size)
+            if not data:
+                return
+            yield data
+
+def _iter_lines(byte_chunks: Iterable[bytes]) -> Iterator[bytes]:
+    pending = b""
+    for data in byte_chunks:
+        pending += data
+        *lines, pending = pending.split(b"\n")
+        yield from lines
+    if pending:
+        yield pending
+
+def _legacy_pages(data: dict) -> Iterator[dict]:
+    if "pages" in data:
+        yield from data["pages"]
+    elif "text" in data:
+        yield {"page": 1, "text": data["text"]}
+    else:
+        raise ValueError("Processed JSON missing 'pages' or 'text' key.")
+
+def open_page_stream(container_name: str, blob_name: str, target: str = OUTPUT_TARGET) -> PageStream:
+    """
+    Open processed output for streaming. JSONL streams are parsed line by line;
+    a legacy single-JSON document is loaded whole and its pages yielded.
+    """
+    if target == "spool":
+        byte_chunks = _iter_file(_spool_path(container_name, blob_name))
+    else:
+        blob_client = blob_service_client.get_blob_client(container=container_name, blob=blob_name)
+        byte_chunks = blob_client.download_blob().chunks()
+
+    lines = _iter_lines(byte_chunks)
+    first = next(lines, b"")
+    try:
+        header = json.loads(first)
+    except ValueError:
+        header = None
+    if isinstance(header, dict) and header.get("format") == STREAM_FORMAT:
+        return PageStream(header, (json.loads(line) for line in lines if line.strip()))
+
+    data = json.loads(b"\n".join([first, *lines]))
+    header = {"document_id": data.get("document_id"), "metadata": data.get("metadata")}
+    return PageStream(header, _legacy_pages(data))
+
+
+class RangedPageWriter:
+    """
+    Page stream written as independently staged page ranges — one uncommitted block
+    (blob) or part file (spool) per range — and committed in page order at the end.
+    Range markers are derived from the source hash and page numbers, so ranges staged
+    by an interrupted attempt can be found and reused by the retry.
+    """
+
+    def __init__(self, container_name: str, blob_name: str, document_id, metadata: dict, source_hash: str,
+                 target: str = OUTPUT_TARGET):
+        self.container_name = container_name
+        self.blob_name = blob_name
+        self.document_id = document_id
+        self.metadata = metadata
+        self.source_hash = source_hash
+        self.target = target
+        if target == "spool":
+            self._path = _spool_path(container_name, blob_name)
+            self._parts = Path(f"{self._path}.parts")
+            self._parts.mkdir(parents=True, exist_ok=True)
+        elif target == "blob":
+            self._blob_client = blob_service_client.get_blob_client(container=container_name, blob=blob_name)
+        else:
+            raise ValueError(f"Unknown output.target '{target}' (expected 'blob' or 'spool').")
+
+    def marker_for(self, start: int, stop: int) -> str:
+        # Fixed width: block ids of one blob must all have the same length
+        return f"{self.source_hash[:16]}-{start:08d}-{stop:08d}"
+
+    def _header_marker(self) -> str:
+        return f"{self.source_hash[:16]}-header00-00000000"
+
+    @staticmethod
+    def _block_id(marker: str) -> str:
+        return base64.b64encode(marker.encode()).decode()
+
+    def available(self) -> set:
+        """Markers of ranges already staged for this blob."""
+        if self.target == "spool":
+            return {part.stem for part in self._parts.glob("*.jsonl")}
+        try:
+            _, uncommitted = self._blob_client.get_block_list("uncommitted")
+        except Exception:
+            return set()
+        return {base64.b64decode(block.id).decode() for block in uncommitted}
+
+    def _stage(self, marker: str, data: bytes):
+        if self.target == "spool":
+            tmp = self._parts / f"{marker}.tmp"
+            tmp.write_bytes(data)
+            os.replace(tmp, self._parts / f"{marker}.jsonl")
+        else:
+            self._blob_client.stage_block(block_id=self._block_id(marker), data=data)
+
+    def write_range(self, start: int, stop: int, pages: Iterable[dict]) -> str:
+        marker = self.marker_for(start, stop)
+        self._stage(marker, b"".join(
+            json.dumps(page, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n" for page in pages
+        ))
+        return marker
+
+    def commit(self, markers: Iterable[str]):
+        """Publish the header plus the given ranges, in the given (page) order."""
+        header = json.dumps(
+            {"format": STREAM_FORMAT, "document_id": self.document_id, "metadata": self.metadata},
+            ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8") + b"\n"
+        markers = list(markers)
+        if self.target == "spool":
+            with open(f"{self._path}.part", "wb") as out:
+                out.write(header)
+                for marker in markers:
+                    for data in _iter_file(self._parts / f"{marker}.jsonl"):
+                        out.write(data)
+            os.replace(f"{self._path}.part", self._path)
+            for part in self._parts.iterdir():
+                part.unlink()
+            self._parts.rmdir()
+        else:
+            self._stage(self._header_marker(), header)
+            self._blob_client.commit_block_list(
+                [BlobBlock(block_id=self._block_id(marker)) for marker in [self._header_marker(), *markers]],
+                content_settings=ContentSettings(content_type="application/x-ndjson")
+            )
+        logging.info(f"[PageStream] Committed {len(markers)} page ranges to {self.container_name}/{self.blob_name} ({self.target})")
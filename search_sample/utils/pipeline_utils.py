@@ -0,0 +1,99 @@
+# utils/pipeline_utils.py
+"""
+Pipeline helpers — overlap the stages of a streaming job with bounded buffers.
+- prefetch(): runs a producer (e.g. page extraction) on a background thread
+- map_in_order(): runs a stage on a thread pool with a bounded window of items in flight
+Chaining them gives a pipeline whose stages run concurrently, while each buffer
+bounds memory: a full buffer stops pulling from the stage that feeds it
+(backpressure), so a slow stage throttles the stages before it instead of
+letting work pile up. Errors in any stage are raised in the consumer.
+"""
+
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_END = object()
+
+
+class _StageError:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def prefetch(items: Iterable[T], maxsize: int, name: str = "prefetch") -> Iterator[T]:
+    """
+    Iterate `items` on a background thread, keeping up to `maxsize` items ready.
+    Closing the returned iterator early stops the producer at its next item.
+    """
+    if maxsize <= 0:
+        yield from items
+        return
+
+    buffer = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in items:
+                if not put(item):
+                    return
+            put(_END)
+        except BaseException as e:
+            put(_StageError(e))
+
+    thread = threading.Thread(target=produce, name=name, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _END:
+                return
+            if isinstance(item, _StageError):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
+def map_in_order(fn: Callable[[T], R], items: Iterable[T], workers: int, max_pending: int = 0,
+                 name: str = "stage") -> Iterator[R]:
+    """
+    Yield fn(item) for every item, in input order, with `workers` calls running
+    concurrently and at most `workers + max_pending` items taken from `items` and
+    not yet yielded. workers <= 1 runs inline (no thread pool).
+    """
+    if workers <= 1 and max_pending <= 0:
+        for item in items:
+            yield fn(item)
+        return
+
+    window = deque()
+    limit = max(1, workers) + max(0, max_pending)
+    executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix=name)
+    try:
+        for item in items:
+            window.append(executor.submit(fn, item))
+            if len(window) >= limit:
+                yield window.popleft().result()
+        while window:
+            yield window.popleft().result()
+    finally:
+        for future in window:
+            future.cancel()
+        executor.shutdown(wait=True)
@@ -0,0 +1,128 @@
+# utils/retry_utils.py
+"""
+Retry utilities — token-bucket rate limiting and jittered backoff for HTTP calls
+to MosaicDB and model-serving endpoints.
+"""
+
+import time
+import random
+import logging
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import requests
+from config import RETRY_MAX_ATTEMPTS, RETRY_BACKOFF_BASE_SECONDS, RETRY_BACKOFF_MAX_SECONDS
+
+# Throttling / transient upstream failures worth retrying
+RETRYABLE_STATUS_CODES = {429, 502, 503, 504}
+# For non-idempotent requests (inserts) only answers that mean "not processed": a
+# gateway error (502/504) may arrive after the upstream applied the request
+NON_IDEMPOTENT_RETRYABLE_STATUS_CODES = {429, 503}
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. `rate` tokens are added per second up to `capacity`;
+    `acquire()` blocks until a token is available. A rate <= 0 disables limiting.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0):
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds to wait."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_delay(attempt: int, base: float = RETRY_BACKOFF_BASE_SECONDS, cap: float = RETRY_BACKOFF_MAX_SECONDS) -> float:
+    """Exponential backoff with full jitter: uniform(0, min(cap, base * 2**attempt))."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def retry_delay_for(resp, attempt: int) -> float:
+    """Seconds to wait before retrying a retryable response (Retry-After wins over backoff)."""
+    retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+    if retry_after is not None:
+        # small jitter so parallel callers don't wake up together
+        return min(retry_after, RETRY_BACKOFF_MAX_SECONDS) + random.uniform(0, RETRY_BACKOFF_BASE_SECONDS)
+    return backoff_delay(attempt)
+
+
+def is_safe_to_resend(error: Exception) -> bool:
+    """
+    Whether a failed non-idempotent request certainly did not reach the server:
+    the connection was never made, or the server refused it (429/503).
+    """
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code in NON_IDEMPOTENT_RETRYABLE_STATUS_CODES
+    return False
+
+
+def post_with_retry(
+    url: str,
+    limiter: Optional[TokenBucket] = None,
+    max_retries: int = RETRY_MAX_ATTEMPTS,
+    session: Optional[requests.Session] = None,
+    idempotent: bool = True,
+    **kwargs
+) -> requests.Response:
+    """
+    POST with rate limiting and retries on 429/502/503/504 and connection errors.
+    With `idempotent=False` (inserts) a request is only resent when it cannot have
+    been applied: connect timeouts and 429/503 answers (see is_safe_to_resend).
+    Honors Retry-After when the server sends it, otherwise backs off with jitter.
+    Returns the last response; callers still call `raise_for_status()`.
+    """
+    sender = session or requests
+    retryable_status = RETRYABLE_STATUS_CODES if idempotent else NON_IDEMPOTENT_RETRYABLE_STATUS_CODES
+    for attempt in range(max_retries + 1):
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            resp = sender.post(url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if attempt == max_retries or not (idempotent or is_safe_to_resend(e)):
+                raise
+            delay = backoff_delay(attempt)
+            logging.warning(f"[Retry] POST {url} failed ({e}), retry {attempt + 1}/{max_retries} in {delay:.2f}s")
+        else:
+            if resp.status_code not in retryable_status or attempt == max_retries:
+                return resp
+            delay = retry_delay_for(resp, attempt)
+            logging.warning(f"[Retry] POST {url} returned {resp.status_code}, retry {attempt + 1}/{max_retries} in {delay:.2f}s")
+        time.sleep(delay)
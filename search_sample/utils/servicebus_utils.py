@@ -1,36 +1,58 @@
-# utils/servicebus_utils.py
-"""
-Service Bus utilities — simulates Azure Service Bus messaging locally.
-Replace with azure-servicebus SDK in production.
-"""
-
-import json
-from pathlib import Path
-from config import AZURE_SERVICE_BUS_CONNECTION_STRING
-
-QUEUE_DIR = Path("./local_servicebus_queues")
-QUEUE_DIR.mkdir(exist_ok=True)
-
-def send_message(queue_name: str, message: dict):
-    """Simulate sending a message to a Service Bus queue."""
-    queue_path = QUEUE_DIR / f"{queue_name}.queue"
-    with open(queue_path, "a", encoding="utf-8") as f:
-        f.write(json.dumps(message) + "\n")
-    print(f"[ServiceBus] Sent to {queue_name}: {message}")
-
-def receive_messages(queue_name: str):
-    """Simulate receiving all messages from a queue."""
-    queue_path = QUEUE_DIR / f"{queue_name}.queue"
-    if not queue_path.exists():
-        return []
-    messages = []
-    with open(queue_path, "r", encoding="utf-8") as f:
-        for line in f:
-            try:
-                messages.append(json.loads(line.strip()))
-            except json.JSONDecodeError:
-                pass
-    # Clear the queue
-    queue_path.unlink()
-    print(f"[ServiceBus] Received {len(messages)} messages from {queue_name}")
-    return messages
+# utils/servicebus_utils.py
+"""
+Service Bus utilities — simulates Azure Service Bus messaging locally.
+Replace with azure-servicebus SDK in production.
+"""
+
+import json
+from pathlib import Path
+from config import AZURE_SERVICE_BUS_CONNECTION_STRING
+
+QUEUE_DIR = Path("./local_servicebus_queues")
+QUEUE_DIR.mkdir(exist_ok=True)
+
+def send_message(queue_name: str, message: dict):
+    """Simulate sending a message to a Service Bus queue."""
+    queue_path = QUEUE_DIR / f"{queue_name}.queue"
+    with open(queue_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(message) + "\n")
+    print(f"[ServiceBus] Sent to {queue_name}: {message}")
+
+def receive_messages(queue_name: str):
+    """Simulate receiving all messages from a queue."""
+    queue_path = QUEUE_DIR / f"{queue_name}.queue"
+    if not queue_path.exists():
+        return []
+    messages = []
+    with open(queue_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                messages.append(json.loads(line.strip()))
+            except json.JSONDecodeError:
+                pass
+    # Clear the queue
+    queue_path.unlink()
+    print(f"[ServiceBus] Received {len(messages)} messages from {queue_name}")
+    return messages
+
+def receive_batch(queue_name: str, max_messages: int):
+    """Simulate receiving up to `max_messages` messages; the rest stay queued."""
+    queue_path = QUEUE_DIR / f"{queue_name}.queue"
+    if not queue_path.exists():
+        return []
+    with open(queue_path, "r", encoding="utf-8") as f:
+        lines = [line for line in f if line.strip()]
+    taken, rest = lines[:max_messages], lines[max_messages:]
+    if rest:
+        with open(queue_path, "w", encoding="utf-8") as f:
+            f.writelines(rest)
+    else:
+        queue_path.unlink()
+    messages = []
+    for line in taken:
+        try:
+            messages.append(json.loads(line.strip()))
+        except json.JSONDecodeError:
+            pass
+    print(f"[ServiceBus] Received {len(messages)} messages from {queue_name} ({len(rest)} left)")
+    return messages
@@ -0,0 +1,232 @@
+"""
+Content sniffing — identify a document's real format from a few KB of it.
+All reads go through a `read(offset, length)` callable, so a blob is inspected
+with ranged reads (its head, its tail and, for ZIP/OLE containers, their
+directories) before anything is downloaded in full or a parser is imported.
+Encrypted and corrupt files are reported here, and PDFs are pre-classified as
+text or scanned from the object markers visible in the bytes read, and the
+page count is probed where it is cheap (PDF /Count, OOXML docProps/app.xml).
+"""
+
+import io
+import re
+import zlib
+import struct
+import zipfile
+from typing import Callable, List, NamedTuple, Optional, Tuple
+from utils.blob_utils import download_blob_head, download_blob_range
+from config import SNIFF_HEAD_BYTES, SNIFF_TAIL_BYTES
+
+PDF, DOCX, XLSX, PPTX = "pdf", "docx", "xlsx", "pptx"
+OK, ENCRYPTED, CORRUPT, UNSUPPORTED = "ok", "encrypted", "corrupt", "unsupported"
+TEXT_PDF, SCANNED_PDF = "text", "scanned"
+
+# What each extension claims to be, for mismatch reporting
+EXTENSION_KINDS = {".pdf": PDF, ".docx": DOCX, ".xlsx": XLSX, ".pptx": PPTX}
+
+Reader = Callable[[int, int], bytes]
+
+
+class Sniffed(NamedTuple):
+    kind: Optional[str]               # PDF, DOCX, XLSX, PPTX, or None when not identified
+    status: str                       # OK, ENCRYPTED, CORRUPT or UNSUPPORTED
+    detail: str = ""
+    pdf_kind: Optional[str] = None    # TEXT_PDF / SCANNED_PDF when the bytes read tell
+    encrypted: bool = False           # set on PDFs that carry an /Encrypt dictionary
+    pages: Optional[int] = None       # page/slide count when a cheap probe finds it
+    size: Optional[int] = None        # object size in bytes
+
+    @property
+    def ok(self) -> bool:
+        return self.status == OK
+
+
+_PDF_MAGIC = b"%PDF-"
+_ZIP_MAGIC = (b"PK\x03\x04", b"PK\x05\x06")
+_OLE_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+
+_PDF_ENCRYPT_RE = re.compile(rb"/Encrypt\s*(?:\d+\s+\d+\s+R|<<)")
+_PDF_FONT_RE = re.compile(rb"/Type\s*/Font\b|/FontDescriptor\b|/Font\s*<<")
+_PDF_IMAGE_RE = re.compile(rb"/Subtype\s*/Image\b")
+_PDF_COUNT_RE = re.compile(rb"/Type\s*/Pages\b[^>]*?/Count\s+(\d+)|/Count\s+(\d+)[^>]*?/Type\s*/Pages\b")
+
+# Page counts the authoring application records in docProps/app.xml
+_APP_XML = "docProps/app.xml"
+_APP_XML_MAX_BYTES = 65536
+_APP_PAGES_RE = {DOCX: re.compile(rb"<(?:\w+:)?Pages>(\d+)<"), PPTX: re.compile(rb"<(?:\w+:)?Slides>(\d+)<")}
+
+# Part prefixes that identify an OOXML package
+_OOXML_PREFIXES = (("word/", DOCX), ("xl/", XLSX), ("ppt/", PPTX))
+
+# Directory stream names in OLE2 compound files
+_OLE_KINDS = {
+    "EncryptedPackage": None,   # password-protected OOXML (any of docx/xlsx/pptx)
+    "WordDocument": ".doc",
+    "Workbook": ".xls",
+    "Book": ".xls",
+    "PowerPoint Document": ".ppt",
+}
+
+
+class _RangedFile(io.RawIOBase):
+    """
+    Seekable read-only view over `read`, for zipfile: only the ranges it asks for
+    (end-of-directory record and central directory) are fetched, and ranges
+    already read (head and tail) are served from memory.
+    """
+
+    def __init__(self, read: Reader, size: int, spans: List[Tuple[int, bytes]]):
+        self._read = read
+        self._size = size
+        self._spans = spans
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: self._size}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def readinto(self, buffer) -> int:
+        length = min(len(buffer), self._size - self._pos)
+        if length <= 0:
+            return 0
+        for start, data in self._spans:
+            if start <= self._pos and self._pos + length <= start + len(data):
+                chunk = data[self._pos - start:self._pos - start + length]
+                break
+        else:
+            chunk = self._read(self._pos, length)
+        buffer[:len(chunk)] = chunk
+        self._pos += len(chunk)
+        return len(chunk)
+
+    def prefetch(self, offset: int, length: int):
+        """Fetch a range with one read; later reads inside it are served from memory."""
+        if not any(start <= offset and offset + length <= start + len(data) for start, data in self._spans):
+            self._spans.append((offset, self._read(offset, length)))
+
+
+def _sniff_pdf(head: bytes, tail: bytes) -> Sniffed:
+    if b"%%EOF" not in tail:
+        return Sniffed(PDF, CORRUPT, "truncated PDF (no %%EOF trailer)")
+    encrypted = bool(_PDF_ENCRYPT_RE.search(head) or _PDF_ENCRYPT_RE.search(tail))
+    fonts = _PDF_FONT_RE.search(head) or _PDF_FONT_RE.search(tail)
+    images = _PDF_IMAGE_RE.search(head) or _PDF_IMAGE_RE.search(tail)
+    # Most objects sit in compressed object streams; only decide when markers are visible
+    pdf_kind = TEXT_PDF if fonts else SCANNED_PDF if images else None
+    # The page tree root holds the total; intermediate /Pages nodes only count their subtree
+    counts = [int(a or b) for data in (head, tail) for a, b in _PDF_COUNT_RE.findall(data)]
+    pages = max(counts) if counts else None
+    return Sniffed(PDF, OK, "encrypted" if encrypted else "", pdf_kind, encrypted, pages)
+
+def _sniff_zip(read: Reader, size: int, head: bytes, tail: bytes) -> Sniffed:
+    view = _RangedFile(read, size, [(0, head), (size - len(tail), tail)])
+    try:
+        with zipfile.ZipFile(view) as archive:
+            infos = archive.infolist()
+            names = [info.filename for info in infos]
+            kind = next((kind for prefix, kind in _OOXML_PREFIXES if any(n.startswith(prefix) for n in names)), None)
+            if kind is None or "[Content_Types].xml" not in names:
+                return Sniffed(None, UNSUPPORTED, "ZIP archive, not an Office document")
+            if any(info.flag_bits & 0x1 for info in infos):
+                return Sniffed(kind, ENCRYPTED, "ZIP entries are encrypted")
+            return Sniffed(kind, OK, pages=_app_xml_pages(archive, view, size, kind))
+    except (zipfile.BadZipFile, struct.error, ValueError) as e:
+        return Sniffed(None, CORRUPT, f"unreadable ZIP directory: {e}")
+
+def _app_xml_pages(archive: zipfile.ZipFile, view: _RangedFile, size: int, kind: str) -> Optional[int]:
+    """Page (DOCX) or slide (PPTX) count from docProps/app.xml, fetched with one ranged read."""
+    if kind not in _APP_PAGES_RE:
+        return None
+    try:
+        info = archive.getinfo(_APP_XML)
+    except KeyError:
+        return None
+    if info.compress_size > _APP_XML_MAX_BYTES:
+        return None
+    # Local header (30 bytes + name + extra field) and the compressed member in one range
+    view.prefetch(info.header_offset, min(30 + len(info.filename) + 1024 + info.compress_size, size - info.header_offset))
+    try:
+        data = archive.read(info)
+    except (zipfile.BadZipFile, zlib.error, EOFError):
+        return None
+    match = _APP_PAGES_RE[kind].search(data)
+    return int(match.group(1)) if match else None
+
+def _ole_directory_names(read: Reader, head: bytes) -> List[str]:
+    """Stream names in the first directory sector of an OLE2 compound file."""
+    sector_shift, = struct.unpack_from("<H", head, 30)
+    first_dir_sector, = struct.unpack_from("<I", head, 48)
+    sector_size = 1 << sector_shift
+    offset = (first_dir_sector + 1) * sector_size
+    if offset + sector_size <= len(head):
+        sector = head[offset:offset + sector_size]
+    else:
+        sector = read(offset, sector_size)
+    names = []
+    for entry in range(0, len(sector) - 127, 128):
+        name_bytes, = struct.unpack_from("<H", sector, entry + 64)
+        if 2 <= name_bytes <= 64:
+            names.append(sector[entry:entry + name_bytes - 2].decode("utf-16-le", "replace"))
+    return names
+
+def _sniff_ole(read: Reader, head: bytes) -> Sniffed:
+    try:
+        names = _ole_directory_names(read, head)
+    except (struct.error, ValueError) as e:
+        return Sniffed(None, CORRUPT, f"unreadable compound file header: {e}")
+    for name in names:
+        if name in _OLE_KINDS:
+            legacy = _OLE_KINDS[name]
+            if legacy is None:
+                return Sniffed(None, ENCRYPTED, "password-protected Office document")
+            return Sniffed(None, UNSUPPORTED, f"legacy Office format ({legacy})")
+    return Sniffed(None, UNSUPPORTED, "OLE2 compound file")
+
+
+def sniff(read: Reader, size: int, head_bytes: int = SNIFF_HEAD_BYTES,
+          tail_bytes: int = SNIFF_TAIL_BYTES, head: Optional[bytes] = None) -> Sniffed:
+    """
+    Identify the format of a `size`-byte object reachable through `read(offset, length)`.
+    `head` may be passed when the first bytes were already fetched.
+    """
+    if size == 0:
+        return Sniffed(None, CORRUPT, "empty file", size=0)
+    if head is None:
+        head = read(0, min(head_bytes, size))
+    tail_start = max(size - tail_bytes, 0)
+    if tail_start >= len(head):
+        tail = read(tail_start, size - tail_start)
+    else:
+        # Head and tail windows overlap: only fetch what the head did not cover
+        rest = read(len(head), size - len(head)) if size > len(head) else b""
+        tail = head[tail_start:] + rest
+
+    if _PDF_MAGIC in head[:1024]:
+        sniffed = _sniff_pdf(head, tail)
+    elif head.startswith(_ZIP_MAGIC):
+        sniffed = _sniff_zip(read, size, head, tail)
+    elif head.startswith(_OLE_MAGIC):
+        sniffed = _sniff_ole(read, head)
+    else:
+        sniffed = Sniffed(None, UNSUPPORTED, "unrecognised format")
+    return sniffed._replace(size=size)
+
+def sniff_bytes(data: bytes) -> Sniffed:
+    """Sniff an in-memory document."""
+    return sniff(lambda offset, length: data[offset:offset + length], len(data))
+
+def sniff_blob(blob_path: str, container_name: str = "documents") -> Sniffed:
+    """Sniff a blob with ranged reads only (head, tail and container directories)."""
+    head, size = download_blob_head(blob_path, SNIFF_HEAD_BYTES, container_name)
+    return sniff(lambda offset, length: download_blob_range(blob_path, offset, length, container_name),
+                 size, head=head)
@@ -0,0 +1,156 @@
+# utils/vector_codec.py
+"""
+Vector codec — opt-in compaction stage between generate_embeddings and store_embeddings.
+- reduction:    "none" | "truncate" | "pca" to `target_dim` (vectors are re-normalized)
+- quantization: "none" (float32) | "float16" | "int8" (symmetric, one float32 scale per vector)
+Query vectors go through the same reduction (see search_utils.embed_query) so they live in
+the stored space; quantization is storage-only since the store dequantizes (codes * scale).
+benchmarks.vector_codec reports recall@k against exact float32 search for several settings.
+"""
+
+import base64
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from config import (
+    VECTOR_CODEC_ENABLED,
+    VECTOR_CODEC_QUANTIZATION,
+    VECTOR_CODEC_REDUCTION,
+    VECTOR_CODEC_TARGET_DIM,
+    VECTOR_CODEC_PCA_PATH
+)
+
+QUANTIZATIONS = {"none": "<f4", "float32": "<f4", "float16": "<f2", "int8": "i1"}
+REDUCTIONS = ("none", "truncate", "pca")
+
+
+def pack_b64(array: np.ndarray) -> str:
+    return base64.b64encode(np.ascontiguousarray(array).tobytes()).decode("ascii")
+
+
+@dataclass
+class EncodedVectors:
+    """A (rows, dim) block of codes plus per-row scales for int8."""
+    codes: np.ndarray
+    encoding: str
+    scales: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return self.codes.shape[0]
+
+    @property
+    def dim(self) -> int:
+        return self.codes.shape[1]
+
+    @property
+    def bytes_per_vector(self) -> int:
+        return self.dim * self.codes.itemsize + (4 if self.scales is not None else 0)
+
+    @classmethod
+    def from_floats(cls, vectors, encoding: str = "float32") -> "EncodedVectors":
+        if encoding not in ("float32", "float16"):
+            raise ValueError(f"Unsupported float encoding: {encoding}")
+        return cls(np.asarray(vectors, dtype=QUANTIZATIONS[encoding]), encoding)
+
+    def slice(self, start: int, end: int) -> "EncodedVectors":
+        scales = self.scales[start:end] if self.scales is not None else None
+        return EncodedVectors(self.codes[start:end], self.encoding, scales)
+
+    def decode(self) -> np.ndarray:
+        values = self.codes.astype(np.float32)
+        if self.scales is not None:
+            values *= self.scales[:, None]
+        return values
+
+    def to_payload(self) -> dict:
+        """Fields for a MosaicDB bulk-insert page."""
+        payload = {"dim": self.dim, "vector_encoding": self.encoding, "vectors": pack_b64(self.codes)}
+        if self.scales is not None:
+            payload["scales"] = pack_b64(self.scales.astype("<f4"))
+        return payload
+
+
+def fit_pca(vectors, target_dim: int, path: Optional[str] = None) -> dict:
+    """
+    Fit the top `target_dim` principal directions of sample vectors; optionally save
+    to `path` (.npz). The SVD is uncentered so inner products / cosine similarity,
+    which is what the store ranks by, are preserved as well as possible.
+    """
+    matrix = np.asarray(vectors, dtype=np.float32)
+    if target_dim > min(matrix.shape):
+        raise ValueError(f"PCA target_dim {target_dim} exceeds sample shape {matrix.shape}")
+    _, _, vt = np.linalg.svd(matrix, full_matrices=False)
+    model = {"components": vt[:target_dim].astype(np.float32)}
+    if path:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        np.savez(path, **model)
+        logging.info(f"[Codec] Saved PCA model ({matrix.shape[1]} -> {target_dim}) to {path}")
+    return model
+
+
+class VectorCodec:
+    def __init__(self, quantization: str = "none", reduction: str = "none",
+                 target_dim: Optional[int] = None, pca_model: Optional[dict] = None):
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"Unknown quantization '{quantization}'")
+        if reduction not in REDUCTIONS:
+            raise ValueError(f"Unknown reduction '{reduction}'")
+        if reduction != "none" and not target_dim:
+            raise ValueError("target_dim is required for dimensionality reduction")
+        if reduction == "pca" and pca_model is None:
+            raise ValueError("PCA reduction needs a fitted model (see fit_pca)")
+        self.quantization = "float32" if quantization == "none" else quantization
+        self.reduction = reduction
+        self.target_dim = target_dim
+        self.pca_model = pca_model
+
+    @property
+    def name(self) -> str:
+        reduced = f"{self.reduction}{self.target_dim}" if self.reduction != "none" else "full"
+        return f"{reduced}/{self.quantization}"
+
+    def reduce(self, vectors) -> np.ndarray:
+        """Apply the dimensionality reduction and re-normalize rows."""
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if self.reduction == "none":
+            return matrix
+        if self.reduction == "truncate":
+            matrix = matrix[:, :self.target_dim]
+        else:
+            matrix = matrix @ self.pca_model["components"].T
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1.0, norms)
+
+    def encode(self, vectors) -> EncodedVectors:
+        matrix = self.reduce(vectors)
+        if self.quantization != "int8":
+            return EncodedVectors(matrix.astype(QUANTIZATIONS[self.quantization]), self.quantization)
+        scales = np.abs(matrix).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.clip(np.rint(matrix / scales[:, None]), -127, 127).astype(np.int8)
+        return EncodedVectors(codes, "int8", scales.astype(np.float32))
+
+    def transform_query(self, vector: Sequence[float]) -> List[float]:
+        """Map a query vector into the stored space (reduction only)."""
+        return self.reduce([vector])[0].tolist()
+
+
+_codec: Optional[VectorCodec] = None
+
+def get_codec() -> VectorCodec:
+    """Codec configured by `vector_codec` in config.yaml; a pass-through float32 codec when disabled."""
+    global _codec
+    if _codec is None:
+        if not VECTOR_CODEC_ENABLED:
+            _codec = VectorCodec()
+        else:
+            pca_model = None
+            if VECTOR_CODEC_REDUCTION == "pca":
+                with np.load(VECTOR_CODEC_PCA_PATH) as saved:
+                    pca_model = {"components": saved["components"]}
+            _codec = VectorCodec(VECTOR_CODEC_QUANTIZATION, VECTOR_CODEC_REDUCTION, VECTOR_CODEC_TARGET_DIM, pca_model)
+    return _codec